@@ -1,11 +1,17 @@
 import cv2
-import serial
-import time
+import numpy as np
+import os
+import sys
 from collections import deque
 
+# The shared camera and serial helpers live in the repository's `common` folder.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.frame_source import FrameSourceError, open_source
+from common.serial_transport import SerialTransportError, open_transport
+
 # --- CONFIGURATION ---
-# CORRECTED: Updated to your COM5 port.
-ARDUINO_PORT = 'COM5' 
+# None finds the Arduino by its USB id; set a port (e.g. 'COM5') if several boards are plugged in.
+ARDUINO_PORT = None
 BAUD_RATE = 9600
 
 # --- NEW, MORE SENSITIVE THRESHOLDS FOR CROWD/OBJECT DETECTION ---
@@ -20,21 +26,29 @@ MIN_CONTOUR_AREA = 750
 STABILITY_BUFFER_SIZE = 5 # Require 5 consecutive similar readings before changing state
 
 # --- SETUP SERIAL CONNECTION ---
+# Opens without resetting the Arduino (the sketch keeps running), so there is no boot
+# wait and the first command goes out at once; the short timeout never stalls the video.
 try:
-    arduino = serial.Serial(port=ARDUINO_PORT, baudrate=BAUD_RATE, timeout=.1)
-    print("Arduino connected successfully on COM5.")
-except Exception as e:
-    print(f"Error connecting to Arduino on {ARDUINO_PORT}: {e}")
+    arduino = open_transport(ARDUINO_PORT, BAUD_RATE, timeout=0.1, reset=False)
+    print(f"Arduino connected successfully on {arduino.port}.")
+except SerialTransportError as e:
+    print(f"Error connecting to Arduino on {ARDUINO_PORT or 'the detected port'}: {e}")
     print("Please check that the Arduino is plugged in and the port is correct.")
     exit()
 
 # --- SETUP VIDEO CAPTURE ---
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    print("Error: Could not open video stream.")
+# Opens the best webcam (cached after the first run); set CAMERA_INDEX to pick one.
+# A video file or image folder given on the command line is analyzed instead.
+try:
+    source = open_source(sys.argv[1] if len(sys.argv) > 1 else None)
+except FrameSourceError as e:
+    print(f"Error: Could not open video stream. {e}")
     exit()
 
 backSub = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=50, detectShadows=False)
+kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+# Mask buffers, allocated on the first frame and reused for every frame after it
+fgMask = eroded_mask = dilated_mask = thresh = None
 
 # --- STABILITY SETUP ---
 command_buffer = deque(maxlen=STABILITY_BUFFER_SIZE)
@@ -43,19 +57,18 @@ last_sent_command = None
 print("Starting crowd density detection... Press 'q' to quit.")
 print(f"Logic: 0-{LOW_THRESHOLD-1} objects = GREEN | {LOW_THRESHOLD}-{MEDIUM_THRESHOLD-1} = YELLOW | {MEDIUM_THRESHOLD}+ = RED")
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
+for captured in source:
+    frame = captured.image
+    if fgMask is None or fgMask.shape != frame.shape[:2]:
+        fgMask, eroded_mask, dilated_mask, thresh = (np.empty(frame.shape[:2], dtype=np.uint8) for _ in range(4))
 
     # 1. Pre-processing
-    fgMask = backSub.apply(frame)
+    backSub.apply(frame, fgmask=fgMask)
 
     # 2. Noise Reduction
-    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-    eroded_mask = cv2.erode(fgMask, kernel, iterations=1)
-    dilated_mask = cv2.dilate(eroded_mask, kernel, iterations=1)
-    _, thresh = cv2.threshold(dilated_mask, 127, 255, cv2.THRESH_BINARY)
+    cv2.erode(fgMask, kernel, dst=eroded_mask, iterations=1)
+    cv2.dilate(eroded_mask, kernel, dst=dilated_mask, iterations=1)
+    cv2.threshold(dilated_mask, 127, 255, cv2.THRESH_BINARY, dst=thresh)
 
     # 3. Find Contours
     contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -81,9 +94,12 @@ while True:
     if len(command_buffer) == STABILITY_BUFFER_SIZE and len(set(command_buffer)) == 1:
         stable_command = command_buffer[0]
         if stable_command != last_sent_command:
-            arduino.write(stable_command.encode())
-            print(f"State changed to: {stable_command} (Object Count: {object_count})")
-            last_sent_command = stable_command
+            try:
+                arduino.write(stable_command.encode())
+                print(f"State changed to: {stable_command} (Object Count: {object_count})")
+                last_sent_command = stable_command
+            except SerialTransportError as e: # Cable pulled: keep watching, resend once it reconnects
+                print(f"Could not send {stable_command}: {e}")
 
     # 6. Display visual feedback
     density_level_text = f"Objects: {object_count} -> Current CMD: {command}"
@@ -98,8 +114,13 @@ while True:
         break
 
 # --- CLEANUP ---
-arduino.write(b'L')
+try:
+    arduino.write(b'L')
+except SerialTransportError as e:
+    print(f"Could not reset the LEDs: {e}")
+print(f"Serial stats: {arduino.stats()}")
 arduino.close()
-cap.release()
+source.close()
+print(f"Frames: {source.stats()}")
 cv2.destroyAllWindows()
 print("Program terminated.")
\ No newline at end of file
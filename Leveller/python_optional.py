@@ -2,46 +2,51 @@
 # This script reads the angle data sent by the Arduino over the USB cable.
 #optional , main function is uploaded to microcontroller from arduino_leveller.cpp
 
-import serial
-import time
+import os
+import sys
 
-# Find the correct port for your Arduino in the Arduino IDE (e.g., "COM3" or "/dev/ttyUSB0")
-SERIAL_PORT = 'COM3' 
+# The shared serial transport lives in the repository's `common` folder.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.serial_transport import SerialTransportError, open_transport
+
+# None finds the Arduino by its USB id; or give the port from the Arduino IDE (e.g. "COM3" or "/dev/ttyUSB0")
+SERIAL_PORT = None
 BAUD_RATE = 115200
 
+arduino = None
 try:
-    arduino = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=1)
-    print(f"Connected to Arduino on {SERIAL_PORT}...")
-    time.sleep(2) # Wait for the connection to establish
+    # Lines are read in bulk by a background thread, and the link reconnects if the cable is replugged.
+    arduino = open_transport(SERIAL_PORT, BAUD_RATE, timeout=1)
+    print(f"Connected to Arduino on {arduino.port}...")
 
     while True:
-        if arduino.in_waiting > 0:
-            # Read the line from Arduino
-            line = arduino.readline().decode('utf-8').strip()
-            
-            # Check if the line contains what we expect
-            if line.startswith("Angle: "):
-                try:
-                    # Extract the number
-                    angle_str = line.replace("Angle: ", "")
-                    angle = float(angle_str)
-                    
-                    # Print a simple text-based level
-                    if angle < -2:
-                        print(f"<< Tilted Left  ({angle:.2f} degrees)")
-                    elif angle > 2:
-                        print(f"   Tilted Right >> ({angle:.2f} degrees)")
-                    else:
-                        print(f"-- LEVEL --     ({angle:.2f} degrees)")
+        # Wait for the next line from Arduino (None if nothing arrived within the timeout)
+        line = arduino.read_text()
+        
+        # Check if the line contains what we expect
+        if line and line.startswith("Angle: "):
+            try:
+                # Extract the number
+                angle_str = line.replace("Angle: ", "")
+                angle = float(angle_str)
                 
-                except ValueError:
-                    print(f"Could not parse line: {line}")
+                # Print a simple text-based level
+                if angle < -2:
+                    print(f"<< Tilted Left  ({angle:.2f} degrees)")
+                elif angle > 2:
+                    print(f"   Tilted Right >> ({angle:.2f} degrees)")
+                else:
+                    print(f"-- LEVEL --     ({angle:.2f} degrees)")
+            
+            except ValueError:
+                print(f"Could not parse line: {line}")
 
-except serial.SerialException as e:
+except SerialTransportError as e:
     print(f"Error: {e}")
 except KeyboardInterrupt:
     print("Exiting...")
 finally:
-    if 'arduino' in locals() and arduino.is_open:
+    if arduino is not None:
+        print(f"Serial stats: {arduino.stats()}")
         arduino.close()
         print("Serial connection closed.")
\ No newline at end of file
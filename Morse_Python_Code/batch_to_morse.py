@@ -0,0 +1,180 @@
+# Batch Speech-to-Morse Converter
+# Offline companion to voice_to_morse.py: converts recorded announcements (WAV files)
+# into text, Morse code and the exact LED on/off timing schedule for each file.
+#
+# Files are spread across a pool of worker processes. Each worker loads the Vosk
+# model once and keeps its own recognizer, and every file is streamed through it
+# in fixed-size chunks, so memory stays flat no matter how long the recording is.
+# The model folder is validated (common.model_store) before any worker starts, and
+# a worker that still fails to load it ends the batch instead of being respawned.
+#
+# Usage:
+#   python batch_to_morse.py announcements/ extra.wav --workers 4 --output morse.jsonl
+
+import argparse
+import json
+import os
+import sys
+import time
+import wave
+from multiprocessing import Pool
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.model_store import InvalidModel, ModelNotFound, store
+from morse_timing import airtime_ms, timing_array, to_morse
+
+# --- CONFIGURATION ---
+MODEL_PATH = 'model' # Same Vosk model folder used by voice_to_morse.py
+CHUNK_FRAMES = 4000 # Audio frames fed to the recognizer per call (0.25 s at 16 kHz)
+# --- END CONFIGURATION ---
+
+# Per-process state, created once by _init_worker.
+_model = None
+_model_error = None
+_recognizers = {}
+
+
+def _init_worker(model_path):
+    # An exception here would make the Pool respawn the worker forever; report it per file instead.
+    global _model, _model_error
+    try:
+        import vosk
+        vosk.SetLogLevel(-1)
+        _model = vosk.Model(model_path)
+    except Exception as e:
+        _model_error = f"Could not load the Vosk model: {e}"
+
+
+def _get_recognizer(sample_rate):
+    """One recognizer per sample rate per worker, reused (after Reset) for every file."""
+    import vosk
+    recognizer = _recognizers.get(sample_rate)
+    if recognizer is None:
+        recognizer = vosk.KaldiRecognizer(_model, sample_rate)
+        _recognizers[sample_rate] = recognizer
+    else:
+        recognizer.Reset()
+    return recognizer
+
+
+def transcribe_file(path, chunk_frames=CHUNK_FRAMES):
+    """Streams one WAV file through the worker's recognizer and returns a result record."""
+    start = time.perf_counter()
+    record = {'file': path}
+    if _model is None:
+        record.update({'error': _model_error or "No Vosk model loaded.", 'model_error': True})
+        return record
+    try:
+        with wave.open(path, 'rb') as wav:
+            if wav.getnchannels() != 1 or wav.getsampwidth() != 2 or wav.getcomptype() != 'NONE':
+                raise ValueError("Audio must be mono 16-bit PCM WAV.")
+            sample_rate = wav.getframerate()
+            audio_s = wav.getnframes() / sample_rate
+            recognizer = _get_recognizer(sample_rate)
+
+            texts = []
+            while True:
+                data = wav.readframes(chunk_frames)
+                if not data:
+                    break
+                if recognizer.AcceptWaveform(data):
+                    texts.append(json.loads(recognizer.Result())['text'])
+            texts.append(json.loads(recognizer.FinalResult())['text'])
+    except (wave.Error, ValueError, OSError) as e:
+        record['error'] = str(e)
+        return record
+
+    text = ' '.join(t for t in texts if t)
+    processing_s = time.perf_counter() - start
+    record.update({
+        'text': text,
+        'morse': to_morse(text),
+        'timing_ms': timing_array(text).tolist(),
+        'airtime_ms': airtime_ms(text),
+        'audio_s': round(audio_s, 3),
+        'processing_s': round(processing_s, 3),
+        'rtf': round(processing_s / audio_s, 4) if audio_s else None,
+    })
+    return record
+
+
+def _transcribe_job(job):
+    return transcribe_file(*job)
+
+
+def collect_wav_files(inputs):
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                files.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith('.wav'))
+        else:
+            files.append(item)
+    # Longest files first so no worker is left with one big file at the very end.
+    return sorted(files, key=lambda f: os.path.getsize(f) if os.path.exists(f) else 0, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert WAV recordings to Morse code offline.")
+    parser.add_argument('inputs', nargs='+', help="WAV files and/or folders containing WAV files.")
+    parser.add_argument('--model', default=MODEL_PATH, help="Path to the Vosk model folder.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-frames', type=int, default=CHUNK_FRAMES)
+    parser.add_argument('--output', help="Write one JSON record per file to this .jsonl file (default: stdout).")
+    args = parser.parse_args()
+
+    try:
+        store.require(args.model)
+    except (ModelNotFound, InvalidModel) as e:
+        print(f"--- ERROR: {e} ---")
+        sys.exit(1)
+
+    files = collect_wav_files(args.inputs)
+    if not files:
+        print("No WAV files found.")
+        sys.exit(1)
+
+    workers = max(1, min(args.workers, len(files)))
+    print(f"Converting {len(files)} file(s) with {workers} worker(s)...", file=sys.stderr)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    total_audio_s = total_processing_s = 0.0
+    failures = 0
+    model_error = None
+    start = time.perf_counter()
+    try:
+        with Pool(workers, initializer=_init_worker, initargs=(args.model,)) as pool:
+            jobs = [(f, args.chunk_frames) for f in files]
+            for record in pool.imap_unordered(_transcribe_job, jobs):
+                if record.get('model_error'):
+                    model_error = record['error'] # Every worker would fail the same way; leaving the block stops them
+                    break
+                out.write(json.dumps(record) + '\n')
+                out.flush()
+                if 'error' in record:
+                    failures += 1
+                    print(f"  FAILED {record['file']}: {record['error']}", file=sys.stderr)
+                else:
+                    total_audio_s += record['audio_s']
+                    total_processing_s += record['processing_s']
+                    print(f"  {record['file']}: '{record['text']}' (RTF {record['rtf']})", file=sys.stderr)
+    finally:
+        if args.output:
+            out.close()
+    wall_s = time.perf_counter() - start
+    if model_error:
+        print(f"--- ERROR: {model_error} ---", file=sys.stderr)
+        sys.exit(1)
+
+    print("\n--- Batch complete ---", file=sys.stderr)
+    print(f"Files: {len(files) - failures} converted, {failures} failed", file=sys.stderr)
+    print(f"Audio: {total_audio_s:.1f}s in {wall_s:.1f}s wall time", file=sys.stderr)
+    if total_audio_s:
+        # Per-worker RTF: CPU cost of decoding one second of audio.
+        # Batch RTF: wall time per second of audio with all workers running.
+        print(f"Per-worker RTF: {total_processing_s / total_audio_s:.3f}", file=sys.stderr)
+        print(f"Batch RTF:      {wall_s / total_audio_s:.3f} ({total_audio_s / wall_s:.1f}x real time)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
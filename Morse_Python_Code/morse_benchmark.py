@@ -0,0 +1,170 @@
+# Morse Sender Benchmark
+# Measures how long morse_sender.send_message() takes to get each message out,
+# and how much of that is Morse airtime versus host-side overhead.
+#
+# It runs against SimulatedArduino, which emulates the sketch's blocking
+# blinkMorse() + delay(letterSpace) behaviour, so no hardware is needed.
+#
+# For every message in the corpus it reports:
+#   airtime   - theoretical time the LED needs (from morse_timing.py)
+#   wall      - how long send_message() actually took
+#   overhead  - wall - airtime
+#   idle      - time the (simulated) Arduino sat waiting for the host between characters
+#
+# Results can be saved as a baseline and later runs compared against it:
+#   python morse_benchmark.py --save-baseline morse_baseline.json
+#   python morse_benchmark.py --baseline morse_baseline.json     (exit code 1 on regression)
+#
+# --transport sends through common.serial_transport (reader thread + line framing),
+# as the real tools do, to measure what the transport layer adds.
+#
+# NOTE: --scale speeds up the simulated Arduino only. The sender's own sleeps are
+# real time, so at small scales the overhead share grows; compare runs at the same scale.
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import morse_sender
+from morse_timing import LETTER_SPACE, airtime_ms
+from simulated_arduino import SimulatedArduino
+
+CORPUS = [
+    "SOS",
+    "HELP",
+    "CODE",
+    "HELLO WORLD",
+    "MEET AT GATE 7",
+    "THE QUICK BROWN FOX 123",
+]
+REGRESSION_TOLERANCE = 0.10 # Allowed growth in wall/airtime ratio before a run counts as a regression
+
+
+def benchmark_message(device, message, repeat, link=None):
+    """
+    Sends a message `repeat` times and returns the median measurements (seconds).
+    `link` is what the sender writes to (default: the device itself).
+    """
+    link = link or device
+    scale = device.time_scale
+    # send_message() returns once the last character's debug line arrives,
+    # i.e. before the sketch's final delay(letterSpace).
+    theoretical_s = (airtime_ms(message) - LETTER_SPACE) * scale / 1000.0
+
+    walls, idles = [], []
+    for _ in range(repeat):
+        device.reset_stats()
+        start = time.perf_counter()
+        morse_sender.send_message(link, message, verbose=False)
+        walls.append(time.perf_counter() - start)
+        idles.append(device.stats()['idle_s'])
+        time.sleep(LETTER_SPACE * scale / 1000.0) # Let the device finish before the next run
+
+    wall_s = statistics.median(walls)
+    return {
+        'message': message,
+        'chars': len(message),
+        'airtime_s': round(theoretical_s, 4),
+        'wall_s': round(wall_s, 4),
+        'overhead_s': round(wall_s - theoretical_s, 4),
+        'overhead_pct': round(100.0 * (wall_s - theoretical_s) / wall_s, 2) if wall_s else 0.0,
+        'device_idle_s': round(statistics.median(idles), 4),
+        'wall_per_airtime': round(wall_s / theoretical_s, 4) if theoretical_s else None,
+        'bytes_dropped': device.bytes_dropped,
+    }
+
+
+def run_benchmark(corpus, scale, repeat, transport=False):
+    device = SimulatedArduino(time_scale=scale)
+    link = device
+    if transport:
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+        from common.serial_transport import SerialTransport
+        link = SerialTransport(device=device, timeout=device.timeout).open()
+    link.readline() # Startup messages, as connect_to_arduino() would read them
+    link.readline()
+    try:
+        results = [benchmark_message(device, message, repeat, link) for message in corpus]
+    finally:
+        link_stats = link.stats() if transport else None
+        link.close()
+        device.close()
+
+    total_airtime = sum(r['airtime_s'] for r in results)
+    total_wall = sum(r['wall_s'] for r in results)
+    return {
+        'scale': scale,
+        'repeat': repeat,
+        'transport': link_stats,
+        'messages': results,
+        'total_airtime_s': round(total_airtime, 4),
+        'total_wall_s': round(total_wall, 4),
+        'total_overhead_pct': round(100.0 * (total_wall - total_airtime) / total_wall, 2) if total_wall else 0.0,
+    }
+
+
+def find_regressions(report, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Messages whose wall/airtime ratio grew by more than `tolerance` since the baseline."""
+    if baseline.get('scale') != report['scale']:
+        print(f"[WARNING] Baseline was recorded at scale {baseline.get('scale')}, this run uses {report['scale']}.")
+    old = {r['message']: r for r in baseline.get('messages', [])}
+    regressions = []
+    for result in report['messages']:
+        before = old.get(result['message'])
+        if not before or not before.get('wall_per_airtime') or not result['wall_per_airtime']:
+            continue
+        growth = result['wall_per_airtime'] / before['wall_per_airtime'] - 1.0
+        if growth > tolerance:
+            regressions.append((result['message'], before['wall_per_airtime'], result['wall_per_airtime'], growth))
+    return regressions
+
+
+def print_report(report):
+    print(f"\n--- Morse Sender Benchmark (scale {report['scale']}, median of {report['repeat']}) ---")
+    print(f"{'message':<26}{'chars':>6}{'airtime':>10}{'wall':>10}{'overhead':>10}{'idle':>9}")
+    for r in report['messages']:
+        print(f"{r['message']:<26}{r['chars']:>6}{r['airtime_s']:>9.2f}s{r['wall_s']:>9.2f}s"
+              f"{r['overhead_pct']:>9.1f}%{r['device_idle_s']:>8.2f}s")
+    print(f"Total: {report['total_wall_s']:.2f}s wall for {report['total_airtime_s']:.2f}s of airtime "
+          f"({report['total_overhead_pct']:.1f}% host overhead)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark morse_sender.py against a simulated Arduino.")
+    parser.add_argument('--scale', type=float, default=1.0, help="Time scale of the simulated Arduino (1.0 = real time).")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per message; the median is reported.")
+    parser.add_argument('--message', action='append', help="Benchmark this message instead of the built-in corpus (repeatable).")
+    parser.add_argument('--transport', action='store_true', help="Send through common.serial_transport, like the real tools.")
+    parser.add_argument('--output', help="Write the JSON report to this file.")
+    parser.add_argument('--baseline', help="Compare against a previously saved report.")
+    parser.add_argument('--save-baseline', help="Save this run's report as the new baseline.")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.message or CORPUS, args.scale, args.repeat, args.transport)
+    print_report(report)
+    if report['transport']:
+        print(f"Transport: {report['transport']}")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Report saved to '{path}'.")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline)
+        if regressions:
+            print("\n--- REGRESSIONS ---")
+            for message, before, after, growth in regressions:
+                print(f"'{message}': wall/airtime {before:.3f} -> {after:.3f} (+{growth * 100:.1f}%)")
+            sys.exit(1)
+        print("\nNo regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# Multi-Channel Morse Broadcaster
+# Drives several Arduinos at once (same or different messages) so multiple LED
+# arrays blink in sync.
+#
+# How it stays in sync:
+#   * Every board is connected (and has finished its reset) BEFORE anything is sent.
+#   * One shared start time is picked a little in the future.
+#   * Each character is sent at start + its precomputed Morse offset (morse_timing.py),
+#     i.e. the clock drives the schedule rather than each board's acknowledgements.
+#   * Each link still has its own flow control: it never sends the next character
+#     before its board has acknowledged the previous one, so no buffer can overflow.
+#
+# Serial I/O is blocking (pyserial), so every link gets its own single-thread
+# executor and the asyncio loop only does the scheduling.
+#
+# Usage:
+#   python morse_broadcaster.py --port COM3 --port COM4 --message "SOS"
+#   python morse_broadcaster.py --link COM3="HELLO" --link COM4="WORLD"
+#   python morse_broadcaster.py --simulate 3 --scale 0.1 --message "TEST"
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from morse_sender import BAUD_RATE, connect_to_arduino
+from morse_timing import char_airtime_ms
+
+START_LEAD_S = 0.5 # Shared start time is this far in the future once all links are ready
+
+
+class MorseLink:
+    """One serial link (one Arduino) with its own message, executor and drift log."""
+
+    def __init__(self, port, message, baud=BAUD_RATE, device=None, time_scale=1.0):
+        self.port = port
+        self.message = message.upper()
+        self.baud = baud
+        self.device = device
+        self.time_scale = time_scale
+        self.send_times = [] # loop time at which each character was written
+        self.drift_ms = []   # actual send time - scheduled send time, per character
+        self.timeouts = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"link-{port}")
+
+    async def connect(self):
+        loop = asyncio.get_running_loop()
+        if self.device is None:
+            self.device = await loop.run_in_executor(self._executor, connect_to_arduino, self.port, self.baud)
+        else:
+            # Simulated boards: swallow the startup messages like connect_to_arduino() does.
+            await loop.run_in_executor(self._executor, self.device.readline)
+            await loop.run_in_executor(self._executor, self.device.readline)
+        return self.device is not None
+
+    def _send_char(self, char):
+        """Blocking: write one character and wait for the board's acknowledgement line."""
+        self.device.write(char.encode('utf-8'))
+        if not self.device.readline():
+            self.timeouts += 1
+
+    async def run(self, start_time):
+        loop = asyncio.get_running_loop()
+        offset_s = 0.0
+        for char in self.message:
+            scheduled = start_time + offset_s
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sent_at = loop.time()
+            self.send_times.append(sent_at)
+            self.drift_ms.append((sent_at - scheduled) * 1000.0)
+            await loop.run_in_executor(self._executor, self._send_char, char)
+            offset_s += char_airtime_ms(char) * self.time_scale / 1000.0
+
+    def close(self):
+        if self.device:
+            self.device.close()
+        self._executor.shutdown(wait=False)
+
+    def stats(self):
+        drift = self.drift_ms or [0.0]
+        return {
+            'port': self.port,
+            'message': self.message,
+            'chars': len(self.drift_ms),
+            'timeouts': self.timeouts,
+            'drift_mean_ms': round(statistics.fmean(drift), 3),
+            'drift_max_ms': round(max(drift), 3),
+            'drift_stdev_ms': round(statistics.pstdev(drift), 3),
+        }
+
+
+def cross_link_skew_ms(links):
+    """For character positions every link sent, how far apart the sends were (max - min)."""
+    count = min((len(link.send_times) for link in links), default=0)
+    return [
+        (max(link.send_times[i] for link in links) - min(link.send_times[i] for link in links)) * 1000.0
+        for i in range(count)
+    ]
+
+
+async def broadcast(links, lead_s=START_LEAD_S):
+    """Connects every link, then starts all messages at one shared time."""
+    ready = await asyncio.gather(*(link.connect() for link in links))
+    failed = [link.port for link, ok in zip(links, ready) if not ok]
+    if failed:
+        raise ConnectionError(f"Could not connect to: {', '.join(failed)}")
+
+    loop = asyncio.get_running_loop()
+    start_time = loop.time() + lead_s
+    print(f"All {len(links)} link(s) ready. Starting in {lead_s:.2f}s...")
+    began = time.perf_counter()
+    await asyncio.gather(*(link.run(start_time) for link in links))
+    return time.perf_counter() - began
+
+
+def print_stats(links, elapsed_s):
+    print(f"\n--- Broadcast complete in {elapsed_s:.2f}s ---")
+    for link in links:
+        s = link.stats()
+        print(f"{s['port']:<10} {s['chars']:>3} chars  drift mean {s['drift_mean_ms']:6.2f} ms  "
+              f"max {s['drift_max_ms']:6.2f} ms  stdev {s['drift_stdev_ms']:5.2f} ms  timeouts {s['timeouts']}")
+    skew = cross_link_skew_ms(links)
+    if len(links) > 1 and skew:
+        print(f"Cross-link skew: mean {statistics.fmean(skew):.2f} ms, max {max(skew):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blink Morse messages on several Arduinos in sync.")
+    parser.add_argument('--port', action='append', default=[], help="Serial port sending --message (repeatable).")
+    parser.add_argument('--message', default='SOS', help="Message for every --port / simulated board.")
+    parser.add_argument('--link', action='append', default=[], metavar='PORT=MESSAGE', help="A port with its own message (repeatable).")
+    parser.add_argument('--baud', type=int, default=BAUD_RATE)
+    parser.add_argument('--simulate', type=int, default=0, metavar='N', help="Use N simulated Arduinos instead of real ports.")
+    parser.add_argument('--scale', type=float, default=1.0, help="Time scale for simulated boards.")
+    args = parser.parse_args()
+
+    links = []
+    if args.simulate:
+        from simulated_arduino import SimulatedArduino
+        for i in range(args.simulate):
+            device = SimulatedArduino(time_scale=args.scale, port=f'SIM{i}')
+            links.append(MorseLink(f'SIM{i}', args.message, device=device, time_scale=args.scale))
+    for port in args.port:
+        links.append(MorseLink(port, args.message, args.baud))
+    for spec in args.link:
+        port, _, message = spec.partition('=')
+        links.append(MorseLink(port, message or args.message, args.baud))
+
+    if not links:
+        parser.error("Give at least one --port, --link or --simulate.")
+
+    try:
+        elapsed = asyncio.run(broadcast(links))
+        print_stats(links, elapsed)
+    except ConnectionError as e:
+        print(f"--- ERROR: {e} ---")
+    except KeyboardInterrupt:
+        print("\nCaught Ctrl+C. Stopping broadcast...")
+    finally:
+        for link in links:
+            link.close()
+
+
+if __name__ == "__main__":
+    main()
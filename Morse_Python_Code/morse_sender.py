@@ -1,10 +1,16 @@
-import serial
+import os
+import sys
 import time
 
+# The shared serial transport lives in the repository's `common` folder.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.serial_transport import SerialTransportError, open_transport
+
 # --- CONFIGURATION ---
-# !!! IMPORTANT: Change this to your Arduino Nano's COM port !!!
-ARDUINO_PORT = 'COM3' 
+# None finds the Arduino Nano by its USB id; set a port (e.g. 'COM3') if several boards are plugged in.
+ARDUINO_PORT = None
 BAUD_RATE = 9600
+STARTUP_TIMEOUT_S = 4.0 # The board resets when the port opens, then prints its startup lines
 # --- END CONFIGURATION ---
 
 # This is the Morse code "dictionary" from the Arduino,
@@ -99,26 +105,68 @@ def estimate_char_time_ms(char):
     pass # No complex timing needed!
 
 def connect_to_arduino(port, baud):
-    """Tries to connect to the Arduino on the specified port."""
-    print(f"Attempting to connect to Arduino on {port} at {baud} baud...")
+    """Tries to connect to the Arduino on the specified port (None: detect it)."""
+    print(f"Attempting to connect to Arduino on {port or 'the detected port'} at {baud} baud...")
     try:
-        ser = serial.Serial(port, baud, timeout=2)
-        time.sleep(2) # Wait for the connection to establish (Arduino resets)
-        print("Connection successful.")
-        # Read any startup messages from the Arduino
-        print(f"Arduino says: {ser.readline().decode('utf-8').strip()}")
-        print(f"Arduino says: {ser.readline().decode('utf-8').strip()}")
+        ser = open_transport(port, baud, timeout=2)
+        print(f"Connection successful ({ser.port}).")
+        # Read the startup messages; they arrive as soon as the board has finished its reset
+        for _ in range(2):
+            print(f"Arduino says: {ser.read_text(STARTUP_TIMEOUT_S)}")
         return ser
-    except serial.SerialException as e:
+    except SerialTransportError as e:
         print(f"\n--- ERROR ---")
-        print(f"Failed to connect to {port}: {e}")
+        print(f"Failed to connect to {port or 'the Arduino'}: {e}")
         print("Please check the following:")
         print("1. Is the Arduino plugged in?")
-        print("2. Is the COM port ('{port}') correct? Check the Arduino IDE.")
+        print(f"2. Is the COM port ('{port}') correct? Check the Arduino IDE.")
         print("3. Is the Serial Monitor in the Arduino IDE *closed*?")
         print("---------------")
         return None
 
+def send_message(arduino, message, verbose=True):
+    """
+    Sends a message one character at a time, waiting for the Arduino after each one.
+    `arduino` is anything with write()/readline(), e.g. the SerialTransport from
+    connect_to_arduino(), serial.Serial or the SimulatedArduino used by morse_benchmark.py.
+    """
+    # Convert the message to uppercase and send it
+    # one character at a time.
+    message = message.upper()
+    
+    for char in message:
+        if verbose:
+            print(f"Sending: '{char}'")
+        
+        # Send the single character as bytes
+        arduino.write(char.encode('utf-8'))
+        
+        # IMPORTANT: This is the flow control.
+        # We wait for the Arduino to send us back its "debug" line
+        # (e.g., "Received: H - Blinking: ....")
+        # This tells us it has *finished* the character.
+        # We set a timeout just in case.
+        
+        # Let's modify the Arduino code to be more robust.
+        # For now, let's just add a simple delay.
+        # The Arduino code from Step 1 has a `delay(letterSpace)` at the end.
+        # Let's just add a *bit* more than that.
+        
+        # New plan: The Arduino code in Step 1 prints a newline
+        # *after* it finishes blinking. We can just wait for that.
+        
+        response = arduino.readline().decode('utf-8').strip()
+        if verbose:
+            print(f"  -> Arduino: {response}")
+        
+        # If the character was a space, the Arduino code
+        # just delays. We'll add a small buffer.
+        if char == ' ':
+            time.sleep(WORD_SPACE / 1000.0)
+        
+        # A small extra pause just in case.
+        time.sleep(0.05) 
+
 def main():
     """Main function to run the text-to-morse sender."""
     
@@ -141,40 +189,7 @@ def main():
                 print("Exiting...")
                 break
 
-            # Convert the message to uppercase and send it
-            # one character at a time.
-            message = message.upper()
-            
-            for char in message:
-                print(f"Sending: '{char}'")
-                
-                # Send the single character as bytes
-                arduino.write(char.encode('utf-8'))
-                
-                # IMPORTANT: This is the flow control.
-                # We wait for the Arduino to send us back its "debug" line
-                # (e.g., "Received: H - Blinking: ....")
-                # This tells us it has *finished* the character.
-                # We set a timeout just in case.
-                
-                # Let's modify the Arduino code to be more robust.
-                # For now, let's just add a simple delay.
-                # The Arduino code from Step 1 has a `delay(letterSpace)` at the end.
-                # Let's just add a *bit* more than that.
-                
-                # New plan: The Arduino code in Step 1 prints a newline
-                # *after* it finishes blinking. We can just wait for that.
-                
-                response = arduino.readline().decode('utf-8').strip()
-                print(f"  -> Arduino: {response}")
-                
-                # If the character was a space, the Arduino code
-                # just delays. We'll add a small buffer.
-                if char == ' ':
-                    time.sleep(WORD_SPACE / 1000.0)
-                
-                # A small extra pause just in case.
-                time.sleep(0.05) 
+            send_message(arduino, message)
 
     except KeyboardInterrupt:
         print("\nCaught Ctrl+C. Exiting...")
@@ -182,6 +197,7 @@ def main():
         print(f"An error occurred: {e}")
     finally:
         if arduino:
+            print(f"Serial stats: {arduino.stats()}")
             arduino.close()
             print("Serial connection closed.")
 
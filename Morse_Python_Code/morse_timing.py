@@ -0,0 +1,87 @@
+# Morse Code Table and Timing Model
+# Mirrors what the Arduino sketch does with each character it receives:
+#
+#   void loop() {
+#     if (Serial.available() > 0) {
+#       blinkMorse(Serial.read()); // dot/dash ON, then partSpace OFF, for every part
+#       delay(letterSpace);
+#     }
+#   }
+#
+# A space is not blinked; the sketch just waits wordSpace (then letterSpace).
+# Timings are precomputed once per character so encoding a message is a lookup.
+
+import numpy as np
+
+# --- Morse Timings (from Arduino code) ---
+BASE_UNIT_MS = 250 # Must match the "baseUnit" in your Arduino code
+DOT_TIME = BASE_UNIT_MS
+DASH_TIME = BASE_UNIT_MS * 3
+PART_SPACE = BASE_UNIT_MS
+LETTER_SPACE = BASE_UNIT_MS * 3
+WORD_SPACE = BASE_UNIT_MS * 7
+
+MORSE_CODE = {
+    'A': '.-', 'B': '-...', 'C': '-.-.', 'D': '-..', 'E': '.', 'F': '..-.',
+    'G': '--.', 'H': '....', 'I': '..', 'J': '.---', 'K': '-.-', 'L': '.-..',
+    'M': '--', 'N': '-.', 'O': '---', 'P': '.--.', 'Q': '--.-', 'R': '.-.',
+    'S': '...', 'T': '-', 'U': '..-', 'V': '...-', 'W': '.--', 'X': '-..-',
+    'Y': '-.--', 'Z': '--..',
+    '1': '.----', '2': '..---', '3': '...--', '4': '....-', '5': '.....',
+    '6': '-....', '7': '--...', '8': '---..', '9': '----.', '0': '-----',
+}
+
+
+def _char_timing(char, base_unit_ms):
+    """Signed durations for one character: positive = LED on, negative = LED off (ms)."""
+    dot, dash = base_unit_ms, base_unit_ms * 3
+    if char == ' ':
+        return (-base_unit_ms * 7, -base_unit_ms * 3)
+    timing = []
+    for part in MORSE_CODE.get(char, ''):
+        timing.append(dot if part == '.' else dash)
+        timing.append(-base_unit_ms) # partSpace
+    timing.append(-base_unit_ms * 3) # letterSpace
+    return tuple(timing)
+
+
+# Precomputed per-character timings and airtimes at the default base unit.
+CHAR_TIMINGS = {char: _char_timing(char, BASE_UNIT_MS) for char in list(MORSE_CODE) + [' ']}
+CHAR_AIRTIME_MS = {char: sum(abs(d) for d in timing) for char, timing in CHAR_TIMINGS.items()}
+UNKNOWN_CHAR_AIRTIME_MS = LETTER_SPACE # The sketch still runs delay(letterSpace)
+
+
+def to_morse(text):
+    """'SOS HELP' -> '... --- ... / .... . .-.. .--.'"""
+    words = text.upper().split()
+    return ' / '.join(' '.join(MORSE_CODE[c] for c in word if c in MORSE_CODE) for word in words)
+
+
+def char_airtime_ms(char, base_unit_ms=BASE_UNIT_MS):
+    """How long the Arduino is busy (blinking + letterSpace) with one character."""
+    char = char.upper()
+    if base_unit_ms == BASE_UNIT_MS:
+        return CHAR_AIRTIME_MS.get(char, UNKNOWN_CHAR_AIRTIME_MS)
+    return sum(abs(d) for d in _char_timing(char, base_unit_ms))
+
+
+def airtime_ms(text, base_unit_ms=BASE_UNIT_MS):
+    """Theoretical time to blink a whole message, with no host overhead at all."""
+    return sum(char_airtime_ms(c, base_unit_ms) for c in text)
+
+
+def timing_array(text, base_unit_ms=BASE_UNIT_MS):
+    """
+    The full on/off schedule for a message as an int32 NumPy array of signed
+    durations in milliseconds (positive = LED on, negative = LED off).
+    """
+    text = text.upper()
+    if base_unit_ms == BASE_UNIT_MS:
+        table = CHAR_TIMINGS
+        unknown = (-UNKNOWN_CHAR_AIRTIME_MS,)
+    else:
+        table = {c: _char_timing(c, base_unit_ms) for c in set(text)}
+        unknown = (-base_unit_ms * 3,)
+    parts = [table.get(c, unknown) for c in text]
+    count = sum(len(p) for p in parts)
+    return np.fromiter((d for p in parts for d in p), dtype=np.int32, count=count)
@@ -0,0 +1,155 @@
+# Simulated Arduino (Morse sketch) for benchmarks and tests
+# A loopback stand-in for serial.Serial that behaves like the Morse sketch:
+#
+#   void loop() {
+#     if (Serial.available() > 0) {
+#       blinkMorse(Serial.read()); // BLOCKS while blinking, then prints its debug line
+#       delay(letterSpace);
+#     }
+#   }
+#
+# It has the same write()/read()/readline()/in_waiting/reset_input_buffer()/close()
+# surface the scripts use, so morse_sender.send_message() runs against it
+# unchanged, directly or wrapped in common.serial_transport.SerialTransport.
+# Every delay can be scaled down with `time_scale` for quick runs. The default read
+# timeout follows the scale too: it covers the slowest character ('0', ~5.75 s at
+# full speed), so no acknowledgement is mistaken for a timeout.
+#
+# The device also keeps books on itself: how long it was blinking (busy) and
+# how long it sat waiting for the host to send the next character (idle).
+# Idle time between characters is pure host overhead.
+
+import queue
+import threading
+import time
+
+from morse_timing import BASE_UNIT_MS, CHAR_TIMINGS, MORSE_CODE, char_airtime_ms
+
+SERIAL_RX_BUFFER = 64 # Bytes the real Arduino can hold before it starts dropping input
+STARTUP_LINES = ("Morse Code Receiver Ready.", "Send characters to blink them.")
+MIN_TIMEOUT_S = 2.0
+
+
+def ack_timeout_s(time_scale=1.0, base_unit_ms=BASE_UNIT_MS):
+    """A read timeout that outlasts the slowest character (blink plus the previous letterSpace), with margin."""
+    slowest_ms = max(char_airtime_ms(char, base_unit_ms) for char in CHAR_TIMINGS)
+    return max(MIN_TIMEOUT_S, 1.5 * slowest_ms * time_scale / 1000.0)
+
+
+class SimulatedArduino:
+    def __init__(self, time_scale=1.0, base_unit_ms=BASE_UNIT_MS, timeout=None, port='SIM'):
+        self.port = port
+        self.timeout = ack_timeout_s(time_scale, base_unit_ms) if timeout is None else timeout
+        self.time_scale = time_scale
+        self.base_unit_ms = base_unit_ms
+        self.is_open = True
+        self._rx = bytearray() # Host -> device bytes waiting in the "serial buffer"
+        self._rx_ready = threading.Condition()
+        self._tx = queue.Queue() # Device -> host lines
+        self._pending_line = b''
+        self.reset_stats()
+        for line in STARTUP_LINES:
+            self._tx.put((line + '\r\n').encode('utf-8'))
+        self._thread = threading.Thread(target=self._run, name=f"sim-arduino-{port}", daemon=True)
+        self._thread.start()
+
+    # --- serial.Serial-like surface ---
+
+    def write(self, data):
+        with self._rx_ready:
+            room = SERIAL_RX_BUFFER - len(self._rx)
+            accepted = bytes(data[:max(room, 0)])
+            self.bytes_dropped += len(data) - len(accepted)
+            self._rx += accepted
+            self._rx_ready.notify()
+        return len(data)
+
+    def read(self, size=1):
+        """Up to `size` bytes of output; waits up to `timeout` for the first, like serial.Serial.read()."""
+        if not self._pending_line:
+            try:
+                self._pending_line = self._tx.get(timeout=self.timeout)
+            except queue.Empty:
+                return b''
+        while len(self._pending_line) < size and not self._tx.empty():
+            self._pending_line += self._tx.get_nowait()
+        data, self._pending_line = self._pending_line[:size], self._pending_line[size:]
+        return data
+
+    def readline(self):
+        if self._pending_line: # Rest of a line read() started on
+            end = self._pending_line.find(b'\n') + 1 or len(self._pending_line)
+            line, self._pending_line = self._pending_line[:end], self._pending_line[end:]
+            return line
+        try:
+            return self._tx.get(timeout=self.timeout)
+        except queue.Empty:
+            return b''
+
+    @property
+    def in_waiting(self):
+        """Output bytes waiting to be read."""
+        return len(self._pending_line) + sum(len(line) for line in list(self._tx.queue))
+
+    def reset_input_buffer(self):
+        self._pending_line = b''
+        while not self._tx.empty():
+            self._tx.get_nowait()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+        with self._rx_ready:
+            self._rx_ready.notify()
+        self._tx.put(b'') # Wakes a reader blocked in read()/readline()
+
+    # --- statistics ---
+
+    def reset_stats(self):
+        self.chars_blinked = 0
+        self.bytes_dropped = 0
+        self.busy_s = 0.0
+        self.idle_s = 0.0
+        self._free_since = None # When the device last became ready for input
+
+    def stats(self):
+        return {
+            'chars_blinked': self.chars_blinked,
+            'bytes_dropped': self.bytes_dropped,
+            'busy_s': self.busy_s,
+            'idle_s': self.idle_s,
+        }
+
+    # --- device loop ---
+
+    def _sleep_ms(self, ms):
+        if ms > 0:
+            time.sleep(ms * self.time_scale / 1000.0)
+
+    def _run(self):
+        while self.is_open:
+            with self._rx_ready:
+                while not self._rx and self.is_open:
+                    self._rx_ready.wait()
+                if not self.is_open:
+                    return
+                char = chr(self._rx.pop(0)).upper()
+
+            start = time.perf_counter()
+            if self._free_since is not None:
+                self.idle_s += start - self._free_since
+
+            # blinkMorse(): on/off parts (a space is just a long pause)
+            timing = CHAR_TIMINGS.get(char, ())
+            unit = self.base_unit_ms / BASE_UNIT_MS
+            for duration in timing[:-1]:
+                self._sleep_ms(abs(duration) * unit)
+            self._tx.put(f"Received: {char} - Blinking: {MORSE_CODE.get(char, '')}\r\n".encode('utf-8'))
+
+            # delay(letterSpace)
+            self._sleep_ms(self.base_unit_ms * 3)
+            self.chars_blinked += 1
+            self.busy_s += time.perf_counter() - start
+            self._free_since = time.perf_counter()
@@ -1,39 +1,35 @@
-import serial
 import time
 import sounddevice as sd
-import vosk
 import queue
 import json
+import os
 import sys
 
+# The shared recognition service lives in the repository's `common` folder.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.model_store import locate_model
+from common.vad import EnergyVAD, RateLimiter
+from common.vosk_service import open_recognizer
+from morse_sender import connect_to_arduino # Same connection (common.serial_transport) as the text sender
+
 # --- CONFIGURATION ---
-# !!! IMPORTANT: Change this to your Arduino Nano's COM port !!!
-ARDUINO_PORT = 'COM3' 
+# None finds the Arduino Nano by its USB id; set a port (e.g. 'COM3') if several boards are plugged in.
+ARDUINO_PORT = None
 BAUD_RATE = 9600
 MODEL_PATH = 'model' # The folder you just downloaded and renamed
 DEVICE_SAMPLERATE = 16000 # Standard sample rate for Vosk models
+# If a shared recognition service is running (python -m common.vosk_service),
+# reuse its warm model instead of loading our own. Set to None to always load locally.
+RECOGNITION_SERVICE = ('127.0.0.1', 2700)
+BLOCK_SIZE = 8000 # Samples per microphone block (0.5 s at 16 kHz)
+# Voice activity gate: skip decoding while the room is silent (big CPU saving on always-on kiosks).
+VAD_ENABLED = True
+VAD_HANGOVER_MS = 800 # Keep listening this long after speech stops before sending
+PARTIAL_RESULTS_PER_SECOND = 2 # How often the "Speaking: ..." line is refreshed
 # --- END CONFIGURATION ---
 
 q = queue.Queue()
 
-def connect_to_arduino(port, baud):
-    """Tries to connect to the Arduino."""
-    print(f"Connecting to Arduino on {port}...")
-    try:
-        ser = serial.Serial(port, baud, timeout=2)
-        time.sleep(2) # Wait for connection
-        print("Connection successful.")
-        ser.reset_input_buffer()
-        # Read Arduino's startup messages
-        print(f"Arduino says: {ser.readline().decode('utf-8').strip()}")
-        print(f"Arduino says: {ser.readline().decode('utf-8').strip()}")
-        return ser
-    except serial.SerialException as e:
-        print(f"\n--- ERROR: Could not connect to Arduino. ---")
-        print(f"Details: {e}")
-        print("Please check: 1. Is it plugged in? 2. Is the COM port correct? 3. Is the Serial Monitor closed?")
-        return None
-
 def send_message_to_arduino(ser, message):
     """Sends a message, char by char, waiting for the Arduino's response."""
     if not ser:
@@ -73,10 +69,13 @@ def main():
         input("Press Enter to exit.")
         return
 
-    # 2. Load Vosk Model
-    print(f"Loading Vosk model from '{MODEL_PATH}'...")
+    # 2. Get a recognizer (from the shared service, or by loading the model once here)
     try:
-        model = vosk.Model(MODEL_PATH)
+        # locate_model() checks the folder (and the other tools' model folders) before Vosk loads it.
+        model_path = locate_model(MODEL_PATH)
+        print(f"Loading Vosk model from '{model_path}'...")
+        lease = open_recognizer(model_path, DEVICE_SAMPLERATE, RECOGNITION_SERVICE)
+        recognizer = lease.recognizer
     except Exception as e:
         print(f"\n--- ERROR: Could not load model. ---")
         print(f"Details: {e}")
@@ -87,6 +86,9 @@ def main():
         return
         
     print("Model loaded successfully.")
+
+    vad = EnergyVAD(DEVICE_SAMPLERATE, BLOCK_SIZE, hangover_ms=VAD_HANGOVER_MS) if VAD_ENABLED else None
+    partial_limiter = RateLimiter(PARTIAL_RESULTS_PER_SECOND)
     
     # 3. Start Audio Stream
     try:
@@ -94,12 +96,9 @@ def main():
         print("Speak into your microphone. Pause to send.")
         print("Say 'exit' or 'quit' to stop.")
         
-        # Create a recognizer object
-        recognizer = vosk.KaldiRecognizer(model, DEVICE_SAMPLERATE)
-        
         # Open the microphone stream
         with sd.RawInputStream(samplerate=DEVICE_SAMPLERATE, 
-                               blocksize=8000, 
+                               blocksize=BLOCK_SIZE, 
                                device=None, # Use default mic
                                dtype='int16',
                                channels=1, 
@@ -108,39 +107,56 @@ def main():
             while True:
                 # Get audio data from the queue (filled by mic_callback)
                 data = q.get()
-                
-                if recognizer.AcceptWaveform(data):
-                    # User paused. Get the "final" result.
-                    result_json = recognizer.FinalResult()
-                    result_dict = json.loads(result_json)
-                    text = result_dict['text']
-                    
+
+                # Silence never reaches the recognizer; speech (plus pre-roll and
+                # hangover) is forwarded, and the end of a segment flushes the result.
+                if vad:
+                    blocks, segment_ended = vad.process(data)
+                else:
+                    blocks, segment_ended = [data], False
+
+                texts = []
+                for block in blocks:
+                    if recognizer.AcceptWaveform(block):
+                        # User paused. Get the "final" result.
+                        texts.append(json.loads(recognizer.FinalResult())['text'])
+                    elif partial_limiter.ready():
+                        # Show partial results as the user is speaking
+                        partial_text = json.loads(recognizer.PartialResult())['partial']
+
+                        # Print on one line, overwriting itself
+                        print(f"Speaking: {partial_text.ljust(50)}", end='\r')
+
+                if segment_ended:
+                    texts.append(json.loads(recognizer.FinalResult())['text'])
+
+                exit_requested = False
+                for text in texts:
                     if text:
                         print(f"\nRecognized: '{text}'")
-                        
+
                         # Check for exit command
                         if text.lower() == 'exit' or text.lower() == 'quit':
                             print("Exit command received. Shutting down.")
+                            exit_requested = True
                             break
-                        
+
                         # Send the recognized text to the Arduino
                         send_message_to_arduino(arduino, text)
                         print("\nListening...")
-                else:
-                    # Show partial results as the user is speaking
-                    result_json = recognizer.PartialResult()
-                    result_dict = json.loads(result_json)
-                    partial_text = result_dict['partial']
-                    
-                    # Print on one line, overwriting itself
-                    print(f"Speaking: {partial_text.ljust(50)}", end='\r')
+                if exit_requested:
+                    break
 
     except KeyboardInterrupt:
         print("\nCaught Ctrl+C. Shutting down...")
     except Exception as e:
         print(f"An error occurred: {e}")
     finally:
+        if vad:
+            print(f"VAD stats: {vad.stats()}")
+        lease.close() # Hand the recognizer back to the pool
         if arduino:
+            print(f"Serial stats: {arduino.stats()}")
             arduino.close()
             print("Serial connection closed.")
 
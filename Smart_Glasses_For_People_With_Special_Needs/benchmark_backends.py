@@ -0,0 +1,145 @@
+# Mook Mitra - Backend Comparison Report
+# Runs every exported version of the sign model on the validation split and
+# compares accuracy, single-image latency and memory (RSS).
+#
+# Accuracy is measured on the validation split; when the dataset cache
+# (dataset_cache.py) is up to date for the data folder, on its hand crops (cut like
+# the live camera cuts them, and read without decoding), otherwise on the files.
+#
+# Each backend is measured in a fresh process, so the memory numbers include
+# the runtime it imports (full TensorFlow vs. the small TFLite interpreter).
+# A backend whose process crashes (e.g. a native runtime aborting) or runs
+# longer than MEASURE_TIMEOUT_S is reported as failed.
+#
+# Usage:
+#   python benchmark_backends.py                      (all model/new_kaggle_model* files)
+#   python benchmark_backends.py --models a.h5 b.tflite --output report.json
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import queue
+import time
+
+import numpy as np
+
+from export_model import DATA_DIR, MODEL_PATH, load_cached_images, load_images, validation_files
+from inference_backends import current_rss_mb
+
+LATENCY_RUNS = 200
+MEASURE_TIMEOUT_S = 600
+
+
+def _measure(model_path, data_dir, use_cache, result_queue):
+    try:
+        rss_start = current_rss_mb()
+        start = time.perf_counter()
+        from inference_backends import load_backend
+        from preprocessing import Preprocessor, load_spec
+        backend = load_backend(model_path)
+        backend.preprocessor = Preprocessor(load_spec(model_path, backend.input_shape))
+        load_s = time.perf_counter() - start
+        rss_loaded = current_rss_mb()
+
+        paths, label_indices, _ = validation_files(data_dir)
+        cache = None
+        if use_cache:
+            from dataset_cache import open_cache
+            cache = open_cache(data_dir)
+        if cache is not None:
+            images, label_indices = load_cached_images(cache, data_dir, paths, label_indices, backend.input_shape,
+                                                       backend.preprocessor.spec)
+        else:
+            images = load_images(paths, backend.input_shape, backend.preprocessor.spec)
+
+        correct = 0
+        for i in range(0, len(images), 32):
+            batch = images[i:i + 32]
+            correct += int((backend.predict(batch).argmax(axis=1) == label_indices[i:i + 32]).sum())
+
+        sample = images[:1]
+        backend.predict(sample) # Warm-up
+        latencies = []
+        for _ in range(LATENCY_RUNS):
+            t = time.perf_counter()
+            backend.predict(sample)
+            latencies.append((time.perf_counter() - t) * 1000.0)
+
+        result_queue.put({
+            'model': model_path,
+            'backend': backend.name,
+            'size_kb': round(os.path.getsize(model_path) / 1024, 1),
+            'accuracy': round(correct / max(len(images), 1), 4),
+            'images': len(images),
+            'images_from': 'cache' if cache is not None else 'files',
+            'load_s': round(load_s, 3),
+            'latency_p50_ms': round(float(np.percentile(latencies, 50)), 3),
+            'latency_p95_ms': round(float(np.percentile(latencies, 95)), 3),
+            'rss_start_mb': round(rss_start, 1),
+            'rss_loaded_mb': round(rss_loaded, 1),
+            'rss_final_mb': round(current_rss_mb(), 1),
+        })
+    except Exception as e:
+        result_queue.put({'model': model_path, 'error': str(e)})
+
+
+def measure_in_fresh_process(model_path, data_dir, use_cache=True, timeout=MEASURE_TIMEOUT_S):
+    context = multiprocessing.get_context('spawn')
+    result_queue = context.Queue()
+    process = context.Process(target=_measure, args=(model_path, data_dir, use_cache, result_queue))
+    process.start()
+    deadline = time.perf_counter() + timeout
+    result = None
+    while result is None:
+        try:
+            result = result_queue.get(timeout=1.0)
+        except queue.Empty:
+            if not process.is_alive():
+                try:
+                    result = result_queue.get(timeout=1.0) # Put just before it exited
+                except queue.Empty:
+                    result = {'model': model_path, 'error': f"process exited with code {process.exitcode}"}
+            elif time.perf_counter() > deadline:
+                process.terminate()
+                result = {'model': model_path, 'error': f"no result after {timeout:.0f}s"}
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare accuracy, latency and memory of the sign model backends.")
+    parser.add_argument('--models', nargs='+', help="Model files to compare (default: every exported version of the model).")
+    parser.add_argument('--data', default=DATA_DIR)
+    parser.add_argument('--output', help="Also write the report as JSON.")
+    parser.add_argument('--no-cache', action='store_true', help="Read the image files even if the dataset cache is up to date.")
+    args = parser.parse_args()
+
+    base = os.path.splitext(MODEL_PATH)[0]
+    models = args.models or sorted(glob.glob(base + '*.h5') + glob.glob(base + '*.tflite') + glob.glob(base + '*.onnx'))
+    if not models:
+        print("[ERROR] No models found. Train with train_with_new_dataset.py and export with export_model.py first.")
+        return
+
+    report = []
+    for model_path in models:
+        print(f"[INFO] Measuring {model_path}...")
+        report.append(measure_in_fresh_process(model_path, args.data, not args.no_cache))
+
+    print(f"\n{'model':<40}{'size':>9}{'acc':>8}{'p50':>9}{'p95':>9}{'RSS':>9}")
+    for r in report:
+        if 'error' in r:
+            print(f"{r['model']:<40} ERROR: {r['error']}")
+            continue
+        print(f"{os.path.basename(r['model']):<40}{r['size_kb']:>7.0f}KB{r['accuracy'] * 100:>7.2f}%"
+              f"{r['latency_p50_ms']:>7.2f}ms{r['latency_p95_ms']:>7.2f}ms{r['rss_final_mb']:>7.0f}MB")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport saved to '{args.output}'.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# Mook Mitra - Hand Detection Benchmark
+# Compares the original full-frame MediaPipe loop with tracking-guided detection
+# (hand_tracker.py) on the same frames.
+#
+# Frames are read into memory first (from a video file or the webcam), so both
+# modes process exactly the same images and the camera speed does not matter.
+#
+# Usage:
+#   python benchmark_hand_tracking.py --video signing.mp4
+#   python benchmark_hand_tracking.py --camera 0 --frames 300 --output report.json
+#   python benchmark_hand_tracking.py --video two_hands.mp4 --max-hands 2
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from hand_tracker import HandTracker
+
+
+def read_frames(source, count):
+    import cv2
+    cap = cv2.VideoCapture(source)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.flip(frame, 1))
+    cap.release()
+    return frames
+
+
+def run_original(frames, hands):
+    """
+    The loop as camera_handler_mediapipe.py originally ran it: flip + convert + full frame
+    every time. The stored frames are already mirrored, so the flip is timed on the side
+    and MediaPipe sees the same images as in the tracked modes.
+    """
+    import cv2
+    detected = 0
+    latencies = []
+    for frame in frames:
+        start = time.perf_counter()
+        cv2.flip(frame, 1) # The original loop's per-frame flip (and its new array), for the timing only
+        results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        detected += bool(results.multi_hand_landmarks)
+    return latencies, detected, {}
+
+
+def run_tracker(frames, hands, tracking, max_hands=1):
+    tracker = HandTracker(hands, tracking=tracking, max_hands=max_hands)
+    detected = 0
+    latencies = []
+    for frame in frames:
+        start = time.perf_counter()
+        found = tracker.process(frame)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        detected += bool(found)
+    return latencies, detected, tracker.stats()
+
+
+def summarize(mode, frames, latencies, detected, extra):
+    latencies = np.array(latencies)
+    return {
+        'mode': mode,
+        'frames': len(frames),
+        'fps': round(len(frames) / (latencies.sum() / 1000.0), 1),
+        'latency_p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'latency_p95_ms': round(float(np.percentile(latencies, 95)), 2),
+        'detection_rate': round(detected / len(frames), 3),
+        **extra,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full-frame and tracking-guided hand detection.")
+    parser.add_argument('--video', help="Video file to use (default: the webcam).")
+    parser.add_argument('--camera', type=int, default=0)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--max-hands', type=int, default=1, help="MediaPipe's max_num_hands for every mode.")
+    parser.add_argument('--output', help="Also write the report as JSON.")
+    args = parser.parse_args()
+
+    import cv2
+    import mediapipe as mp
+
+    frames = read_frames(args.video if args.video else args.camera, args.frames)
+    if not frames:
+        print("[ERROR] Could not read any frames.")
+        return
+    print(f"[INFO] Loaded {len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}.")
+
+    modes = {
+        'original': lambda hands: run_original(frames, hands),
+        'full_frame': lambda hands: run_tracker(frames, hands, tracking=False, max_hands=args.max_hands),
+        'roi_tracking': lambda hands: run_tracker(frames, hands, tracking=True, max_hands=args.max_hands),
+    }
+    report = []
+    for mode, run in modes.items():
+        # A fresh Hands object per mode, so no mode inherits another's tracking state.
+        with mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=args.max_hands,
+                                       min_detection_confidence=0.7) as hands:
+            hands.process(cv2.cvtColor(frames[0], cv2.COLOR_BGR2RGB)) # Warm-up: the first call builds the graph
+            report.append(summarize(mode, frames, *run(hands)))
+
+    print(f"\n{'mode':<14}{'FPS':>8}{'p50':>10}{'p95':>10}{'detected':>10}")
+    for r in report:
+        print(f"{r['mode']:<14}{r['fps']:>8.1f}{r['latency_p50_ms']:>8.2f}ms{r['latency_p95_ms']:>8.2f}ms{r['detection_rate'] * 100:>9.1f}%")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport saved to '{args.output}'.")
+
+
+if __name__ == '__main__':
+    main()
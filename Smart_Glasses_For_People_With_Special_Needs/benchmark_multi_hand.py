@@ -0,0 +1,129 @@
+# Mook Mitra - Multi-Hand Classification Benchmark
+# Measures the classification cost of one camera frame as the number of hands
+# grows, comparing one batched model call per frame (what the camera loop does)
+# with one call per hand (what it used to do). Track association is timed too.
+#
+# The hands are synthetic (random landmarks and crops), so no camera or MediaPipe
+# is needed; only the cost of the model calls is measured. Without a trained
+# landmark classifier, a randomly initialized one of the same size is used.
+#
+# Usage:
+#   python benchmark_multi_hand.py
+#   python benchmark_multi_hand.py --cnn model/new_kaggle_model_int8.tflite --max-hands 4
+#   python benchmark_multi_hand.py --output multi_hand.json
+
+import argparse
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from hand_tracker import HandAssociator
+from landmark_classifier import DEFAULT_MODEL_PATH, FEATURE_SIZE, LandmarkClassifier, landmarks_to_array, normalize_landmarks
+
+NUM_CLASSES = 36
+HIDDEN_UNITS = 128
+
+
+def synthetic_hand(rng, centre_x, centre_y):
+    points = rng.normal(0.0, 0.05, (21, 3)) + (centre_x, centre_y, 0.0)
+    return SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in points])
+
+
+def time_per_frame(run, frames):
+    run() # Warm-up
+    start = time.perf_counter()
+    for _ in range(frames):
+        run()
+    return (time.perf_counter() - start) * 1000.0 / frames
+
+
+def landmark_runs(model, hands):
+    points = np.empty((len(hands), 21, 3), dtype=np.float32)
+    features = np.empty((len(hands), FEATURE_SIZE), dtype=np.float32)
+
+    def batched():
+        for i, hand in enumerate(hands):
+            landmarks_to_array(hand, out=points[i])
+        model.predict(normalize_landmarks(points, out=features))
+
+    def per_hand():
+        for i, hand in enumerate(hands):
+            model.predict_one(normalize_landmarks(landmarks_to_array(hand, out=points[i])))
+
+    return batched, per_hand
+
+
+def cnn_runs(model, crops):
+    return (lambda: model.predict_images(crops)), (lambda: [model.predict_image(crop) for crop in crops])
+
+
+def association_run(hands):
+    associator = HandAssociator()
+    return lambda: associator.update(hands)
+
+
+def benchmark(name, make_runs, max_hands, frames, rng, crop_size=96):
+    rows = []
+    for count in range(1, max_hands + 1):
+        hands = [synthetic_hand(rng, (i + 1) / (count + 1), 0.5) for i in range(count)]
+        crops = [rng.integers(0, 256, (crop_size, crop_size, 3), dtype=np.uint8) for _ in range(count)]
+        batched, per_hand = make_runs(hands, crops)
+        rows.append({
+            'classifier': name,
+            'hands': count,
+            'batched_ms': round(time_per_frame(batched, frames), 3),
+            'per_hand_ms': round(time_per_frame(per_hand, frames), 3),
+            'association_ms': round(time_per_frame(association_run(hands), frames), 4),
+        })
+    for row in rows:
+        row['batched_vs_one_hand'] = round(row['batched_ms'] / rows[0]['batched_ms'], 2)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame classification cost versus number of hands.")
+    parser.add_argument('--max-hands', type=int, default=4)
+    parser.add_argument('--frames', type=int, default=500, help="Timed frames per measurement.")
+    parser.add_argument('--cnn', help="Also benchmark this sign model file (any backend ml_processor can load).")
+    parser.add_argument('--output', help="Also write the report as JSON.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if os.path.exists(DEFAULT_MODEL_PATH):
+        landmark_model = LandmarkClassifier.load(DEFAULT_MODEL_PATH)
+        print(f"[INFO] Using the trained landmark classifier ({landmark_model.kind}).")
+    else:
+        landmark_model = LandmarkClassifier('mlp', [str(i) for i in range(NUM_CLASSES)], {
+            'w1': rng.normal(0, 0.1, (FEATURE_SIZE, HIDDEN_UNITS)), 'b1': np.zeros(HIDDEN_UNITS),
+            'w2': rng.normal(0, 0.1, (HIDDEN_UNITS, NUM_CLASSES)), 'b2': np.zeros(NUM_CLASSES),
+        })
+        print("[INFO] No trained landmark classifier found; timing a random one of the same size.")
+
+    report = benchmark('landmarks', lambda hands, crops: landmark_runs(landmark_model, hands),
+                       args.max_hands, args.frames, rng)
+    if args.cnn:
+        from ml_processor import load_model
+        model = load_model(args.cnn)
+        if model is None:
+            print(f"[ERROR] Could not load '{args.cnn}'; skipping the CNN benchmark.")
+        else:
+            report += benchmark(model.backend.name, lambda hands, crops: cnn_runs(model, crops),
+                                args.max_hands, max(args.frames // 10, 20), rng)
+
+    print(f"\n{'classifier':<14}{'hands':>6}{'batched':>12}{'per hand':>12}{'vs 1 hand':>11}{'assoc.':>10}")
+    for r in report:
+        print(f"{r['classifier']:<14}{r['hands']:>6}{r['batched_ms']:>10.3f}ms{r['per_hand_ms']:>10.3f}ms"
+              f"{r['batched_vs_one_hand']:>10.2f}x{r['association_ms']:>8.4f}ms")
+    print("\nA 'vs 1 hand' figure below the hand count means the batched cost grows sub-linearly.")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to '{args.output}'.")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,135 +1,258 @@
 # Mook Mitra - Camera Handler (MediaPipe Version)
-# FINAL, DEFINITIVE VERSION: Connects directly to index 0 with enhanced diagnostics.
+# Reads the best camera found by common.camera_discovery (cached after the first run)
+# through common.frame_source, which recycles the frame buffers.
 
-def start_camera():
+# Landmark predictions below this confidence are ignored (treated like no prediction).
+LANDMARK_MIN_CONFIDENCE = 0.6
+# A letter is accepted once it wins STABILITY_THRESHOLD of the predictions made in the
+# last STABILITY_WINDOW_S seconds, however fast the classifier runs. A frame whose hands
+# give no confident result votes 'blank'. BUFFER_SIZE only caps the number of votes kept.
+STABILITY_WINDOW_S, STABILITY_THRESHOLD = 0.7, 0.8
+BUFFER_SIZE = 120
+# Hands tracked per frame; many ISL letters use both.
+MAX_HANDS = 2
+
+def load_classifier(classifier='cnn', model_path=None, max_hands=MAX_HANDS):
+    """
+    Loads the model for `classifier` ('cnn', 'landmarks' or 'temporal'; see start_camera)
+    and returns (classify, on_tracks_ended) for SignPipeline, or None if it cannot be loaded.
+    classify(frame, hands) classifies all of a frame's hands in one call.
+    """
+    import numpy as np
+    from ml_processor import load_model, predict_rois
+
+    on_tracks_ended = None
+    if classifier == 'temporal':
+        from landmark_classifier import landmarks_to_array, normalize_landmarks
+        from temporal_model import DEFAULT_MODEL_PATH, StreamingTemporalClassifier
+        print("[INFO] Loading temporal sign model...")
+        try:
+            temporal_model = StreamingTemporalClassifier.load(DEFAULT_MODEL_PATH)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[ERROR] Failed to load the temporal model from '{DEFAULT_MODEL_PATH}': {e}")
+            return None
+        landmark_points = np.empty((max_hands, 21, 3), dtype=np.float32)
+        landmark_features = np.empty((max_hands, landmark_points.shape[1] * 3), dtype=np.float32)
+        track_models = {} # Track id -> streaming state for that hand (weights are shared)
+        print(f"[INFO] Temporal model loaded successfully ({temporal_model.window}-frame window).")
+
+        def classify(frame, hands_found):
+            for i, (_, hand_landmarks, _) in enumerate(hands_found):
+                landmarks_to_array(hand_landmarks, out=landmark_points[i])
+            features = normalize_landmarks(landmark_points[:len(hands_found)], out=landmark_features[:len(hands_found)])
+            results = []
+            for (track_id, _, _), hand_features in zip(hands_found, features):
+                if track_id not in track_models:
+                    track_models[track_id] = temporal_model.clone()
+                result = track_models[track_id].step(hand_features) # None until a full window has been seen
+                results.append(result if result and result[1] >= LANDMARK_MIN_CONFIDENCE else None)
+            return results
+
+        # A sign starts over whenever its hand leaves the view.
+        def on_tracks_ended(track_ids):
+            for track_id in track_ids:
+                track_models.pop(track_id, None)
+    elif classifier == 'landmarks':
+        from landmark_classifier import DEFAULT_MODEL_PATH, LandmarkClassifier, landmarks_to_array, normalize_landmarks
+        print("[INFO] Loading landmark classifier...")
+        try:
+            landmark_model = LandmarkClassifier.load(DEFAULT_MODEL_PATH)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[ERROR] Failed to load the landmark classifier from '{DEFAULT_MODEL_PATH}': {e}")
+            return None
+        landmark_points = np.empty((max_hands, 21, 3), dtype=np.float32)
+        landmark_features = np.empty((max_hands, landmark_points.shape[1] * 3), dtype=np.float32)
+        print(f"[INFO] Landmark classifier ({landmark_model.kind}) loaded successfully.")
+
+        def classify(frame, hands_found):
+            for i, (_, hand_landmarks, _) in enumerate(hands_found):
+                landmarks_to_array(hand_landmarks, out=landmark_points[i])
+            features = normalize_landmarks(landmark_points[:len(hands_found)], out=landmark_features[:len(hands_found)])
+            predictions, confidences = landmark_model.predict(features) # All hands in one call
+            return [(prediction, float(confidence)) if confidence >= LANDMARK_MIN_CONFIDENCE else None
+                    for prediction, confidence in zip(predictions, confidences)]
+    else:
+        # Loaded once per process and shared by every session (see ml_processor.py).
+        print(f"[INFO] Loading sign model{f' from {model_path!r}' if model_path else ''}...")
+        model = load_model(model_path)
+        if model is None:
+            print("[ERROR] Failed to load the Sign Language ML model.")
+            return None
+        print(f"[INFO] {model.backend.name} model ready (input {model.input_shape}).")
+
+        def classify(frame, hands_found):
+            rois, owners = [], []
+            for i, (_, _, (x_min, y_min, x_max, y_max)) in enumerate(hands_found):
+                hand_roi = frame[y_min:y_max, x_min:x_max]
+                if hand_roi.size:
+                    rois.append(hand_roi)
+                    owners.append(i)
+            # Two-handed signs: the training images show both hands, so the crop around
+            # all of them goes into the same batch, and wins wherever it is more confident.
+            if len(rois) > 1:
+                x_min = min(bbox[0] for _, _, bbox in hands_found)
+                y_min = min(bbox[1] for _, _, bbox in hands_found)
+                x_max = max(bbox[2] for _, _, bbox in hands_found)
+                y_max = max(bbox[3] for _, _, bbox in hands_found)
+                rois.append(frame[y_min:y_max, x_min:x_max])
+            results = [None] * len(hands_found)
+            batch_results = predict_rois(model, rois)
+            for i, result in zip(owners, batch_results):
+                results[i] = result
+            if len(rois) > 1:
+                both = batch_results[-1]
+                results = [both if result is None or both[1] > result[1] else result for result in results]
+            return results
+
+    return classify, on_tracks_ended
+
+def start_camera(classifier='cnn', model_path=None, roi_tracking=True, frame_sink=None, commands=None, max_hands=MAX_HANDS):
     """
-    Initializes webcam directly at index 0 and uses MediaPipe for robust hand tracking.
+    Opens the best webcam (see common/camera_discovery.py; set CAMERA_INDEX to force one)
+    and uses MediaPipe for robust hand tracking.
+    classifier='cnn' runs the sign model on the cropped hand image;
+    classifier='landmarks' classifies MediaPipe's landmark coordinates directly (much faster).
+    classifier='temporal' recognizes dynamic signs and words from the last second of
+    landmarks (see temporal_model.py).
+    model_path runs the CNN through an exported backend instead, e.g.
+    'model/new_kaggle_model_int8.tflite' (see export_model.py).
+    roi_tracking runs MediaPipe on a small region around the last known hand
+    instead of the full frame (see hand_tracker.py); set it to False to compare.
+    Up to max_hands hands are tracked. All hands of a frame are classified in one
+    batched model call, and each keeps its own track id (and temporal state).
+
+    Embedded mode (used by the GUI): with frame_sink, no OpenCV window is opened.
+    Every annotated BGR frame is passed to frame_sink(frame, sentence) instead,
+    and keys are read from `commands` (a queue of 'q', 's' or 'c'). This lets the
+    whole session run on a worker thread while the GUI stays responsive.
     """
     # --- Just-in-Time Imports ---
     import cv2
-    import numpy as np
     import mediapipe as mp
-    import time
-    from ml_processor import load_model, predict_sign
-    from text_to_speech_handler import speak
+    import numpy as np
+    import os
+    import queue
+    import sys
+    from tts_worker import speak
+    from sign_pipeline import SignPipeline
+    from stabilizer import PredictionStabilizer, SentenceBuilder
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+    from common.frame_source import CameraSource, FrameSourceError
 
     hands = None
-    cap = None
+    source = None
+    pipeline = None
     
     try:
         # --- Initialize MediaPipe Hands ---
         print("[INFO] Initializing MediaPipe Hands...")
         mp_hands = mp.solutions.hands
-        hands = mp_hands.Hands(static_image_mode=False, max_num_hands=1, min_detection_confidence=0.7)
+        hands = mp_hands.Hands(static_image_mode=False, max_num_hands=max_hands, min_detection_confidence=0.7)
         mp_drawing = mp.solutions.drawing_utils
         print("[INFO] MediaPipe Hands initialized successfully.")
 
         # --- Model Loading ---
-        print("[INFO] Loading Keras model...")
-        model = load_model()
-        if model is None:
-            print("[ERROR] Failed to load the Sign Language ML model.")
+        loaded = load_classifier(classifier, model_path, max_hands)
+        if loaded is None:
             return "Model loading error."
-        print("[INFO] Keras model loaded successfully.")
-
-        # --- Direct Camera Initialization ---
-        camera_index = 0
-        print(f"[INFO] Attempting to open webcam at index {camera_index}...")
-        cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
-        
-        if not cap.isOpened():
-            print(f"[ERROR] CRITICAL: Could not open webcam at index {camera_index}.")
-            return f"Camera connection error at index {camera_index}."
-        
-        # --- CRITICAL FIX: Give the camera 1 second to initialize ---
-        print("[INFO] Webcam opened. Waiting 1 second for driver to initialize...")
-        time.sleep(1.0)
-        print("[INFO] Initialization complete. Starting main video loop.")
-
-        sentence, live_prediction, last_spoken_prediction, last_prediction_for_sentence = "", "", "", ""
-        prediction_buffer = []
-        BUFFER_SIZE, STABILITY_THRESHOLD = 20, 0.8
-        current_prediction = "blank"
+        classify, on_tracks_ended = loaded
+
+        # --- Camera Initialization ---
+        # The cached best camera opens at once; the first run (or a changed setup)
+        # probes all devices in parallel. The camera is open only once its first
+        # frame has arrived, so no fixed wait for the driver is needed.
+        try:
+            source = CameraSource(flip=True) # Mirrored in place for the preview
+        except FrameSourceError as e:
+            print(f"[ERROR] CRITICAL: {e} Run 'python camera_test.py' for details.")
+            return "Camera connection error: no working camera found."
+        camera = source.camera
+        print(f"[INFO] Webcam {camera.index} ready ({camera.width}x{camera.height}). Starting main video loop.")
+
+        live_prediction = ""
+        stabilizer = PredictionStabilizer(size=BUFFER_SIZE, threshold=STABILITY_THRESHOLD, window_s=STABILITY_WINDOW_S)
+        sentence = SentenceBuilder()
+
+        # Capture, MediaPipe and classification run on their own threads;
+        # this loop only draws and handles the keyboard, so it keeps up with the camera.
+        pipeline = SignPipeline(source, hands, classify, on_tracks_ended, roi_tracking, max_hands).start()
+        last_frame_seq, last_prediction_seq = -1, -1
+        prediction_age_ms = 0.0
+        hand_labels = {} # Track id -> latest label, drawn next to each hand
+        frame = None # Drawing buffer, reused every frame
 
         # --- Main Loop ---
         while True:
-            ret, frame = cap.read()
-            if not ret:
-                print("[WARNING] Could not read a frame from the camera. Ending session.")
-                break
+            packet = pipeline.frames.get(after=last_frame_seq, timeout=1.0)
+            if packet is None:
+                if pipeline.stopped.is_set():
+                    break
+                continue
+            last_frame_seq = packet.seq
+            # Drawn on a copy: the worker stages still read the original.
+            if frame is None or frame.shape != packet.frame.shape:
+                frame = np.empty_like(packet.frame)
+            np.copyto(frame, packet.frame)
 
-            frame = cv2.flip(frame, 1)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = hands.process(frame_rgb)
-
-            if results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
+            # Overlay the newest landmarks (they may belong to a frame or two ago).
+            landmarks = pipeline.landmarks.peek()
+            if landmarks:
+                for track_id, hand_landmarks, (x_min, y_min, x_max, y_max) in landmarks.hands:
                     mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+                    cv2.rectangle(frame, (x_min, y_min), (x_max, y_max), (0, 255, 0), 2)
+                    cv2.putText(frame, f"#{track_id} {hand_labels.get(track_id, '')}", (x_min, max(y_min - 8, 12)),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2, cv2.LINE_AA)
 
-                    h, w, _ = frame.shape
-                    x_coords = [landmark.x for landmark in hand_landmarks.landmark]
-                    y_coords = [landmark.y for landmark in hand_landmarks.landmark]
-                    
-                    x_min, x_max = int(min(x_coords) * w), int(max(x_coords) * w)
-                    y_min, y_max = int(min(y_coords) * h), int(max(y_coords) * h)
-                    
-                    padding = 30
-                    x_min, y_min = max(0, x_min - padding), max(0, y_min - padding)
-                    x_max, y_max = min(w, x_max + padding), min(h, y_max + padding)
+            # Each prediction enters the stability buffer exactly once.
+            prediction = pipeline.predictions.get(after=last_prediction_seq, timeout=0)
+            if prediction is not None:
+                last_prediction_seq = prediction.seq
+                prediction_age_ms = prediction.age_ms
+                hand_labels = {track_id: label for track_id, label, _, _ in prediction.hands}
+                current_prediction = prediction.label
+                if current_prediction != 'blank':
+                    live_prediction = current_prediction
 
-                    cv2.rectangle(frame, (x_min, y_min), (x_max, y_max), (0, 255, 0), 2)
-                    
-                    hand_roi = frame[y_min:y_max, x_min:x_max]
-                    
-                    if hand_roi.size > 0:
-                        gray_roi = cv2.cvtColor(hand_roi, cv2.COLOR_BGR2GRAY)
-                        resized_roi = cv2.resize(gray_roi, (128, 128))
-                        normalized_roi = resized_roi / 255.0
-                        prediction = predict_sign(model, normalized_roi)
-                        if prediction:
-                            current_prediction = prediction
-                            live_prediction = prediction
-            else:
-                current_prediction = "blank"
-
-            prediction_buffer.append(current_prediction)
-            if len(prediction_buffer) > BUFFER_SIZE: prediction_buffer.pop(0)
-            
-            if len(prediction_buffer) == BUFFER_SIZE:
-                stable_prediction = max(set(prediction_buffer), key=prediction_buffer.count)
-                stability = prediction_buffer.count(stable_prediction) / BUFFER_SIZE
-
-                if stability >= STABILITY_THRESHOLD and stable_prediction != 'blank':
-                    if stable_prediction != last_spoken_prediction:
-                        speak(stable_prediction)
-                        last_spoken_prediction = stable_prediction
-                    if stable_prediction != last_prediction_for_sentence:
-                        sentence += stable_prediction
-                        last_prediction_for_sentence = stable_prediction
-                else:
-                    last_spoken_prediction, last_prediction_for_sentence = "", ""
-
-            cv2.putText(frame, f"Sentence: {sentence}", (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
+                stable_prediction, _ = stabilizer.update(current_prediction, prediction.confidence, prediction.timestamp)
+                if stabilizer.ready:
+                    new_letter = sentence.feed(stable_prediction)
+                    if new_letter:
+                        speak(new_letter)
+
+            cv2.putText(frame, f"Sentence: {sentence.sentence}", (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
             cv2.putText(frame, f"Prediction: {live_prediction}", (20, frame.shape[0] - 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
-            cv2.imshow('Mook Mitra - MediaPipe Hand Tracking', frame)
+            cv2.putText(frame, f"Lag: {prediction_age_ms:.0f} ms", (20, frame.shape[0] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1, cv2.LINE_AA)
+            if frame_sink is None:
+                cv2.imshow('Mook Mitra - MediaPipe Hand Tracking', frame)
+                key = cv2.waitKey(1) & 0xFF
+            else:
+                frame_sink(frame, sentence.sentence)
+                try:
+                    key = ord(commands.get_nowait()) if commands else -1
+                except queue.Empty:
+                    key = -1
 
-            key = cv2.waitKey(1) & 0xFF
             if key == ord('q'): break
-            elif key == ord('s'): sentence += " "; speak("space")
+            elif key == ord('s'): sentence.add_space(); speak("space")
             elif key == ord('c'):
-                sentence, live_prediction, last_spoken_prediction, last_prediction_for_sentence = "", "", "", ""
-                prediction_buffer.clear(); speak("cleared")
+                sentence.clear(); live_prediction = ""
+                stabilizer.clear(); speak("cleared", interrupt=True)
 
     except Exception as e:
         print(f"[ERROR] An unexpected error occurred in the camera loop: {e}")
         return f"Runtime error: {e}"
     finally:
         print("[INFO] Releasing camera and closing all windows.")
+        if pipeline:
+            pipeline.stop()
+            pipeline.join()
+            print(f"[INFO] Pipeline stats: {pipeline.stats()}")
         if hands:
             hands.close()
-        if cap:
-            cap.release()
-        cv2.destroyAllWindows()
+        if source:
+            source.close()
+        if frame_sink is None:
+            cv2.destroyAllWindows()
     
-    return sentence
+    return sentence.sentence
 
@@ -0,0 +1,284 @@
+# Mook Mitra - Preprocessed Dataset Cache
+# Runs MediaPipe over the Kaggle ISL folders (data/A, data/B, ..., data/0, ...) ONCE
+# and stores the results as memory-mappable NumPy arrays:
+#
+#   data_cache/hands/crops.npy          uint8 (N, CROP_SIZE, CROP_SIZE, 3)  BGR hand crops, cut like the live camera does
+#   data_cache/hands/landmarks.npy      float32 (N, 21, 3)                 MediaPipe landmarks (image-normalized)
+#   data_cache/hands/has_hand.npy       bool (N,)                          False: no hand found, crop is the whole image
+#   data_cache/hands/label_indices.npy  int16 (N,)
+#   data_cache/hands/manifest.json      file -> row, SHA-1, size and mtime; class labels
+#
+# Updating is incremental: files whose size and mtime are unchanged are trusted,
+# other files are hashed and only new or changed images go through MediaPipe
+# (in a process pool). Deleted images are dropped; unreadable ones are kept in the
+# manifest without a row, so they are not retried until they change. Loading maps
+# the arrays read-only, so it takes well under a second whatever the dataset size.
+#
+# The manifest is what makes a cache valid: an update removes it first, swaps in
+# the new arrays and writes the new manifest last (atomically), so an interrupted
+# update leaves no manifest and the next run starts from scratch. Loading also
+# checks that every array has one row per manifest entry.
+#
+# Consumers: train_landmark_classifier.py builds/updates the cache and trains on
+# the landmarks; export_model.py (int8 calibration) and benchmark_backends.py
+# (accuracy) read the hand crops through open_cache(), which only returns a cache
+# that is up to date for the data folder and never runs MediaPipe itself.
+#
+# Usage:
+#   python dataset_cache.py                 (build or update the cache for data/)
+#   python dataset_cache.py --workers 8
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+DATA_DIR = 'data'
+CACHE_DIR = os.path.join('data_cache', 'hands')
+CROP_SIZE = 64
+CROP_PADDING = 30 # Pixels around the landmarks, as hand_bounding_box() uses live
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+MANIFEST_VERSION = 1
+_ARRAYS = ('crops', 'landmarks', 'has_hand', 'label_indices')
+
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def list_images(data_dir=DATA_DIR):
+    """(relative paths, label per path, sorted labels); labels are the class folder names."""
+    labels = sorted(d for d in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, d)))
+    paths, path_labels = [], []
+    for label in labels:
+        for name in sorted(os.listdir(os.path.join(data_dir, label))):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(f"{label}/{name}")
+                path_labels.append(label)
+    return paths, path_labels, labels
+
+
+# --- Worker processes ---
+_hands = None
+
+
+def _init_worker():
+    global _hands
+    import mediapipe as mp
+    _hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.5)
+
+
+def _process_image(job):
+    """Returns (relative path, crop, landmarks or None), or (relative path, None, None) if unreadable."""
+    import cv2
+    from sign_pipeline import hand_bounding_box
+    data_dir, relpath = job
+    image = cv2.imread(os.path.join(data_dir, relpath))
+    if image is None:
+        return relpath, None, None
+    results = _hands.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    if not results.multi_hand_landmarks:
+        return relpath, cv2.resize(image, (CROP_SIZE, CROP_SIZE)), None
+    hand_landmarks = results.multi_hand_landmarks[0]
+    h, w = image.shape[:2]
+    x_min, y_min, x_max, y_max = hand_bounding_box(hand_landmarks, w, h, CROP_PADDING)
+    crop = image[y_min:y_max, x_min:x_max]
+    if crop.size == 0:
+        crop = image
+    points = np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32)
+    return relpath, cv2.resize(crop, (CROP_SIZE, CROP_SIZE)), points
+
+
+class DatasetCache:
+    """Read-only view of a built cache. Arrays are memory-mapped, rows follow `paths`."""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        with open(os.path.join(cache_dir, 'manifest.json'), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.labels = self.manifest['labels']
+        entries = sorted(((path, entry) for path, entry in self.manifest['entries'].items() if entry['row'] is not None),
+                         key=lambda item: item[1]['row'])
+        self.paths = [path for path, _ in entries]
+        self._rows = {path: row for row, path in enumerate(self.paths)}
+        for name in _ARRAYS:
+            array = np.load(os.path.join(cache_dir, f'{name}.npy'), mmap_mode='r')
+            if len(array) != len(self.paths):
+                raise ValueError(f"Dataset cache '{cache_dir}' is inconsistent: {name}.npy has {len(array)} rows, "
+                                 f"the manifest lists {len(self.paths)} images.")
+            setattr(self, name, array)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def row(self, path):
+        """Row of a 'label/name' path, or None if the cache has none (unknown or unreadable image)."""
+        return self._rows.get(path)
+
+    def landmark_features(self):
+        """(features, label_indices) of the images with a hand, as the 63-float vectors landmark_classifier uses."""
+        from landmark_classifier import normalize_landmarks
+        rows = np.flatnonzero(self.has_hand)
+        return normalize_landmarks(np.array(self.landmarks[rows])), np.array(self.label_indices[rows], dtype=int)
+
+
+def _load_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != MANIFEST_VERSION or manifest.get('crop_size') != CROP_SIZE:
+        return None
+    return manifest
+
+
+def open_cache(data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    """
+    The built cache for `data_dir` if it matches the folder as it is now (same files,
+    sizes and mtimes), else None. Costs one stat per image; use build() to update.
+    """
+    manifest = _load_manifest(cache_dir)
+    if not manifest or manifest.get('data_dir') != os.path.abspath(data_dir):
+        return None
+    paths, _, labels = list_images(data_dir)
+    entries = manifest['entries']
+    if labels != manifest['labels'] or len(paths) != len(entries):
+        return None
+    for path in paths:
+        entry = entries.get(path)
+        stat = os.stat(os.path.join(data_dir, path))
+        if entry is None or entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime:
+            return None
+    try:
+        return DatasetCache(cache_dir)
+    except (OSError, ValueError):
+        return None
+
+
+def build(data_dir=DATA_DIR, cache_dir=CACHE_DIR, workers=None):
+    """Builds or incrementally updates the cache and returns it loaded (DatasetCache)."""
+    start = time.perf_counter()
+    paths, path_labels, labels = list_images(data_dir)
+    old_manifest = _load_manifest(cache_dir)
+    old_arrays = None
+    if old_manifest:
+        try:
+            old_arrays = DatasetCache(cache_dir)
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] {e} Rebuilding it.")
+            old_manifest = None
+    old_entries = old_manifest['entries'] if old_manifest else {}
+
+    # Decide per file: reuse its old row, or run it through MediaPipe.
+    entries, reused, todo = {}, {}, []
+    for path in paths:
+        full_path = os.path.join(data_dir, path)
+        stat = os.stat(full_path)
+        old = old_entries.get(path)
+        if old and old['size'] == stat.st_size and old['mtime'] == stat.st_mtime:
+            sha1 = old['sha1'] # Unchanged on disk; skip hashing
+        else:
+            sha1 = file_sha1(full_path)
+        entries[path] = {'sha1': sha1, 'size': stat.st_size, 'mtime': stat.st_mtime}
+        if old and old['sha1'] == sha1:
+            reused[path] = old['row'] # None: known to be unreadable
+        else:
+            todo.append(path)
+    removed = len(set(old_entries) - set(entries))
+
+    if not todo and not removed and old_manifest and old_manifest['labels'] == labels:
+        print(f"[INFO] Dataset cache is up to date ({len(paths)} images).")
+        return old_arrays
+
+    print(f"[INFO] Dataset cache: {len(reused)} images reused, {len(todo)} to process, {removed} removed.")
+    results = {}
+    if todo:
+        with multiprocessing.Pool(workers or os.cpu_count(), initializer=_init_worker) as pool:
+            jobs = [(data_dir, path) for path in todo]
+            for i, (path, crop, points) in enumerate(pool.imap_unordered(_process_image, jobs, chunksize=16), 1):
+                results[path] = (crop, points)
+                if i % 500 == 0 or i == len(todo):
+                    print(f"[INFO] Processed {i}/{len(todo)} images...")
+
+    # Write the new arrays next to the old ones, then swap them in.
+    keep = [path for path in paths
+            if reused.get(path) is not None or results.get(path, (None,))[0] is not None]
+    os.makedirs(cache_dir, exist_ok=True)
+    shapes = {
+        'crops': ((len(keep), CROP_SIZE, CROP_SIZE, 3), np.uint8),
+        'landmarks': ((len(keep), 21, 3), np.float32),
+        'has_hand': ((len(keep),), np.bool_),
+        'label_indices': ((len(keep),), np.int16),
+    }
+    new_arrays = {name: np.lib.format.open_memmap(os.path.join(cache_dir, f'{name}.npy.tmp'), mode='w+',
+                                                  dtype=dtype, shape=shape)
+                  for name, (shape, dtype) in shapes.items()}
+    label_index = {label: i for i, label in enumerate(labels)}
+    path_label = dict(zip(paths, path_labels))
+    for path in paths:
+        entries[path]['row'] = None # Unreadable, unless given a row below
+    for row, path in enumerate(keep):
+        if reused.get(path) is not None:
+            old_row = reused[path]
+            for name in ('crops', 'landmarks', 'has_hand'):
+                new_arrays[name][row] = getattr(old_arrays, name)[old_row]
+        else:
+            crop, points = results[path]
+            new_arrays['crops'][row] = crop
+            new_arrays['has_hand'][row] = points is not None
+            new_arrays['landmarks'][row] = points if points is not None else 0.0
+        new_arrays['label_indices'][row] = label_index[path_label[path]]
+        entries[path]['row'] = row
+
+    for array in new_arrays.values():
+        array.flush()
+    del new_arrays, old_arrays # Release the memory maps before replacing the files (required on Windows)
+    manifest_path = os.path.join(cache_dir, 'manifest.json')
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path) # The old manifest must never describe the new arrays
+    for name in _ARRAYS:
+        os.replace(os.path.join(cache_dir, f'{name}.npy.tmp'), os.path.join(cache_dir, f'{name}.npy'))
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'crop_size': CROP_SIZE,
+        'data_dir': os.path.abspath(data_dir),
+        'labels': labels,
+        'entries': entries,
+    }
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(manifest_path + '.tmp', manifest_path) # Last: only now is the new cache valid
+
+    skipped = len(paths) - len(keep)
+    print(f"[INFO] Dataset cache written: {len(keep)} images ({skipped} unreadable) in {time.perf_counter() - start:.1f}s.")
+    return DatasetCache(cache_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or update the preprocessed Mook Mitra dataset cache.")
+    parser.add_argument('--data', default=DATA_DIR)
+    parser.add_argument('--cache', default=CACHE_DIR)
+    parser.add_argument('--workers', type=int, help="MediaPipe worker processes (default: one per CPU).")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.data):
+        print(f"[ERROR] Data directory not found at '{args.data}'.")
+        return
+
+    cache = build(args.data, args.cache, args.workers)
+    start = time.perf_counter()
+    DatasetCache(args.cache)
+    print(f"[INFO] {len(cache)} images, {int(np.count_nonzero(cache.has_hand))} with a detected hand. "
+          f"Loading the cache takes {time.perf_counter() - start:.3f}s.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+# Mook Mitra - Offline Sign Recognition Evaluation
+# Runs labeled recordings through the same stages as the live camera - MediaPipe
+# (hand_tracker.py), the classifier from camera_handler_mediapipe.load_classifier()
+# and the stabilizer/sentence rules (stabilizer.py) - without a webcam or a window.
+#
+# Clips live in one folder per expected output; the folder name is what the
+# stabilized sentence should contain:
+#   eval_clips/A/take1.mp4
+#   eval_clips/A/take2/0001.jpg, 0002.jpg, ...   (an image sequence, at --image-fps)
+#   eval_clips/HELLO/take1.mp4                   (several letters, scored as a sequence)
+#
+# Every frame is processed (the stages run one after another, not on threads),
+# so results are repeatable. The stabilizer is fed clip time, so its behaviour
+# matches the clip's frame rate rather than the evaluation speed.
+#
+# Reported per stage (decode, landmarks, classify, stabilize) and in total:
+# latency percentiles and frames/sec; plus letter accuracy (1 - edit distance /
+# expected length), exact matches, per-frame accuracy for single-sign clips and
+# time-to-stable-letter (from the first frame with a hand to the first correct letter).
+#
+# Usage:
+#   python evaluate_pipeline.py --classifier landmarks
+#   python evaluate_pipeline.py --clips eval_clips --output eval.json
+#   python evaluate_pipeline.py --save-baseline eval_baseline.json
+#   python evaluate_pipeline.py --baseline eval_baseline.json   (exit code 1 on regression)
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# The shared frame sources live in the repository's `common` folder.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.frame_source import open_source
+
+CLIPS_DIR = 'eval_clips'
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+IMAGE_SEQUENCE_FPS = 30.0
+STAGES = ('decode', 'landmarks', 'classify', 'stabilize')
+PERCENTILES = (50, 90, 99)
+
+# Regression limits for --baseline.
+ACCURACY_DROP = 0.02 # Letter accuracy may fall by at most 2 points
+LATENCY_GROWTH = 0.20 # p90 frame latency and median time-to-stable may grow by at most 20%...
+LATENCY_MIN_MS = 2.0 # ...and by at least this much, so tiny numbers do not flap
+
+
+def find_clips(clips_dir=CLIPS_DIR):
+    """(expected text, path) for every video file or image-sequence folder under clips_dir/<expected>/."""
+    clips = []
+    for expected in sorted(os.listdir(clips_dir)):
+        folder = os.path.join(clips_dir, expected)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            path = os.path.join(folder, name)
+            if os.path.isdir(path) or name.lower().endswith(VIDEO_EXTENSIONS):
+                clips.append((expected, path))
+    return clips
+
+
+def read_clip(path, image_fps=IMAGE_SEQUENCE_FPS, flip=False):
+    """Yields (clip time in seconds, BGR frame) for a video file or a folder of images."""
+    # The same capture path as the live camera: decoded into recycled buffers, flipped in place.
+    with open_source(path, flip=flip) as source:
+        fps = source.fps or image_fps
+        for frame in source:
+            yield (frame.seq - 1) / fps, frame.image
+
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings."""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def percentiles(values_ms):
+    if not values_ms:
+        return {}
+    values = np.asarray(values_ms)
+    summary = {f'p{p}_ms': round(float(np.percentile(values, p)), 3) for p in PERCENTILES}
+    summary['mean_ms'] = round(float(values.mean()), 3)
+    return summary
+
+
+class ClipEvaluator:
+    """Runs clips through the live pipeline's stages, one frame after another."""
+
+    def __init__(self, classify, on_tracks_ended=None, roi_tracking=True, max_hands=2, flip=True,
+                 image_fps=IMAGE_SEQUENCE_FPS):
+        self.classify = classify
+        self.on_tracks_ended = on_tracks_ended
+        self.roi_tracking = roi_tracking
+        self.max_hands = max_hands
+        self.flip = flip
+        self.image_fps = image_fps
+        self.timings = {stage: [] for stage in STAGES} # Per-frame milliseconds, over all clips
+        self.totals = []
+
+    def evaluate(self, path, expected):
+        import mediapipe as mp
+        from camera_handler_mediapipe import BUFFER_SIZE, STABILITY_THRESHOLD, STABILITY_WINDOW_S
+        from hand_tracker import HandAssociator, HandTracker
+        from sign_pipeline import combine_results, hand_bounding_box
+        from stabilizer import PredictionStabilizer, SentenceBuilder
+
+        # A fresh MediaPipe graph and fresh state per clip, so no clip inherits another's tracking.
+        hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=self.max_hands,
+                                         min_detection_confidence=0.7)
+        tracker = HandTracker(hands, tracking=self.roi_tracking, max_hands=self.max_hands)
+        associator = HandAssociator()
+        stabilizer = PredictionStabilizer(size=BUFFER_SIZE, threshold=STABILITY_THRESHOLD, window_s=STABILITY_WINDOW_S)
+        sentence = SentenceBuilder()
+        live_tracks = frozenset()
+        frames = hand_frames = correct_frames = 0
+        first_hand_t = first_letter_t = correct_t = None
+        clip_ms = 0.0
+
+        try:
+            clip = read_clip(path, self.image_fps, self.flip) # Flipped as the live capture stage does
+            while True:
+                start = time.perf_counter()
+                item = next(clip, None)
+                if item is None:
+                    break
+                clip_t, frame = item
+                decoded = time.perf_counter()
+
+                found = tracker.process(frame)
+                height, width = frame.shape[:2]
+                track_ids = associator.update(found)
+                hands_found = [(track_id, lm, hand_bounding_box(lm, width, height)) for track_id, lm in zip(track_ids, found)]
+                landmarked = time.perf_counter()
+
+                ended = live_tracks - associator.live
+                live_tracks = associator.live
+                if ended and self.on_tracks_ended:
+                    self.on_tracks_ended(ended)
+                results = self.classify(frame, hands_found) if hands_found else []
+                label, confidence, _ = combine_results(hands_found, results)
+                classified = time.perf_counter()
+
+                stable, _ = stabilizer.update(label, confidence, clip_t)
+                new_letter = sentence.feed(stable) if stabilizer.ready else None
+                stabilized = time.perf_counter()
+
+                for stage, (begin, end) in zip(STAGES, ((start, decoded), (decoded, landmarked),
+                                                        (landmarked, classified), (classified, stabilized))):
+                    self.timings[stage].append((end - begin) * 1000.0)
+                self.totals.append((stabilized - start) * 1000.0)
+                clip_ms += (stabilized - start) * 1000.0
+
+                frames += 1
+                if hands_found:
+                    hand_frames += 1
+                    correct_frames += label == expected
+                    if first_hand_t is None:
+                        first_hand_t = clip_t
+                if new_letter:
+                    if first_letter_t is None:
+                        first_letter_t = clip_t
+                    if correct_t is None and expected.startswith(new_letter):
+                        correct_t = clip_t
+        finally:
+            if self.on_tracks_ended and live_tracks:
+                self.on_tracks_ended(live_tracks) # The next clip's track ids start from 1 again
+            hands.close()
+
+        emitted = sentence.sentence.replace(' ', '')
+        errors = edit_distance(emitted, expected)
+        return {
+            'clip': path,
+            'expected': expected,
+            'emitted': emitted,
+            'edits': errors,
+            'letter_accuracy': round(max(0.0, 1.0 - errors / len(expected)), 3),
+            'exact': emitted == expected,
+            'frames': frames,
+            'hand_frames': hand_frames,
+            # Only defined when the whole clip shows one sign; the summary averages those clips alone.
+            'frame_accuracy': round(correct_frames / hand_frames, 3) if hand_frames and len(expected) == 1 else None,
+            'time_to_first_letter_s': None if first_letter_t is None or first_hand_t is None
+                                      else round(first_letter_t - first_hand_t, 3),
+            'time_to_stable_s': None if correct_t is None or first_hand_t is None
+                                else round(correct_t - first_hand_t, 3),
+            'fps': round(frames / (clip_ms / 1000.0), 1) if clip_ms else 0.0,
+        }
+
+    def summary(self, clips):
+        expected_letters = sum(len(c['expected']) for c in clips)
+        single = [c['frame_accuracy'] for c in clips if c['frame_accuracy'] is not None]
+        stable_times = [c['time_to_stable_s'] for c in clips if c['time_to_stable_s'] is not None]
+        total_s = sum(self.totals) / 1000.0
+        return {
+            'clips': len(clips),
+            'frames': len(self.totals),
+            'fps': round(len(self.totals) / total_s, 1) if total_s else 0.0,
+            'letter_accuracy': round(1.0 - min(sum(c['edits'] for c in clips), expected_letters) / expected_letters, 3)
+                               if expected_letters else 0.0,
+            'exact_match_rate': round(sum(c['exact'] for c in clips) / len(clips), 3) if clips else 0.0,
+            'frame_accuracy': round(float(np.mean(single)), 3) if single else None,
+            'time_to_stable_s': {
+                'p50': round(float(np.percentile(stable_times, 50)), 3) if stable_times else None,
+                'p90': round(float(np.percentile(stable_times, 90)), 3) if stable_times else None,
+                'never_stable': len(clips) - len(stable_times),
+            },
+            'latency': {
+                **{stage: percentiles(values) for stage, values in self.timings.items()},
+                'total': percentiles(self.totals),
+            },
+            'stage_fps': {stage: round(len(values) / (sum(values) / 1000.0), 1) if sum(values) else None
+                          for stage, values in self.timings.items()},
+        }
+
+
+def find_regressions(report, baseline):
+    new, old = report['summary'], baseline['summary']
+    regressions = []
+    if new['letter_accuracy'] < old['letter_accuracy'] - ACCURACY_DROP:
+        regressions.append(f"letter accuracy {old['letter_accuracy']:.3f} -> {new['letter_accuracy']:.3f}")
+    before, after = old['latency']['total'].get('p90_ms'), new['latency']['total'].get('p90_ms')
+    if before and after and after - before > LATENCY_MIN_MS and after > before * (1 + LATENCY_GROWTH):
+        regressions.append(f"p90 frame latency {before:.1f} ms -> {after:.1f} ms")
+    before, after = old['time_to_stable_s']['p50'], new['time_to_stable_s']['p50']
+    if before and after and (after - before) * 1000.0 > LATENCY_MIN_MS and after > before * (1 + LATENCY_GROWTH):
+        regressions.append(f"median time-to-stable {before:.2f} s -> {after:.2f} s")
+    return regressions
+
+
+def print_report(report):
+    print(f"\n{'clip':<40}{'expected':>10}{'emitted':>10}{'acc':>7}{'stable':>9}{'FPS':>8}")
+    for c in report['clips']:
+        stable = f"{c['time_to_stable_s']:.2f}s" if c['time_to_stable_s'] is not None else '-'
+        print(f"{c['clip'][-40:]:<40}{c['expected']:>10}{c['emitted'][-10:]:>10}{c['letter_accuracy']:>7.2f}{stable:>9}{c['fps']:>8.1f}")
+
+    s = report['summary']
+    print(f"\n--- {s['clips']} clips, {s['frames']} frames, {s['fps']:.1f} FPS ---")
+    print(f"Letter accuracy {s['letter_accuracy'] * 100:.1f}%, exact clips {s['exact_match_rate'] * 100:.1f}%"
+          + (f", per-frame accuracy {s['frame_accuracy'] * 100:.1f}%" if s['frame_accuracy'] is not None else ''))
+    t = s['time_to_stable_s']
+    if t['p50'] is not None:
+        print(f"Time to stable letter: p50 {t['p50']:.2f}s, p90 {t['p90']:.2f}s ({t['never_stable']} clips never stable)")
+    print(f"\n{'stage':<12}{'p50':>10}{'p90':>10}{'p99':>10}{'FPS':>9}")
+    for stage in STAGES + ('total',):
+        latency = s['latency'][stage]
+        if latency:
+            fps = s['stage_fps'].get(stage) or s['fps']
+            print(f"{stage:<12}{latency['p50_ms']:>8.2f}ms{latency['p90_ms']:>8.2f}ms{latency['p99_ms']:>8.2f}ms{fps:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate sign recognition on recorded, labeled clips.")
+    parser.add_argument('--clips', default=CLIPS_DIR)
+    parser.add_argument('--classifier', choices=('cnn', 'landmarks', 'temporal'), default='cnn')
+    parser.add_argument('--model', help="Sign model file for the cnn classifier (any backend ml_processor can load).")
+    parser.add_argument('--max-hands', type=int, default=2)
+    parser.add_argument('--no-roi-tracking', action='store_true', help="Search the full frame every time.")
+    parser.add_argument('--no-flip', action='store_true', help="Clips are already mirrored like the live preview.")
+    parser.add_argument('--image-fps', type=float, default=IMAGE_SEQUENCE_FPS, help="Frame rate of image sequences.")
+    parser.add_argument('--output', help="Write the JSON report to this file.")
+    parser.add_argument('--baseline', help="Compare against a previously saved report.")
+    parser.add_argument('--save-baseline', help="Save this run's report as the new baseline.")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.clips):
+        print(f"[ERROR] Clip directory not found at '{args.clips}'.")
+        sys.exit(2)
+    clips = find_clips(args.clips)
+    if not clips:
+        print(f"[ERROR] No clips found under '{args.clips}/<expected>/'.")
+        sys.exit(2)
+
+    from camera_handler_mediapipe import load_classifier
+    loaded = load_classifier(args.classifier, args.model, args.max_hands)
+    if loaded is None:
+        sys.exit(2)
+    evaluator = ClipEvaluator(*loaded, roi_tracking=not args.no_roi_tracking, max_hands=args.max_hands,
+                              flip=not args.no_flip, image_fps=args.image_fps)
+
+    results = []
+    for i, (expected, path) in enumerate(clips, 1):
+        print(f"[INFO] ({i}/{len(clips)}) {path}")
+        results.append(evaluator.evaluate(path, expected))
+
+    report = {
+        'config': {
+            'classifier': args.classifier,
+            'model': args.model,
+            'max_hands': args.max_hands,
+            'roi_tracking': not args.no_roi_tracking,
+            'python': sys.version.split()[0],
+        },
+        'summary': evaluator.summary(results),
+        'clips': results,
+    }
+    print_report(report)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Report saved to '{path}'.")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline)
+        if regressions:
+            print("\n--- REGRESSIONS ---")
+            for regression in regressions:
+                print(regression)
+            sys.exit(1)
+        print("\nNo regressions against the baseline.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+# Mook Mitra - Model Export Script
+# Converts the trained Keras model (model/new_kaggle_model.h5) into smaller, faster
+# formats for the runtime and for the low-power MCU target:
+#   * <name>_float16.tflite - weights stored as float16 (half the size, same accuracy)
+#   * <name>_int8.tflite    - full integer quantization, calibrated on real images
+#   * <name>.onnx           - optional, needs the tf2onnx package
+#
+# int8 calibration uses a representative sample of the same validation images
+# train_with_new_dataset.py holds out. When the dataset cache (dataset_cache.py) is
+# up to date for the data folder, the sample is taken from its hand crops - cut the
+# way the live camera cuts them, and already decoded - instead of the image files. Every exported file gets its own copy of the
+# model's preprocessing spec and class labels (<name>_int8.preprocessing.json,
+# <name>_int8.labels.txt and so on).
+#
+# After exporting, compare the backends with:  python benchmark_backends.py
+
+import argparse
+import os
+
+import numpy as np
+
+from inference_backends import DEFAULT_LABELS, load_labels, save_labels
+from preprocessing import PreprocessingSpec, Preprocessor, load_spec, save_spec
+
+MODEL_PATH = 'model/new_kaggle_model.h5'
+DATA_DIR = 'data'
+VALIDATION_SPLIT = 0.2
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+CALIBRATION_SAMPLES = 300
+
+
+def split_files(data_dir=DATA_DIR, validation_split=VALIDATION_SPLIT):
+    """
+    The same deterministic split ImageDataGenerator(validation_split=...) makes: the
+    first `validation_split` share of each class folder's sorted files is validation,
+    the rest is training. Returns (train_paths, train_labels, val_paths, val_labels, labels).
+    """
+    labels = sorted(d for d in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, d)))
+    train_paths, train_labels, val_paths, val_labels = [], [], [], []
+    for index, label in enumerate(labels):
+        folder = os.path.join(data_dir, label)
+        files = sorted(f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTENSIONS))
+        n_val = int(len(files) * validation_split)
+        for position, name in enumerate(files):
+            paths, indices = (val_paths, val_labels) if position < n_val else (train_paths, train_labels)
+            paths.append(os.path.join(folder, name))
+            indices.append(index)
+    return train_paths, np.array(train_labels), val_paths, np.array(val_labels), labels
+
+
+def validation_files(data_dir=DATA_DIR, validation_split=VALIDATION_SPLIT):
+    """The validation half of split_files(): (paths, label_indices, labels)."""
+    _, _, paths, label_indices, labels = split_files(data_dir, validation_split)
+    return paths, label_indices, labels
+
+
+def load_images(paths, input_shape, spec=None, batch_size=64):
+    """
+    Loads images as model input (float32 in [0, 1]) through the shared preprocessing
+    (preprocessing.py) - the spec saved with the model, or the training default for its input shape.
+    Uses OpenCV rather than TensorFlow so TFLite/ONNX measurements never import TensorFlow.
+    """
+    import cv2
+    preprocessor = Preprocessor(spec or PreprocessingSpec.from_input_shape(input_shape), batch_size)
+    batch = np.empty((len(paths),) + preprocessor.spec.input_shape, dtype=np.float32)
+    for start in range(0, len(paths), batch_size):
+        images = [cv2.imread(path, cv2.IMREAD_COLOR) for path in paths[start:start + batch_size]]
+        preprocessor.transform(images, out=batch[start:start + len(images)])
+    return batch
+
+
+def load_cached_images(cache, data_dir, paths, label_indices, input_shape, spec=None, batch_size=64):
+    """
+    Like load_images(), from the dataset cache's hand crops instead of the files. Images
+    the cache has no row for (unreadable ones) are left out. Returns (images, label_indices).
+    """
+    rows, kept = [], []
+    for path, label_index in zip(paths, label_indices):
+        row = cache.row(os.path.relpath(path, data_dir).replace(os.sep, '/'))
+        if row is not None:
+            rows.append(row)
+            kept.append(label_index)
+    preprocessor = Preprocessor(spec or PreprocessingSpec.from_input_shape(input_shape), batch_size)
+    batch = np.empty((len(rows),) + preprocessor.spec.input_shape, dtype=np.float32)
+    for start in range(0, len(rows), batch_size):
+        crops = cache.crops[rows[start:start + batch_size]] # One gather from the memory map
+        preprocessor.transform(crops, out=batch[start:start + len(crops)])
+    return batch, np.array(kept, dtype=int)
+
+
+def export_float16(model, output_path):
+    import tensorflow as tf
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_types = [tf.float16]
+    with open(output_path, 'wb') as f:
+        f.write(converter.convert())
+
+
+def export_int8(model, output_path, calibration_images):
+    import tensorflow as tf
+
+    def representative_dataset():
+        for image in calibration_images:
+            yield [image[np.newaxis]]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+    with open(output_path, 'wb') as f:
+        f.write(converter.convert())
+
+
+def export_onnx(model, output_path):
+    import tensorflow as tf
+    import tf2onnx
+    spec = (tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32, name='input'),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=13, output_path=output_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the Mook Mitra sign model to TFLite/ONNX.")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--data', default=DATA_DIR)
+    parser.add_argument('--formats', nargs='+', choices=('float16', 'int8', 'onnx'), default=['float16', 'int8'])
+    parser.add_argument('--calibration-samples', type=int, default=CALIBRATION_SAMPLES)
+    parser.add_argument('--no-cache', action='store_true', help="Calibrate on the image files even if the dataset cache is up to date.")
+    args = parser.parse_args()
+
+    import tensorflow as tf
+
+    if not os.path.exists(args.model):
+        print(f"[ERROR] Model not found at '{args.model}'. Run train_with_new_dataset.py first.")
+        return
+
+    print(f"[INFO] Loading Keras model from '{args.model}'...")
+    model = tf.keras.models.load_model(args.model, compile=False)
+    base = os.path.splitext(args.model)[0]
+    spec = load_spec(args.model, model.input_shape[1:])
+
+    labels = load_labels(args.model)
+    if labels == DEFAULT_LABELS and os.path.isdir(args.data):
+        labels = validation_files(args.data)[2] # The class folders, in training order
+        save_labels(args.model, labels)
+
+    def save_metadata(path): # Every exported file carries its own spec and labels
+        save_spec(path, spec)
+        save_labels(path, labels)
+
+    if 'float16' in args.formats:
+        export_float16(model, base + '_float16.tflite')
+        save_metadata(base + '_float16.tflite')
+        print(f"[INFO] Saved {base}_float16.tflite ({os.path.getsize(base + '_float16.tflite') / 1024:.0f} KB)")
+
+    if 'int8' in args.formats:
+        if not os.path.isdir(args.data):
+            print(f"[ERROR] int8 export needs calibration images; data directory '{args.data}' not found.")
+        else:
+            paths, _, _ = validation_files(args.data)
+            rng = np.random.default_rng(0)
+            sample = [paths[i] for i in rng.permutation(len(paths))[:args.calibration_samples]]
+            cache = None
+            if not args.no_cache:
+                from dataset_cache import open_cache
+                cache = open_cache(args.data)
+            if cache is not None:
+                calibration, _ = load_cached_images(cache, args.data, sample, np.zeros(len(sample), dtype=int),
+                                                    model.input_shape[1:], spec)
+                print(f"[INFO] Calibrating int8 quantization on {len(calibration)} cached validation hand crops...")
+            else:
+                calibration = load_images(sample, model.input_shape[1:], spec)
+                print(f"[INFO] Calibrating int8 quantization on {len(sample)} validation images...")
+            export_int8(model, base + '_int8.tflite', calibration)
+            save_metadata(base + '_int8.tflite')
+            print(f"[INFO] Saved {base}_int8.tflite ({os.path.getsize(base + '_int8.tflite') / 1024:.0f} KB)")
+
+    if 'onnx' in args.formats:
+        try:
+            export_onnx(model, base + '.onnx')
+            save_metadata(base + '.onnx')
+            print(f"[INFO] Saved {base}.onnx")
+        except ImportError:
+            print("[WARNING] tf2onnx is not installed; skipping ONNX export (pip install tf2onnx).")
+
+    print(f"\nExport complete. Original model: {os.path.getsize(args.model) / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,8 @@
 # Mook Mitra - Main GUI
 import customtkinter
 import threading
-from camera_handler import start_camera
-from speech_recognition_handler import listen_and_recognize
+from camera_handler_mediapipe import start_camera
+from speech_to_text_engine import listen_and_recognize
 
 class App(customtkinter.CTk):
     def __init__(self):
@@ -2,25 +2,9 @@
 def speak(text, wait_for_completion=False):
     """
     Speaks text using the OS's native voice.
+    Runs on the shared, long-lived TTS worker (see tts_worker.py) instead of
+    starting a new shell process for every utterance.
     """
-    import sys
-    import subprocess
+    from tts_worker import speak as speak_on_worker
 
-    if not text or not isinstance(text, str):
-        return
-
-    command = ''
-    if sys.platform == 'win32':
-        # Sanitize text for PowerShell command
-        sanitized_text = text.replace("'", "''")
-        command = f'powershell -ExecutionPolicy Bypass -Command "Add-Type -AssemblyName System.Speech; (New-Object System.Speech.Synthesis.SpeechSynthesizer).Speak(\'{sanitized_text}\');"'
-    elif sys.platform == 'darwin': # macOS
-        command = ['say', text]
-    else: # Linux
-        command = ['espeak', text]
-
-    # Use run() for waiting, Popen() for non-blocking
-    if wait_for_completion:
-        subprocess.run(command, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    else:
-        subprocess.Popen(command, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
\ No newline at end of file
+    speak_on_worker(text, wait_for_completion=wait_for_completion)
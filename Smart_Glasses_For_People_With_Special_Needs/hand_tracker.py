@@ -0,0 +1,187 @@
+# Mook Mitra - Tracking-Guided Hand Detection
+# Runs MediaPipe Hands on a small square region around the hand found in the
+# previous frame instead of on the whole camera frame.
+#
+#   * No hand yet (or hand lost): search the full frame.
+#   * Hand found: crop a square around it (with a margin for movement), resize it
+#     to ROI_SIZE x ROI_SIZE and run MediaPipe on that. The region only moves when
+#     the hand gets close to its edge, so MediaPipe's own frame-to-frame tracking
+#     sees a steady image.
+#   * Nothing found in the region: fall back to the full frame in the same call,
+#     so a lost hand costs one extra detection rather than a missed frame.
+#   * Fewer hands than max_hands in the region: the full frame is searched every
+#     REDETECT_INTERVAL frames anyway, so a second hand entering the view is found.
+#     The region covers every hand found; hands too far apart disable it.
+#
+# HandAssociator gives each hand a track id that stays the same from frame to
+# frame (nearest hand centre), so per-hand state - a temporal model's history,
+# a label shown next to the hand - follows the right hand.
+#
+# Landmarks found in the region are mapped back to full-frame coordinates in
+# place, so callers (drawing, bounding boxes, classifiers) cannot tell the modes apart.
+# All colour conversion and resizing writes into preallocated buffers.
+#
+# Compare against the full-frame mode with:  python benchmark_hand_tracking.py
+
+import cv2
+import numpy as np
+
+ROI_SIZE = 256 # Side of the square image MediaPipe sees in tracking mode
+ROI_MARGIN = 0.6 # Extra room around the hand, as a fraction of its size on each side
+ROI_EDGE = 0.1 # Re-centre once the hand comes this close (fraction of the region) to an edge
+REDETECT_INTERVAL = 10 # Frames between full-frame searches while fewer than max_hands are tracked
+TRACK_MAX_DISTANCE = 0.2 # Largest centre movement per frame (fraction of the frame) still counted as the same hand
+TRACK_MAX_MISSED = 5 # Frames a hand may go undetected before its track ends
+
+
+class HandTracker:
+    def __init__(self, hands, tracking=True, roi_size=ROI_SIZE, margin=ROI_MARGIN, max_hands=1):
+        self.hands = hands
+        self.tracking = tracking
+        self.max_hands = max_hands
+        self.roi_size = roi_size
+        self.margin = margin
+        self.roi = None # (x, y, side) in frame pixels, or None for full-frame search
+        self._rgb = None # Full-frame RGB buffer, (re)allocated when the frame size changes
+        self._roi_bgr = np.empty((roi_size, roi_size, 3), dtype=np.uint8)
+        self._roi_rgb = np.empty((roi_size, roi_size, 3), dtype=np.uint8)
+        self.full_frame_runs = 0
+        self.roi_runs = 0
+        self.losses = 0 # Region searches that found nothing and fell back to the full frame
+        self._last_count = 0
+        self._roi_streak = 0 # Region searches since the last full-frame search
+
+    def reset(self):
+        self.roi = None
+        self._last_count = 0
+
+    def process(self, frame_bgr):
+        """Returns the list of hand landmarks (full-frame normalized coordinates) for a BGR frame."""
+        height, width = frame_bgr.shape[:2]
+        redetect = self._last_count < self.max_hands and self._roi_streak >= REDETECT_INTERVAL
+        if self.tracking and self.roi is not None and not redetect:
+            found = self._process_roi(frame_bgr, width, height)
+            if found:
+                self._roi_streak += 1
+                self._last_count = len(found)
+                self._update_roi(found, width, height)
+                return found
+            self.losses += 1
+            self.roi = None
+
+        found = self._process_full(frame_bgr)
+        self._roi_streak = 0
+        self._last_count = len(found)
+        if self.tracking and found:
+            self._update_roi(found, width, height)
+        return found
+
+    def _process_full(self, frame_bgr):
+        if self._rgb is None or self._rgb.shape != frame_bgr.shape:
+            self._rgb = np.empty_like(frame_bgr)
+        cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        self.full_frame_runs += 1
+        return list(self.hands.process(self._rgb).multi_hand_landmarks or [])
+
+    def _process_roi(self, frame_bgr, width, height):
+        x, y, side = self.roi
+        cv2.resize(frame_bgr[y:y + side, x:x + side], (self.roi_size, self.roi_size),
+                   dst=self._roi_bgr, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(self._roi_bgr, cv2.COLOR_BGR2RGB, dst=self._roi_rgb)
+        self.roi_runs += 1
+        found = list(self.hands.process(self._roi_rgb).multi_hand_landmarks or [])
+        # Region-normalized -> frame-normalized. z shares x's scale in MediaPipe.
+        for hand_landmarks in found:
+            for landmark in hand_landmarks.landmark:
+                landmark.x = (x + landmark.x * side) / width
+                landmark.y = (y + landmark.y * side) / height
+                landmark.z = landmark.z * side / width
+        return found
+
+    def _update_roi(self, found, width, height):
+        x_min = min(lm.x for hand in found for lm in hand.landmark) * width
+        x_max = max(lm.x for hand in found for lm in hand.landmark) * width
+        y_min = min(lm.y for hand in found for lm in hand.landmark) * height
+        y_max = max(lm.y for hand in found for lm in hand.landmark) * height
+        needed = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.margin)
+
+        if self.roi is not None:
+            x, y, side = self.roi
+            edge = side * ROI_EDGE
+            inside = x + edge <= x_min and x_max <= x + side - edge and y + edge <= y_min and y_max <= y + side - edge
+            if inside and side / 2 <= needed <= side:
+                return # Keep the region still while the hand stays comfortably inside it
+
+        side = int(needed)
+        if side >= min(width, height):
+            self.roi = None # The hand fills most of the frame; cropping would not save anything
+            return
+        side = max(side, 32)
+        x = int(min(max((x_min + x_max - side) / 2, 0), width - side))
+        y = int(min(max((y_min + y_max - side) / 2, 0), height - side))
+        self.roi = (x, y, side)
+
+    def stats(self):
+        runs = self.full_frame_runs + self.roi_runs
+        return {
+            'tracking': self.tracking,
+            'full_frame_runs': self.full_frame_runs,
+            'roi_runs': self.roi_runs,
+            'roi_share': round(self.roi_runs / runs, 3) if runs else 0.0,
+            'losses': self.losses,
+        }
+
+
+class HandAssociator:
+    """
+    Matches each frame's hands to the hands of earlier frames by their centres
+    (closest pairs first) and numbers them with track ids that persist while
+    the hand stays in view.
+    """
+
+    def __init__(self, max_distance=TRACK_MAX_DISTANCE, max_missed=TRACK_MAX_MISSED):
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.tracks = {} # track id -> [centre x, centre y, frames missed]
+        self._next_id = 1
+
+    @staticmethod
+    def _centre(hand_landmarks):
+        points = hand_landmarks.landmark
+        return sum(lm.x for lm in points) / len(points), sum(lm.y for lm in points) / len(points)
+
+    def update(self, found):
+        """Track ids for the hand landmarks in `found`, in the same order."""
+        centres = [self._centre(hand_landmarks) for hand_landmarks in found]
+        pairs = sorted(
+            ((cx - track[0]) ** 2 + (cy - track[1]) ** 2, i, track_id)
+            for i, (cx, cy) in enumerate(centres) for track_id, track in self.tracks.items()
+        )
+        ids = [None] * len(found)
+        matched = set()
+        for distance2, i, track_id in pairs:
+            if distance2 > self.max_distance ** 2:
+                break
+            if ids[i] is None and track_id not in matched:
+                ids[i] = track_id
+                matched.add(track_id)
+
+        for track_id in list(self.tracks):
+            if track_id not in matched:
+                self.tracks[track_id][2] += 1
+                if self.tracks[track_id][2] > self.max_missed:
+                    del self.tracks[track_id]
+        for i, (cx, cy) in enumerate(centres):
+            if ids[i] is None:
+                ids[i] = self._next_id
+                self._next_id += 1
+            self.tracks[ids[i]] = [cx, cy, 0]
+        return ids
+
+    @property
+    def live(self):
+        """Ids of all current tracks, including hands missed for a few frames."""
+        return frozenset(self.tracks)
+
+    def reset(self):
+        self.tracks.clear()
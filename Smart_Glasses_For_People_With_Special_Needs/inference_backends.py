@@ -0,0 +1,145 @@
+# Mook Mitra - Inference Backends
+# One small interface over the different ways the sign model can be run:
+#   * KerasBackend  - the original .h5 model through full TensorFlow
+#   * TFLiteBackend - float16 / int8 quantized .tflite models (tflite_runtime if installed,
+#                     which avoids importing TensorFlow at all; otherwise tf.lite)
+#   * ONNXBackend   - .onnx models through onnxruntime
+#
+# Every backend takes a float32 batch shaped (N, H, W, C) with values in [0, 1]
+# and returns class probabilities shaped (N, num_classes). Quantization of the
+# input and dequantization of the output are handled inside the backend.
+#
+# Class labels are stored per model file (model/new_kaggle_model.h5 ->
+# model/new_kaggle_model.labels.txt), like the preprocessing spec, so models
+# sharing a folder never get each other's classes. A folder-wide labels.txt from
+# older versions is still read when a model has no labels file of its own.
+
+import os
+
+import numpy as np
+
+# flow_from_directory sorts class folders alphabetically: digits first, then letters.
+DEFAULT_LABELS = sorted([str(d) for d in range(10)] + [chr(c) for c in range(ord('A'), ord('Z') + 1)])
+
+
+def labels_path_for(model_path):
+    """model/name.h5 (or a SavedModel folder model/name) -> model/name.labels.txt"""
+    return os.path.splitext(model_path.rstrip('/\\'))[0] + '.labels.txt'
+
+
+def _legacy_labels_path(model_path):
+    return os.path.join(os.path.dirname(model_path.rstrip('/\\')) or '.', 'labels.txt')
+
+
+def load_labels(model_path):
+    """
+    Class labels saved with the model by the training or export script, else the
+    folder's legacy labels.txt, else the default 0-9, A-Z.
+    """
+    for path in (labels_path_for(model_path), _legacy_labels_path(model_path)):
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                return [line.strip() for line in f if line.strip()]
+    return list(DEFAULT_LABELS)
+
+
+def save_labels(model_path, labels):
+    with open(labels_path_for(model_path), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(labels) + '\n')
+
+
+def current_rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        return float('nan')
+
+
+class KerasBackend:
+    name = 'keras'
+
+    def __init__(self, path):
+        import tensorflow as tf
+        self.model = tf.keras.models.load_model(path, compile=False)
+        self.input_shape = tuple(self.model.input_shape[1:])
+
+    def predict(self, batch):
+        # Calling the model directly skips predict()'s per-call dataset setup,
+        # which dominates the cost for the single-image batches used live.
+        return np.asarray(self.model(batch, training=False))
+
+
+class TFLiteBackend:
+    name = 'tflite'
+
+    def __init__(self, path, num_threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        self.interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self.input_shape = tuple(int(d) for d in self._input['shape'][1:])
+        self.quantized = self._input['dtype'] in (np.int8, np.uint8)
+        self._batch_size = int(self._input['shape'][0])
+
+    def _resize(self, batch_size):
+        if batch_size != self._batch_size:
+            self.interpreter.resize_tensor_input(self._input['index'], (batch_size,) + self.input_shape)
+            self.interpreter.allocate_tensors()
+            self._input = self.interpreter.get_input_details()[0]
+            self._output = self.interpreter.get_output_details()[0]
+            self._batch_size = batch_size
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        self._resize(batch.shape[0])
+        if self.quantized:
+            scale, zero_point = self._input['quantization']
+            info = np.iinfo(self._input['dtype'])
+            batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(self._input['dtype'])
+        self.interpreter.set_tensor(self._input['index'], batch)
+        self.interpreter.invoke()
+        output = self.interpreter.get_tensor(self._output['index'])
+        if self._output['dtype'] in (np.int8, np.uint8):
+            scale, zero_point = self._output['quantization']
+            output = (output.astype(np.float32) - zero_point) * scale
+        return output
+
+
+class ONNXBackend:
+    name = 'onnx'
+
+    def __init__(self, path):
+        import onnxruntime as ort
+        self.session = ort.InferenceSession(path, providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self._input_name = model_input.name
+        self.input_shape = tuple(int(d) for d in model_input.shape[1:])
+
+    def predict(self, batch):
+        return self.session.run(None, {self._input_name: np.asarray(batch, dtype=np.float32)})[0]
+
+
+def load_backend(path, **kwargs):
+    """Picks the backend from the model file's extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.tflite':
+        backend = TFLiteBackend(path, **kwargs)
+    elif extension == '.onnx':
+        backend = ONNXBackend(path)
+    else:
+        backend = KerasBackend(path)
+    backend.path = path
+    backend.labels = load_labels(path)
+    return backend
+
@@ -0,0 +1,133 @@
+# Mook Mitra - Landmark Sign Classifier
+# Classifies signs from MediaPipe's 21 hand landmarks instead of running the CNN
+# on a cropped image. The landmarks are turned into 63 numbers that do not depend
+# on where the hand is in the frame or how close it is to the camera:
+#   * wrist-relative: every point has the wrist (landmark 0) subtracted
+#   * scale-invariant: everything is divided by the largest wrist-to-point distance
+#
+# Two tiny models are supported, both evaluated with plain NumPy (well under a
+# millisecond per hand on a laptop CPU):
+#   * 'centroid' - nearest class centroid
+#   * 'mlp'      - one hidden ReLU layer, trained with Keras and exported to NumPy
+#
+# Train with train_landmark_classifier.py; the result is saved to
+# model/landmark_classifier.npz and loaded by start_camera(classifier='landmarks').
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+FEATURE_SIZE = NUM_LANDMARKS * 3
+DEFAULT_MODEL_PATH = 'model/landmark_classifier.npz'
+
+
+def landmarks_to_array(hand_landmarks, out=None):
+    """Copies a MediaPipe hand's landmarks into a (21, 3) float32 array."""
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+    for i, lm in enumerate(hand_landmarks.landmark):
+        out[i, 0] = lm.x
+        out[i, 1] = lm.y
+        out[i, 2] = lm.z
+    return out
+
+
+def normalize_landmarks(points, out=None):
+    """
+    (21, 3) or (N, 21, 3) landmark arrays -> (63,) or (N, 63) feature vectors,
+    wrist-relative and scaled so the farthest landmark is at distance 1.
+    """
+    points = np.asarray(points, dtype=np.float32)
+    single = points.ndim == 2
+    batch = points.reshape(-1, NUM_LANDMARKS, 3)
+    if out is None:
+        out = np.empty((batch.shape[0], FEATURE_SIZE), dtype=np.float32)
+    view = out.reshape(-1, NUM_LANDMARKS, 3)
+    np.subtract(batch, batch[:, :1, :], out=view)
+    scale = np.sqrt((view * view).sum(axis=2)).max(axis=1)
+    scale[scale == 0] = 1.0
+    view /= scale[:, None, None]
+    return out[0] if single else out
+
+
+def mirror_features(features):
+    """Left/right mirror of feature vectors (x negated), for training on both hands."""
+    mirrored = np.array(features, dtype=np.float32, copy=True)
+    mirrored.reshape(-1, NUM_LANDMARKS, 3)[:, :, 0] *= -1
+    return mirrored
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    np.exp(logits, out=logits)
+    logits /= logits.sum(axis=1, keepdims=True)
+    return logits
+
+
+class LandmarkClassifier:
+    """A nearest-centroid or small-MLP classifier over normalized landmark vectors."""
+
+    def __init__(self, kind, labels, params):
+        if kind not in ('centroid', 'mlp'):
+            raise ValueError(f"Unknown classifier kind '{kind}'.")
+        self.kind = kind
+        self.labels = list(labels)
+        self.params = {name: np.asarray(value, dtype=np.float32) for name, value in params.items()}
+
+    # --- Construction ---
+
+    @classmethod
+    def fit_centroids(cls, features, label_indices, labels, temperature=0.05):
+        """
+        One centroid per label. Labels without any sample (e.g. a folder where MediaPipe
+        found no hand) are left out of the model, since their centroid would be NaN.
+        """
+        features = np.asarray(features, dtype=np.float32)
+        label_indices = np.asarray(label_indices)
+        present = [i for i in range(len(labels)) if np.any(label_indices == i)]
+        if not present:
+            raise ValueError("No samples to fit the centroids to.")
+        centroids = np.stack([features[label_indices == i].mean(axis=0) for i in present])
+        return cls('centroid', [labels[i] for i in present], {'centroids': centroids, 'temperature': [temperature]})
+
+    @classmethod
+    def from_keras(cls, model, labels):
+        """Exports a Dense-ReLU-Dense-softmax Keras model to NumPy weights."""
+        dense = [layer for layer in model.layers if layer.get_weights()]
+        (w1, b1), (w2, b2) = dense[0].get_weights(), dense[-1].get_weights()
+        return cls('mlp', labels, {'w1': w1, 'b1': b1, 'w2': w2, 'b2': b2})
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            kind = str(data['kind'])
+            labels = [str(label) for label in data['labels']]
+            params = {name: data[name] for name in data.files if name not in ('kind', 'labels')}
+        return cls(kind, labels, params)
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        np.savez(path, kind=np.array(self.kind), labels=np.array(self.labels), **self.params)
+
+    # --- Inference ---
+
+    def predict_proba(self, features):
+        """(63,) or (N, 63) features -> (N, num_classes) class probabilities."""
+        x = np.asarray(features, dtype=np.float32).reshape(-1, FEATURE_SIZE)
+        p = self.params
+        if self.kind == 'centroid':
+            # Squared distances via |x|^2 - 2 x.c + |c|^2, all classes at once.
+            c = p['centroids']
+            d2 = (x * x).sum(axis=1, keepdims=True) - 2.0 * x @ c.T + (c * c).sum(axis=1)
+            return _softmax(-d2 / float(p['temperature'][0]))
+        hidden = np.maximum(x @ p['w1'] + p['b1'], 0.0)
+        return _softmax(hidden @ p['w2'] + p['b2'])
+
+    def predict(self, features):
+        """Returns (labels, confidences) for a batch of feature vectors."""
+        proba = self.predict_proba(features)
+        best = proba.argmax(axis=1)
+        return [self.labels[i] for i in best], proba[np.arange(len(best)), best]
+
+    def predict_one(self, features):
+        """Returns (label, confidence) for a single feature vector."""
+        labels, confidences = self.predict(features)
+        return labels[0], float(confidences[0])
@@ -0,0 +1,98 @@
+# Mook Mitra - Background Preloader
+# Warms up the heavy imports and models on a worker thread right after the
+# window appears, so the first click on a feature does not freeze the GUI.
+#
+# Every step is a plain function; a failing step is recorded and skipped (e.g.
+# no microphone library installed) without stopping the others. Anything the
+# steps import stays in sys.modules and anything they load stays cached in its
+# module (ml_processor's registry, tts_worker's worker), so the features pick it
+# up for free. If a feature is started before its step has run, Python's import
+# lock and the registry's load lock simply make it wait for the same work.
+#
+# Cold-start import times are tracked separately with:  python profile_startup.py
+
+import threading
+import time
+
+
+def _warm_speech_output():
+    from tts_worker import get_worker
+    get_worker()
+
+
+def _warm_hand_tracking():
+    import cv2 # noqa: F401
+    import mediapipe as mp
+    # The first Hands() loads MediaPipe's graphs and TFLite models from disk.
+    mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1).close()
+
+
+def _warm_camera_modules():
+    import camera_handler_mediapipe, hand_tracker, sign_pipeline, stabilizer # noqa: F401
+
+
+def _warm_sign_model():
+    from ml_processor import load_model
+    if load_model() is None:
+        raise RuntimeError("sign model could not be loaded")
+
+
+def _warm_speech_input():
+    from speech_to_text_engine import warm_up
+    warm_up()
+
+
+DEFAULT_STEPS = [
+    ("Text-to-speech", _warm_speech_output),
+    ("Hand tracking", _warm_hand_tracking),
+    ("Camera pipeline", _warm_camera_modules),
+    ("Sign model", _warm_sign_model),
+    ("Speech engine", _warm_speech_input),
+]
+
+
+class Preloader:
+    def __init__(self, steps=DEFAULT_STEPS):
+        self.steps = list(steps)
+        self.timings = {} # step name -> seconds
+        self.errors = {} # step name -> error message
+        self.current = None
+        self._done = {name: threading.Event() for name, _ in self.steps}
+        self._thread = threading.Thread(target=self._run, name='preloader', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        total_start = time.perf_counter()
+        for name, step in self.steps:
+            self.current = name
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                self.errors[name] = str(e) or type(e).__name__
+                print(f"[WARNING] Preloading '{name}' failed: {self.errors[name]}")
+            self.timings[name] = round(time.perf_counter() - start, 3)
+            self._done[name].set()
+        self.current = None
+        print(f"[INFO] Preloading finished in {time.perf_counter() - total_start:.1f}s: {self.timings}")
+
+    def progress(self):
+        """(finished steps, total steps, name of the step running now or None). Safe to poll from the GUI."""
+        return sum(event.is_set() for event in self._done.values()), len(self.steps), self.current
+
+    @property
+    def finished(self):
+        return all(event.is_set() for event in self._done.values())
+
+    def wait(self, name=None, timeout=None):
+        """Waits for one step (or all of them); returns True if it has finished."""
+        events = [self._done[name]] if name else list(self._done.values())
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for event in events:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not event.wait(remaining):
+                return False
+        return True
@@ -0,0 +1,153 @@
+# Mook Mitra - Shared Image Preprocessing
+# The one definition of how a hand image becomes model input, used by training
+# (train_with_new_dataset.py), export/benchmarking (export_model.py) and live
+# inference (ml_processor.py).
+#
+# A PreprocessingSpec (size, colour, interpolation, scale) is saved next to each
+# model file under the model's own name (model/new_kaggle_model.h5 ->
+# model/new_kaggle_model.preprocessing.json) when it is trained or exported, so
+# models sharing a folder never pick up each other's spec. At load time the
+# runtime reads it back and checks it against the model's input shape:
+#   * spec matches the model        -> used as is
+#   * no spec (older models)        -> one is inferred from the input shape, with a warning
+#   * spec contradicts the model, or
+#     was written by a newer version -> PreprocessingMismatch; the model is refused
+#
+# Preprocessor applies a spec to single images or batches, writing into a
+# preallocated float32 array; only the per-image resize is a Python loop, colour
+# conversion and scaling run once over the whole batch.
+
+import json
+import os
+
+import numpy as np
+
+PREPROCESSING_VERSION = 1
+SPEC_SUFFIX = '.preprocessing.json'
+
+
+class PreprocessingMismatch(ValueError):
+    """The saved preprocessing does not fit the model (or this version of the code)."""
+
+
+class PreprocessingSpec:
+    def __init__(self, height, width, color='rgb', interpolation='nearest', scale=1.0 / 255.0,
+                 version=PREPROCESSING_VERSION):
+        if color not in ('rgb', 'gray'):
+            raise ValueError(f"Unknown color mode '{color}'.")
+        if interpolation not in ('nearest', 'linear', 'area'):
+            raise ValueError(f"Unknown interpolation '{interpolation}'.")
+        self.height, self.width = int(height), int(width)
+        self.color = color
+        self.interpolation = interpolation
+        self.scale = float(scale)
+        self.version = int(version)
+
+    @property
+    def channels(self):
+        return 1 if self.color == 'gray' else 3
+
+    @property
+    def input_shape(self):
+        return self.height, self.width, self.channels
+
+    @classmethod
+    def from_input_shape(cls, input_shape):
+        """Best guess for a model saved without a spec: the training defaults at the model's input size."""
+        height, width, channels = (int(d) for d in input_shape)
+        return cls(height, width, 'gray' if channels == 1 else 'rgb', version=0)
+
+    def to_dict(self):
+        return {'version': self.version, 'height': self.height, 'width': self.width, 'color': self.color,
+                'interpolation': self.interpolation, 'scale': self.scale}
+
+    def __eq__(self, other):
+        return isinstance(other, PreprocessingSpec) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"PreprocessingSpec({self.to_dict()})"
+
+
+def spec_path_for(model_path):
+    """model/name.h5 (or a SavedModel folder model/name) -> model/name.preprocessing.json"""
+    return os.path.splitext(model_path.rstrip('/\\'))[0] + SPEC_SUFFIX
+
+
+def save_spec(model_path, spec):
+    with open(spec_path_for(model_path), 'w', encoding='utf-8') as f:
+        json.dump(spec.to_dict(), f, indent=2)
+
+
+def load_spec(model_path, input_shape=None):
+    """
+    The spec saved with the model, checked against `input_shape` if given.
+    Raises PreprocessingMismatch if the two disagree or the spec is too new.
+    """
+    path = spec_path_for(model_path)
+    if not os.path.exists(path):
+        if input_shape is None:
+            raise PreprocessingMismatch(f"No '{path}' for '{model_path}' and no input shape to infer one from.")
+        spec = PreprocessingSpec.from_input_shape(input_shape)
+        print(f"[WARNING] '{model_path}' has no saved preprocessing; assuming {spec.to_dict()}.")
+        return spec
+
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version', 0) > PREPROCESSING_VERSION:
+        raise PreprocessingMismatch(f"'{path}' was written by a newer version (v{data['version']}); "
+                                    f"this code supports up to v{PREPROCESSING_VERSION}.")
+    spec = PreprocessingSpec(**data)
+    if input_shape is not None and tuple(int(d) for d in input_shape) != spec.input_shape:
+        raise PreprocessingMismatch(f"'{path}' describes {spec.input_shape} inputs but '{model_path}' expects "
+                                    f"{tuple(input_shape)}. Re-train or re-export the model.")
+    return spec
+
+
+class Preprocessor:
+    """Applies a PreprocessingSpec to BGR images (camera frames, crops, cv2.imread output)."""
+
+    def __init__(self, spec, max_batch=1):
+        import cv2
+        self.spec = spec
+        self._interpolation = {
+            'nearest': getattr(cv2, 'INTER_NEAREST_EXACT', cv2.INTER_NEAREST), # Same pixels as PIL / flow_from_directory
+            'linear': cv2.INTER_LINEAR,
+            'area': cv2.INTER_AREA,
+        }[spec.interpolation]
+        self._conversion = cv2.COLOR_BGR2GRAY if spec.color == 'gray' else cv2.COLOR_BGR2RGB
+        self._allocate(max_batch)
+
+    def _allocate(self, batch):
+        height, width, channels = self.spec.input_shape
+        self._resized = np.empty((batch, height, width, 3), dtype=np.uint8)
+        self._converted = np.empty((batch, height, width, channels), dtype=np.uint8)
+        self._out = np.empty((batch, height, width, channels), dtype=np.float32)
+
+    def transform(self, images_bgr, out=None):
+        """
+        A list (or array) of BGR uint8 images of any size -> float32 (N, H, W, C) model input.
+        Writes into `out` if given, otherwise into an internal buffer that the next call reuses.
+        """
+        import cv2
+        count = len(images_bgr)
+        if count > len(self._out):
+            self._allocate(count)
+        height, width, channels = self.spec.input_shape
+        resized = self._resized[:count]
+        for i, image in enumerate(images_bgr):
+            cv2.resize(image, (width, height), dst=resized[i], interpolation=self._interpolation)
+
+        # One conversion call over the whole batch: stack the images vertically as a single tall image.
+        tall = resized.reshape(count * height, width, 3)
+        converted = self._converted[:count]
+        cv2.cvtColor(tall, self._conversion, dst=converted.reshape(count * height, width, channels)
+                     if channels == 3 else converted.reshape(count * height, width))
+
+        if out is None:
+            out = self._out[:count]
+        np.multiply(converted, self.spec.scale, out=out, casting='unsafe')
+        return out
+
+    def transform_one(self, image_bgr):
+        """One BGR image -> (H, W, C) float32; the returned array is reused by the next call."""
+        return self.transform((image_bgr,))[0]
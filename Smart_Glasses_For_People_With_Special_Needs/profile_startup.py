@@ -0,0 +1,137 @@
+# Mook Mitra - Import-Time Profile
+# Measures how long the app's modules and heavy libraries take to import from a
+# cold interpreter, using Python's own `-X importtime` report. Each module is
+# imported in a fresh process so one import never benefits from another.
+#
+# Usage:
+#   python profile_startup.py                                  (default module list)
+#   python profile_startup.py --module tensorflow --top 15
+#   python profile_startup.py --save-baseline startup_baseline.json
+#   python profile_startup.py --baseline startup_baseline.json  (exit code 1 on regression)
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# What the GUI needs before its window appears, then what the preloader warms up.
+DEFAULT_MODULES = [
+    'customtkinter',
+    'speech_to_text_handler', # The MookMitraApp GUI
+    'tts_worker',
+    'cv2',
+    'mediapipe',
+    'camera_handler_mediapipe',
+    'tensorflow',
+    'ml_processor',
+    'sounddevice',
+    'vosk',
+    'speech_to_text_engine',
+]
+REGRESSION_TOLERANCE = 0.20 # Flag modules whose import time grew by more than 20%
+REGRESSION_MIN_S = 0.05 # ...and by at least this much, so tiny imports do not flap
+
+
+def profile_module(module, repeat=3):
+    """
+    Imports `module` in `repeat` fresh interpreters and keeps the fastest run
+    (the others mostly measure disk cache misses). Returns a result dict.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                 capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        wall_s = time.perf_counter() - start
+        if process.returncode != 0:
+            error = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else 'import failed'
+            return {'module': module, 'error': error}
+        entries = parse_importtime(process.stderr)
+        import_s = max((cumulative for _, cumulative, _ in entries), default=0) / 1e6
+        if best is None or import_s < best['import_s']:
+            slowest = sorted(entries, key=lambda e: e[0], reverse=True)
+            best = {
+                'module': module,
+                'import_s': round(import_s, 3),
+                'process_s': round(wall_s, 3),
+                'modules_loaded': len(entries),
+                'slowest_self': [{'module': name, 'self_ms': round(self_us / 1000, 1)} for self_us, _, name in slowest[:10]],
+            }
+    return best
+
+
+def parse_importtime(stderr):
+    """(self_us, cumulative_us, module) for every line of a `-X importtime` report."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        entries.append((int(self_us), int(cumulative_us), name.strip()))
+    return entries
+
+
+def find_regressions(report, baseline, tolerance=REGRESSION_TOLERANCE):
+    old = {r['module']: r for r in baseline.get('modules', []) if 'import_s' in r}
+    regressions = []
+    for result in report['modules']:
+        before = old.get(result['module'])
+        if not before or 'import_s' not in result:
+            continue
+        growth = result['import_s'] - before['import_s']
+        if growth > REGRESSION_MIN_S and growth > tolerance * before['import_s']:
+            regressions.append((result['module'], before['import_s'], result['import_s']))
+    return regressions
+
+
+def print_report(report, top):
+    print(f"\n--- Import times (fastest of {report['repeat']} cold runs, Python {report['python']}) ---")
+    print(f"{'module':<28}{'import':>10}{'process':>10}{'modules':>9}")
+    for r in report['modules']:
+        if 'error' in r:
+            print(f"{r['module']:<28} NOT AVAILABLE: {r['error']}")
+            continue
+        print(f"{r['module']:<28}{r['import_s']:>9.2f}s{r['process_s']:>9.2f}s{r['modules_loaded']:>9}")
+        for entry in r['slowest_self'][:top]:
+            print(f"    {entry['self_ms']:>8.1f} ms  {entry['module']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile cold import times of the Mook Mitra modules.")
+    parser.add_argument('--module', action='append', help="Profile this module instead of the default list (repeatable).")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=3, help="Slowest sub-imports to list per module.")
+    parser.add_argument('--output', help="Write the JSON report to this file.")
+    parser.add_argument('--baseline', help="Compare against a previously saved report.")
+    parser.add_argument('--save-baseline', help="Save this run's report as the new baseline.")
+    args = parser.parse_args()
+
+    report = {
+        'python': sys.version.split()[0],
+        'repeat': args.repeat,
+        'modules': [profile_module(module, args.repeat) for module in (args.module or DEFAULT_MODULES)],
+    }
+    print_report(report, args.top)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Report saved to '{path}'.")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline)
+        if regressions:
+            print("\n--- REGRESSIONS ---")
+            for module, before, after in regressions:
+                print(f"{module}: {before:.2f}s -> {after:.2f}s")
+            sys.exit(1)
+        print("\nNo regressions against the baseline.")
+
+
+if __name__ == '__main__':
+    main()
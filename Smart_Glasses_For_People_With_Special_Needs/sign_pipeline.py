@@ -0,0 +1,275 @@
+# Mook Mitra - Asynchronous Sign Recognition Pipeline
+# Splits the camera loop into three stages, each on its own thread:
+#
+#   capture  --frames-->  landmarks (MediaPipe)  --hands-->  classification (Keras / landmark model)
+#
+# Stages are connected by LatestValue slots instead of queues: a slow stage never
+# builds up a backlog, it simply picks up the newest item when it is ready. The
+# preview therefore runs at camera FPS while classification runs at its own rate.
+#
+# Every item carries the sequence number and capture timestamp of the frame it
+# came from, so a prediction can always be matched to its frame (and its lag measured).
+#
+# Several hands per frame: the landmark stage gives every hand a track id that
+# persists across frames (hand_tracker.HandAssociator), and the classifier stage
+# passes all of a frame's hands to the classifier in ONE call, so it can run them
+# through the model as a single batch.
+
+import threading
+import time
+
+
+class LatestValue:
+    """
+    Thread-safe single-slot mailbox. put() overwrites the previous value;
+    get() waits for a value newer than the sequence number the caller last saw.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._value = None
+        self._seq = -1
+        self._closed = False
+        self.overwritten = 0 # Values replaced before anyone read them (i.e. skipped work)
+        self._read_seq = -1
+
+    def put(self, seq, value):
+        with self._cond:
+            if self._seq > self._read_seq:
+                self.overwritten += 1
+            self._seq, self._value = seq, value
+            self._cond.notify_all()
+
+    def get(self, after=-1, timeout=None):
+        """Returns the newest value with seq > after, or None on timeout/close."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > after or self._closed, timeout):
+                return None
+            if self._seq <= after:
+                return None
+            self._read_seq = max(self._read_seq, self._seq)
+            return self._value
+
+    def peek(self):
+        with self._cond:
+            return self._value
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class FramePacket:
+    __slots__ = ('seq', 'timestamp', 'frame')
+
+    def __init__(self, seq, timestamp, frame):
+        self.seq, self.timestamp, self.frame = seq, timestamp, frame
+
+
+class LandmarkPacket:
+    """
+    MediaPipe output for one frame. `hands` is a list of (track_id, hand_landmarks, (x_min, y_min, x_max, y_max));
+    `live_tracks` holds every track still alive, including hands missed for a frame or two.
+    """
+    __slots__ = ('seq', 'timestamp', 'frame', 'hands', 'live_tracks', 'latency_ms')
+
+    def __init__(self, seq, timestamp, frame, hands, live_tracks, latency_ms):
+        self.seq, self.timestamp, self.frame, self.hands = seq, timestamp, frame, hands
+        self.live_tracks, self.latency_ms = live_tracks, latency_ms
+
+
+class Prediction:
+    """
+    A classification result, tagged with the frame it belongs to. `label` and
+    `confidence` are the frame's most confident result; `hands` lists every
+    result as (track_id, label, confidence, bbox).
+    """
+    __slots__ = ('seq', 'frame_timestamp', 'timestamp', 'label', 'confidence', 'hands', 'latency_ms')
+
+    def __init__(self, seq, frame_timestamp, label, confidence, latency_ms, hands=()):
+        self.seq = seq
+        self.frame_timestamp = frame_timestamp
+        self.timestamp = time.monotonic()
+        self.label = label
+        self.confidence = confidence
+        self.hands = hands
+        self.latency_ms = latency_ms
+
+    @property
+    def age_ms(self):
+        """Capture-to-prediction delay."""
+        return (self.timestamp - self.frame_timestamp) * 1000.0
+
+
+def hand_bounding_box(hand_landmarks, width, height, padding=30):
+    """Pixel bounding box around a hand, padded and clipped to the frame."""
+    x_coords = [landmark.x for landmark in hand_landmarks.landmark]
+    y_coords = [landmark.y for landmark in hand_landmarks.landmark]
+    x_min, x_max = int(min(x_coords) * width), int(max(x_coords) * width)
+    y_min, y_max = int(min(y_coords) * height), int(max(y_coords) * height)
+    return (max(0, x_min - padding), max(0, y_min - padding),
+            min(width, x_max + padding), min(height, y_max + padding))
+
+
+def combine_results(hands, results):
+    """
+    Per-hand classifier results -> (label, confidence, hand_results): the frame's most
+    confident result ('blank' without any) and every result as (track_id, label, confidence, bbox).
+    """
+    label, confidence = 'blank', 1.0
+    hand_results = []
+    for (track_id, _, bbox), result in zip(hands, results):
+        if result:
+            hand_results.append((track_id, result[0], result[1], bbox))
+            if label == 'blank' or result[1] > confidence:
+                label, confidence = result
+    return label, confidence, hand_results
+
+
+class _Stage(threading.Thread):
+    def __init__(self, name, pipeline):
+        super().__init__(name=name, daemon=True)
+        self.pipeline = pipeline
+        self.count = 0
+        self.error = None
+        self._started_at = None
+
+    @property
+    def fps(self):
+        if not self._started_at or not self.count:
+            return 0.0
+        return self.count / max(time.monotonic() - self._started_at, 1e-6)
+
+    def run(self):
+        self._started_at = time.monotonic()
+        try:
+            while not self.pipeline.stopped.is_set():
+                if not self.step():
+                    break
+                self.count += 1
+        except Exception as e:
+            self.error = e
+            print(f"[ERROR] {self.name} stage failed: {e}")
+        finally:
+            self.pipeline.stop()
+
+
+class _CaptureStage(_Stage):
+    def __init__(self, pipeline, source):
+        super().__init__('capture', pipeline)
+        self.source = source
+
+    def step(self):
+        # Frames arrive mirrored, numbered and timestamped in recycled buffers (common/frame_source.py).
+        frame = self.source.read()
+        if frame is None:
+            print("[WARNING] Could not read a frame from the camera. Ending session.")
+            return False
+        self.pipeline.frames.put(frame.seq, FramePacket(frame.seq, frame.timestamp, frame.image))
+        return True
+
+
+class _LandmarkStage(_Stage):
+    def __init__(self, pipeline, hands, roi_tracking, max_hands):
+        from hand_tracker import HandAssociator, HandTracker
+        super().__init__('landmarks', pipeline)
+        self.tracker = HandTracker(hands, tracking=roi_tracking, max_hands=max_hands)
+        self.associator = HandAssociator()
+        self.last_seq = -1
+
+    def step(self):
+        packet = self.pipeline.frames.get(after=self.last_seq, timeout=0.5)
+        if packet is None:
+            return True
+        self.last_seq = packet.seq
+        start = time.perf_counter()
+        found = self.tracker.process(packet.frame)
+        h, w = packet.frame.shape[:2]
+        track_ids = self.associator.update(found)
+        hands = [(track_id, lm, hand_bounding_box(lm, w, h)) for track_id, lm in zip(track_ids, found)]
+        latency_ms = (time.perf_counter() - start) * 1000.0
+        self.pipeline.landmarks.put(packet.seq, LandmarkPacket(packet.seq, packet.timestamp, packet.frame, hands,
+                                                               self.associator.live, latency_ms))
+        return True
+
+
+class _ClassifierStage(_Stage):
+    def __init__(self, pipeline, classify, on_tracks_ended=None):
+        super().__init__('classifier', pipeline)
+        self.classify = classify
+        self.on_tracks_ended = on_tracks_ended
+        self.last_seq = -1
+        self.live_tracks = frozenset()
+        self.hands_per_frame = {} # hand count -> (frames, total classification seconds)
+
+    def step(self):
+        packet = self.pipeline.landmarks.get(after=self.last_seq, timeout=0.5)
+        if packet is None:
+            return True
+        self.last_seq = packet.seq
+        start = time.perf_counter()
+        # Compared with the last packet this stage saw, so skipped packets never hide an ended track.
+        ended = self.live_tracks - packet.live_tracks
+        self.live_tracks = packet.live_tracks
+        if ended and self.on_tracks_ended:
+            self.on_tracks_ended(ended)
+
+        results = self.classify(packet.frame, packet.hands) if packet.hands else []
+        label, confidence, hands = combine_results(packet.hands, results)
+        elapsed = time.perf_counter() - start
+        frames, total = self.hands_per_frame.get(len(packet.hands), (0, 0.0))
+        self.hands_per_frame[len(packet.hands)] = (frames + 1, total + elapsed)
+        self.pipeline.predictions.put(packet.seq, Prediction(packet.seq, packet.timestamp, label, confidence,
+                                                             elapsed * 1000.0, hands))
+        return True
+
+
+class SignPipeline:
+    """
+    Runs capture, MediaPipe and classification concurrently.
+
+    `classify(frame, hands)` gets all of a frame's hands as (track_id, hand_landmarks, bbox)
+    and must return one (label, confidence) or None per hand, in the same order.
+    `on_tracks_ended(track_ids)`, if given, is called on the classifier thread when
+    hands leave the view (e.g. to drop a temporal model's state for them).
+    With `roi_tracking`, MediaPipe searches only around the last known hands;
+    `max_hands` should match the Hands object's max_num_hands (see hand_tracker.py).
+    `source` is a common.frame_source FrameSource (flip=True for the mirrored preview).
+    Consumers read `frames`, `landmarks` and `predictions` (all LatestValue slots).
+    """
+
+    def __init__(self, source, hands, classify, on_tracks_ended=None, roi_tracking=False, max_hands=1):
+        self.frames = LatestValue()
+        self.landmarks = LatestValue()
+        self.predictions = LatestValue()
+        self.stopped = threading.Event()
+        self.stages = [
+            _CaptureStage(self, source),
+            _LandmarkStage(self, hands, roi_tracking, max_hands),
+            _ClassifierStage(self, classify, on_tracks_ended),
+        ]
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        for slot in (self.frames, self.landmarks, self.predictions):
+            slot.close()
+
+    def join(self, timeout=2.0):
+        for stage in self.stages:
+            if stage is not threading.current_thread():
+                stage.join(timeout)
+
+    def stats(self):
+        stats = {stage.name: {'fps': round(stage.fps, 1), 'items': stage.count} for stage in self.stages}
+        stats['capture'].update(self.stages[0].source.stats())
+        stats['landmarks'].update(self.stages[1].tracker.stats())
+        stats['classifier']['ms_by_hand_count'] = {
+            count: round(total * 1000.0 / frames, 2) for count, (frames, total) in sorted(self.stages[2].hands_per_frame.items())
+        }
+        return stats
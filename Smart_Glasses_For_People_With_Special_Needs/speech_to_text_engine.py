@@ -0,0 +1,316 @@
+# Mook Mitra - Streaming Speech-to-Text Engine
+# Offline transcription for the speech card, on top of the Indian English Vosk
+# model (vosk-model-small-en-in, unpacked into vosk_model/; common.model_store
+# falls back to the Morse tools' copy, so one model on disk serves both).
+#
+#   microphone callback --blocks--> BlockQueue --> worker: VAD -> KaldiRecognizer
+#                                                           |-> on_partial(text so far)
+#                                                           '-> on_final(segment)
+#
+# * The audio callback only appends to a bounded deque (atomic, no lock taken) and
+#   sets an event; if decoding falls behind, the oldest blocks are dropped and counted
+#   instead of the queue growing without limit.
+# * Silence is gated out by common.vad before it reaches the decoder; partial
+#   results are decoded at most PARTIAL_RESULTS_PER_SECOND times a second and
+#   reported as the whole transcript so far, so the UI can simply show the latest one.
+# * Recognizers come from common.vosk_service: the shared local service if it is
+#   running, otherwise the model is loaded once in this process.
+# * WAV files go through exactly the same path (transcribe_wav), which is how the
+#   engine is tested without a microphone; stats() reports the real-time factor.
+#
+# Usage:
+#   python speech_to_text_engine.py                     (microphone, Ctrl+C to stop)
+#   python speech_to_text_engine.py --wav sample.wav    (prints partials, text and RTF)
+
+import argparse
+import collections
+import json
+import os
+import sys
+import threading
+import time
+
+# The shared recognition service and VAD live in the repository's `common` folder.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.model_store import ModelNotFound, locate_model
+from common.vad import EnergyVAD, RateLimiter
+from common.vosk_service import open_recognizer
+
+# --- CONFIGURATION ---
+SPEECH_MODEL_PATH = 'vosk_model'
+SAMPLE_RATE = 16000
+BLOCK_SIZE = 4000 # Samples per microphone block (0.25 s at 16 kHz)
+QUEUE_BLOCKS = 40 # Up to 10 s of audio may wait for the decoder before the oldest is dropped
+PARTIAL_RESULTS_PER_SECOND = 4
+# If a shared recognition service is running (python -m common.vosk_service), reuse its warm model.
+RECOGNITION_SERVICE = ('127.0.0.1', 2700)
+LISTEN_TIMEOUT_S = 15.0 # listen_and_transcribe() gives up after this long
+# --- END CONFIGURATION ---
+
+
+class BlockQueue:
+    """
+    Single-producer, single-consumer audio block queue. put() never blocks and
+    takes no lock (deque.append is atomic), so it is safe in a real-time audio callback.
+    """
+
+    def __init__(self, max_blocks=QUEUE_BLOCKS):
+        self._blocks = collections.deque(maxlen=max_blocks)
+        self._ready = threading.Event()
+        self.max_blocks = max_blocks
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, block):
+        if len(self._blocks) == self.max_blocks:
+            self.dropped += 1 # deque(maxlen) discards the oldest block
+        self._blocks.append(block)
+        self.put_count += 1
+        self._ready.set()
+
+    def get_all(self, timeout=None):
+        """Every queued block, oldest first; waits up to `timeout` if there are none."""
+        if not self._blocks:
+            self._ready.wait(timeout)
+        self._ready.clear()
+        blocks = []
+        while True:
+            try:
+                blocks.append(self._blocks.popleft())
+            except IndexError:
+                return blocks
+
+    def wake(self):
+        self._ready.set()
+
+
+class StreamingTranscriber:
+    """
+    Feeds int16 mono audio blocks to a Vosk recognizer and reports text as it is recognized.
+    `on_partial(text)` gets the transcript so far including the words still being decoded;
+    `on_final(segment)` gets each finished segment (the speaker paused).
+    """
+
+    def __init__(self, model_path=SPEECH_MODEL_PATH, sample_rate=SAMPLE_RATE, on_partial=None, on_final=None,
+                 vad=True, service=RECOGNITION_SERVICE, partial_rate=PARTIAL_RESULTS_PER_SECOND):
+        self.model_path = model_path
+        self.sample_rate = sample_rate
+        self.on_partial = on_partial
+        self.on_final = on_final
+        self.vad = EnergyVAD(sample_rate, BLOCK_SIZE) if vad else None
+        self.segments = []
+        self._lease = open_recognizer(model_path, sample_rate, service)
+        self._recognizer = self._lease.recognizer
+        self._partial_limiter = RateLimiter(partial_rate)
+        self._last_partial = None
+        self._queue = None
+        self._stream = None
+        self._worker = None
+        self._stop = threading.Event()
+        self.audio_s = 0.0
+        self.processing_s = 0.0
+        self.blocks = 0
+
+    @property
+    def text(self):
+        return ' '.join(self.segments)
+
+    # --- Decoding ---
+
+    def feed(self, block):
+        """Decodes one block of int16 audio (bytes-like). Callbacks run on the calling thread."""
+        start = time.perf_counter()
+        self.blocks += 1
+        self.audio_s += len(block) / 2 / self.sample_rate
+        if self.vad:
+            forwarded, segment_ended = self.vad.process(block)
+        else:
+            forwarded, segment_ended = [block], False
+
+        for data in forwarded:
+            if self._recognizer.AcceptWaveform(data):
+                self._finish_segment(json.loads(self._recognizer.Result()).get('text', ''))
+            elif self._partial_limiter.ready():
+                partial = json.loads(self._recognizer.PartialResult()).get('partial', '')
+                self._report_partial(partial)
+        if segment_ended:
+            self._finish_segment(json.loads(self._recognizer.FinalResult()).get('text', ''))
+        self.processing_s += time.perf_counter() - start
+
+    def flush(self):
+        """Finishes the segment in progress (end of file, or the user stopped)."""
+        start = time.perf_counter()
+        self._finish_segment(json.loads(self._recognizer.FinalResult()).get('text', ''))
+        self.processing_s += time.perf_counter() - start
+        return self.text
+
+    def _finish_segment(self, segment):
+        if segment:
+            self.segments.append(segment)
+            if self.on_final:
+                self.on_final(segment)
+            self._report_partial('')
+
+    def _report_partial(self, partial):
+        text = f"{self.text} {partial}".strip()
+        if text != self._last_partial and self.on_partial:
+            self._last_partial = text
+            self.on_partial(text)
+
+    # --- Sources ---
+
+    def transcribe_wav(self, path, block_size=BLOCK_SIZE):
+        """Streams a mono 16-bit WAV file through feed() as fast as possible; returns the text."""
+        import wave
+        with wave.open(path, 'rb') as wav:
+            if wav.getnchannels() != 1 or wav.getsampwidth() != 2 or wav.getcomptype() != 'NONE':
+                raise ValueError("Audio must be mono 16-bit PCM WAV.")
+            if wav.getframerate() != self.sample_rate:
+                raise ValueError(f"'{path}' is {wav.getframerate()} Hz; this transcriber runs at {self.sample_rate} Hz.")
+            while True:
+                data = wav.readframes(block_size)
+                if not data:
+                    break
+                self.feed(data)
+        return self.flush()
+
+    def start_microphone(self, device=None, block_size=BLOCK_SIZE):
+        """Starts capturing and decoding in the background; stop() ends it and returns the text."""
+        import sounddevice as sd
+        self._queue = BlockQueue()
+        self._stop.clear()
+
+        def callback(indata, frames, time_info, status):
+            self._queue.put(bytes(indata))
+
+        self._stream = sd.RawInputStream(samplerate=self.sample_rate, blocksize=block_size, device=device,
+                                         dtype='int16', channels=1, callback=callback)
+        self._worker = threading.Thread(target=self._decode_loop, name='speech-to-text', daemon=True)
+        self._worker.start()
+        self._stream.start()
+
+    def _decode_loop(self):
+        while not self._stop.is_set():
+            for block in self._queue.get_all(timeout=0.5):
+                self.feed(block)
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        if self._worker is not None:
+            self._stop.set()
+            self._queue.wake()
+            self._worker.join()
+            self._worker = None
+            for block in self._queue.get_all(timeout=0): # Whatever arrived before the stream stopped
+                self.feed(block)
+        return self.flush()
+
+    def close(self):
+        self.stop()
+        self._lease.close() # Hands the recognizer back to the pool
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self):
+        stats = {
+            'audio_s': round(self.audio_s, 3),
+            'processing_s': round(self.processing_s, 3),
+            # Decoding time per second of audio; below 1.0 keeps up with live speech.
+            'rtf': round(self.processing_s / self.audio_s, 4) if self.audio_s else None,
+            'blocks': self.blocks,
+            'segments': len(self.segments),
+        }
+        if self._queue is not None:
+            stats['dropped_blocks'] = self._queue.dropped
+        if self.vad:
+            stats['vad'] = self.vad.stats()
+        return stats
+
+
+def listen_and_transcribe(on_partial=None, timeout_s=LISTEN_TIMEOUT_S, model_path=SPEECH_MODEL_PATH):
+    """
+    Listens to the microphone until the speaker pauses after the first sentence
+    (or `timeout_s` passes) and returns what was said, or an error message.
+    `on_partial(text)` is called from the decoding thread as words come in.
+    """
+    try:
+        model_path = locate_model(model_path)
+    except ModelNotFound as e:
+        print(f"[ERROR] {e}")
+        return "Speech model not found."
+    finished = threading.Event()
+    try:
+        with StreamingTranscriber(model_path, on_partial=on_partial, on_final=lambda segment: finished.set()) as transcriber:
+            transcriber.start_microphone()
+            finished.wait(timeout_s)
+            text = transcriber.stop()
+            print(f"[INFO] Speech-to-text stats: {transcriber.stats()}")
+            return text
+    except Exception as e:
+        print(f"[ERROR] Speech recognition failed: {e}")
+        return f"Speech recognition error: {e}"
+
+
+def listen_and_recognize():
+    """One voice command for the classic GUI (gui_main.py): prints and returns what was heard."""
+    print("[INFO] Listening for a voice command...")
+    text = listen_and_transcribe(on_partial=lambda partial: print(f"Hearing: {partial.ljust(50)}", end='\r'))
+    print(f"\n[INFO] Recognized: '{text}'")
+    return text
+
+
+def warm_up(model_path=SPEECH_MODEL_PATH):
+    """Loads the model (in the shared service, or in this process) so the first session starts instantly."""
+    import vosk # noqa: F401
+    import sounddevice # noqa: F401
+    open_recognizer(locate_model(model_path), SAMPLE_RATE, RECOGNITION_SERVICE).close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline streaming speech-to-text.")
+    parser.add_argument('--wav', help="Transcribe this mono 16-bit WAV file instead of the microphone.")
+    parser.add_argument('--model', default=SPEECH_MODEL_PATH, help="Path to the Vosk model folder.")
+    parser.add_argument('--no-vad', action='store_true', help="Decode every block, silence included.")
+    parser.add_argument('--local', action='store_true', help="Always load the model in this process.")
+    args = parser.parse_args()
+
+    try:
+        model_path = locate_model(args.model)
+    except ModelNotFound as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+    sample_rate = SAMPLE_RATE
+    if args.wav:
+        import wave
+        with wave.open(args.wav, 'rb') as wav:
+            sample_rate = wav.getframerate()
+
+    on_partial = lambda text: print(f"Partial: {text[-70:].ljust(70)}", end='\r')
+    on_final = lambda segment: print(f"\nFinal:   {segment}")
+    with StreamingTranscriber(model_path, sample_rate, on_partial, on_final, vad=not args.no_vad,
+                              service=None if args.local else RECOGNITION_SERVICE) as transcriber:
+        if args.wav:
+            text = transcriber.transcribe_wav(args.wav)
+        else:
+            print("[INFO] Listening... press Ctrl+C to stop.")
+            transcriber.start_microphone()
+            try:
+                while True:
+                    time.sleep(0.2)
+            except KeyboardInterrupt:
+                pass
+            text = transcriber.stop()
+        print(f"\n\nTranscript: '{text}'")
+        print(f"Stats: {transcriber.stats()}")
+
+
+if __name__ == '__main__':
+    main()
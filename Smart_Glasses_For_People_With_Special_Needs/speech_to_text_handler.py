@@ -1,12 +1,20 @@
 # Mook Mitra - Enhanced Modern GUI (MediaPipe Version)
-# FINAL, MOST STABLE VERSION: Uses a sequential approach to avoid concurrency deadlocks.
+# The camera session runs on a worker thread and is shown inside the app (no OpenCV windows).
 
 import customtkinter as ctk
 from CTkMessagebox import CTkMessagebox
 import threading
+import queue
+import time
 import os
 
 # --- Backend handlers are imported only when needed ---
+# The heavy ones (OpenCV, MediaPipe, TensorFlow + the sign model, the speech
+# engine) are warmed up by preloader.py in the background once the window is up.
+
+SESSION_MAX_FPS = 20 # Camera frames shown in the app per second
+SESSION_POLL_MS = 1000 // SESSION_MAX_FPS
+SESSION_DISPLAY_WIDTH = 720
 
 class MookMitraApp(ctk.CTk):
     def __init__(self):
@@ -33,8 +41,12 @@ class MookMitraApp(ctk.CTk):
         self.create_home_screen()
         
         # --- Safe Initialization ---
+        self.preloader = None
+        self.session_thread = None
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.after(100, self.center_window)
         self.after(200, self.play_welcome_message)
+        self.after(300, self.start_preloading)
 
     def create_sidebar(self):
         sidebar = ctk.CTkFrame(self, width=220, corner_radius=0, fg_color=self.sidebar_color)
@@ -46,7 +58,7 @@ class MookMitraApp(ctk.CTk):
             ("🤟 Sign → Speech (MP)", self.launch_sign_to_speech),
             ("🎤 Speech → Text", self.launch_speech_to_text),
             ("ℹ About", lambda: CTkMessagebox(title="About Mook Mitra", message="This version uses MediaPipe for enhanced hand detection.", icon="info", button_color=self.button_color)),
-            ("❌ Exit", self.destroy),
+            ("❌ Exit", self.on_close),
         ]
         for text, cmd in nav_buttons:
             ctk.CTkButton(
@@ -55,6 +67,14 @@ class MookMitraApp(ctk.CTk):
                 command=cmd, anchor="w"
             ).pack(pady=8, padx=20, fill="x")
 
+        # --- Preloading progress (bottom of the sidebar) ---
+        self.preload_label = ctk.CTkLabel(sidebar, text="Starting up...", font=ctk.CTkFont(size=12),
+                                          text_color=self.subtitle_color, wraplength=180, justify="left")
+        self.preload_label.pack(side="bottom", pady=(0, 20), padx=20, anchor="w")
+        self.preload_bar = ctk.CTkProgressBar(sidebar, height=8, progress_color=self.button_color)
+        self.preload_bar.set(0)
+        self.preload_bar.pack(side="bottom", pady=(0, 6), padx=20, fill="x")
+
     def create_home_screen(self):
         self.home_frame = ctk.CTkFrame(self.main_area, fg_color="transparent")
         self.home_frame.pack(expand=True, fill="both")
@@ -78,9 +98,26 @@ class MookMitraApp(ctk.CTk):
         self.reset_speech_card()
 
     def play_welcome_message(self):
-        from text_to_speech_handler import speak
+        from tts_worker import speak
         self.launch_in_thread(speak, "Welcome to Mook Mitra", True)
 
+    def start_preloading(self):
+        from preloader import Preloader
+        self.preloader = Preloader().start()
+        self.update_preload_progress()
+
+    def update_preload_progress(self):
+        # Polled from the Tk main loop; the preloader thread never touches widgets.
+        done, total, current = self.preloader.progress()
+        self.preload_bar.set(done / total)
+        if not self.preloader.finished:
+            self.preload_label.configure(text=f"Loading {current or '...'} ({done}/{total})")
+            self.after(100, self.update_preload_progress)
+        elif self.preloader.errors:
+            self.preload_label.configure(text=f"Ready ({', '.join(self.preloader.errors)} unavailable)")
+        else:
+            self.preload_label.configure(text="Ready")
+
     def create_card_content(self, parent, icon, title, description, button_text, button_command):
         icon_label = ctk.CTkLabel(parent, text=icon, font=ctk.CTkFont(size=50), text_color=self.text_color)
         icon_label.pack(pady=(30, 10))
@@ -109,21 +146,101 @@ class MookMitraApp(ctk.CTk):
     def show_home(self):
         print("Home button clicked.")
 
+    def on_close(self):
+        if self.session_thread and self.session_thread.is_alive():
+            self.session_commands.put('q')
+            self.session_thread.join(timeout=2.0) # The session releases the camera on its way out
+        self.destroy()
+
     def launch_sign_to_speech(self):
         """
-        Launches the camera sequentially for maximum stability.
-        Temporarily hides the GUI to prevent deadlocks.
+        Runs the camera session on a worker thread and shows it inside the app.
+        The worker hands over finished RGB frames through a one-slot queue; the Tk
+        loop polls it with after(), so the window never waits on the camera.
         """
+        if self.session_thread and self.session_thread.is_alive():
+            return # Already running
         from camera_handler_mediapipe import start_camera
-        
-        self.withdraw() # Hide the main window
-        final_sentence = start_camera() # Run camera function directly (blocking)
-        self.deiconify() # Bring the main window back
-        
-        self.handle_sign_to_speech_result(sentence=final_sentence)
+
+        self.session_frames = queue.Queue(maxsize=1) # Newest frame only
+        self.session_commands = queue.Queue()
+        self.session_result = queue.Queue()
+        self.create_session_view()
+
+        last_sent = [0.0]
+        interval = 1.0 / SESSION_MAX_FPS
+
+        def frame_sink(frame, sentence):
+            # Runs on the worker: throttle, resize and convert here, not on the Tk thread.
+            import cv2
+            now = time.monotonic()
+            if now - last_sent[0] < interval:
+                return
+            last_sent[0] = now
+            height = int(frame.shape[0] * SESSION_DISPLAY_WIDTH / frame.shape[1])
+            rgb = cv2.cvtColor(cv2.resize(frame, (SESSION_DISPLAY_WIDTH, height)), cv2.COLOR_BGR2RGB)
+            try:
+                self.session_frames.get_nowait() # Drop the frame the GUI has not shown yet
+            except queue.Empty:
+                pass
+            self.session_frames.put_nowait((rgb, sentence))
+
+        def run_session():
+            try:
+                result = start_camera(frame_sink=frame_sink, commands=self.session_commands)
+            except Exception as e:
+                result = f"Runtime error: {e}"
+            self.session_result.put(result)
+
+        self.session_thread = threading.Thread(target=run_session, daemon=True)
+        self.session_thread.start()
+        self.after(SESSION_POLL_MS, self.poll_session)
+
+    def create_session_view(self):
+        self.home_frame.pack_forget()
+        self.session_frame = ctk.CTkFrame(self.main_area, corner_radius=15, fg_color=self.card_color)
+        self.session_frame.pack(expand=True, fill="both")
+        self.session_video = ctk.CTkLabel(self.session_frame, text="Starting camera...", text_color=self.subtitle_color)
+        self.session_video.pack(expand=True, pady=(20, 10))
+        self.session_sentence = ctk.CTkLabel(self.session_frame, text="Sentence: ", font=ctk.CTkFont(size=20, weight="bold"),
+                                             text_color=self.text_color)
+        self.session_sentence.pack(pady=5)
+        controls = ctk.CTkFrame(self.session_frame, fg_color="transparent")
+        controls.pack(pady=(5, 20))
+        for text, command in (("Space (S)", 's'), ("Clear (C)", 'c'), ("Stop (Q)", 'q')):
+            ctk.CTkButton(controls, text=text, width=140, height=40, fg_color=self.button_color,
+                          command=lambda c=command: self.session_commands.put(c)).pack(side="left", padx=10)
+        for key in ('s', 'c', 'q'):
+            self.bind(f"<KeyPress-{key}>", lambda event, c=key: self.session_commands.put(c))
+
+    def poll_session(self):
+        # Never blocks: at most one frame conversion per call.
+        try:
+            rgb, sentence = self.session_frames.get_nowait()
+        except queue.Empty:
+            pass
+        else:
+            from PIL import Image
+            image = ctk.CTkImage(light_image=Image.fromarray(rgb), size=(rgb.shape[1], rgb.shape[0]))
+            self.session_video.configure(image=image, text="")
+            self.session_video.image = image # Keep a reference so Tk does not drop it
+            self.session_sentence.configure(text=f"Sentence: {sentence}")
+        try:
+            result = self.session_result.get_nowait()
+        except queue.Empty:
+            self.after(SESSION_POLL_MS, self.poll_session)
+            return
+        self.close_session_view()
+        self.handle_sign_to_speech_result(sentence=result)
+
+    def close_session_view(self):
+        for key in ('s', 'c', 'q'):
+            self.unbind(f"<KeyPress-{key}>")
+        self.session_frame.destroy()
+        self.home_frame.pack(expand=True, fill="both")
 
     def handle_sign_to_speech_result(self, sentence):
-        from text_to_speech_handler import speak
+        from tts_worker import speak
         if sentence and "not found" not in sentence and "error" not in sentence.lower():
             msg = f"The final detected sentence is:\n\n'{sentence}'"
             CTkMessagebox(title="Sentence Detected", message=msg, icon="check", button_color=self.button_color)
@@ -142,12 +259,22 @@ class MookMitraApp(ctk.CTk):
         self.launch_in_thread(self.run_and_show_result)
 
     def run_and_show_result(self):
-        from speech_to_text_handler import listen_and_transcribe
-        transcribed_text = listen_and_transcribe()
+        from speech_to_text_engine import listen_and_transcribe
+        # Words appear in the card while the user is still speaking.
+        transcribed_text = listen_and_transcribe(on_partial=lambda text: self.after(0, self.show_partial_transcription, text))
         self.after(100, self.update_ui_with_transcription, transcribed_text)
 
+    def show_partial_transcription(self, text):
+        if self.speech_title.cget("text") != "Listening...":
+            return # A late partial after the final result
+        self.speech_desc.configure(state="normal")
+        self.speech_desc.delete("1.0", "end")
+        self.speech_desc.insert("1.0", text)
+        self.speech_desc.see("end")
+        self.speech_desc.configure(state="disabled")
+
     def update_ui_with_transcription(self, text):
-        from text_to_speech_handler import speak
+        from tts_worker import speak
         self.speech_title.configure(text="Transcription Complete")
         self.speech_icon.configure(text="✅")
         self.speech_desc.configure(state="normal")
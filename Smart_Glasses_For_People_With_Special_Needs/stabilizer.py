@@ -0,0 +1,137 @@
+# Mook Mitra - Prediction Stabilizer
+# Turns the flickering per-frame predictions into stable letters and builds the
+# sentence from them.
+#
+# PredictionStabilizer keeps the last `size` predictions in a ring buffer and a
+# running per-class histogram, so every update costs the same no matter how big
+# the window is (no list.pop(0), no recounting). Votes can be weighted by the
+# model's confidence, and an optional time window drops predictions older than
+# `window_s` seconds, which keeps the behaviour the same at any frame rate.
+#
+# SentenceBuilder holds the rule the camera loop has always used: a stable letter
+# is spoken and appended once, and can only repeat after the prediction became
+# unstable (or blank) in between.
+#
+# Tests:  python -m pytest test_stabilizer.py
+
+import time
+
+BLANK = 'blank'
+
+
+class PredictionStabilizer:
+    def __init__(self, size=20, threshold=0.8, weighted=False, window_s=None):
+        self.size = size
+        self.threshold = threshold
+        self.weighted = weighted
+        self.window_s = window_s
+        self._labels = [None] * size
+        self._weights = [0.0] * size
+        self._timestamps = [0.0] * size
+        self.clear()
+
+    def clear(self):
+        self._start = 0 # Oldest entry
+        self.count = 0
+        self._histogram = {} # label -> summed weight
+        self._counts = {} # label -> number of entries, so classes leave the histogram exactly
+        self._total = 0.0
+        self._best = None
+        self._first_timestamp = None
+
+    def _add(self, label, weight, timestamp):
+        end = (self._start + self.count) % self.size
+        self._labels[end], self._weights[end], self._timestamps[end] = label, weight, timestamp
+        self.count += 1
+        self._histogram[label] = self._histogram.get(label, 0.0) + weight
+        self._counts[label] = self._counts.get(label, 0) + 1
+        self._total += weight
+        if self._best is None or self._histogram[label] >= self._histogram[self._best]:
+            self._best = label
+
+    def _evict_oldest(self):
+        label, weight = self._labels[self._start], self._weights[self._start]
+        self._labels[self._start] = None
+        self._start = (self._start + 1) % self.size
+        self.count -= 1
+        self._total -= weight
+        self._counts[label] -= 1
+        if self._counts[label] == 0:
+            del self._counts[label], self._histogram[label]
+        else:
+            self._histogram[label] -= weight
+        if self.count == 0:
+            self._total, self._best = 0.0, None
+        elif label == self._best:
+            # Only the leader losing a vote can change the leader; at most one pass over the classes.
+            self._best = max(self._histogram, key=self._histogram.get)
+
+    def update(self, label, confidence=1.0, timestamp=None):
+        """
+        Adds one prediction. Returns (stable_label, stability): stable_label is the
+        winning class once the window is full and it holds at least `threshold` of
+        the votes, otherwise None.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        if self.window_s is not None:
+            while self.count and self._timestamps[self._start] < timestamp - self.window_s:
+                self._evict_oldest()
+        if self.count == 0:
+            self._first_timestamp = timestamp # Coverage starts again after a gap that emptied the window
+        if self.count == self.size:
+            self._evict_oldest()
+        self._add(label, max(float(confidence), 0.0) if self.weighted else 1.0, timestamp)
+
+        stability = self.stability
+        if self.ready and stability >= self.threshold:
+            return self._best, stability
+        return None, stability
+
+    @property
+    def ready(self):
+        """Full buffer, or - with a time window - predictions covering the whole window."""
+        if self.count == self.size:
+            return True
+        if self.window_s is None or self.count == 0:
+            return False
+        newest = self._timestamps[(self._start + self.count - 1) % self.size]
+        return newest - self._first_timestamp >= self.window_s
+
+    @property
+    def leader(self):
+        return self._best
+
+    @property
+    def stability(self):
+        if self._total <= 0.0:
+            return 0.0
+        return self._histogram[self._best] / self._total
+
+
+class SentenceBuilder:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.sentence = ""
+        self._last_committed = ""
+
+    def feed(self, stable_label):
+        """
+        Feeds the stabilizer's output for one prediction. Returns the label that was
+        just appended to the sentence (and should be spoken), or None.
+        """
+        if stable_label is None or stable_label == BLANK:
+            self._last_committed = "" # The same letter may now be signed again
+            return None
+        if stable_label == self._last_committed:
+            return None
+        self.sentence += stable_label
+        self._last_committed = stable_label
+        return stable_label
+
+    def add_space(self):
+        self.sentence += " "
+
@@ -0,0 +1,171 @@
+# Mook Mitra - Temporal Sign Model
+# Recognizes dynamic signs and words from a SEQUENCE of hand landmark vectors,
+# instead of one frame at a time.
+#
+# Model: a small causal 1-D convolution stack (dilations 1, 2, 4) over the last
+# WINDOW frames of 63-float landmark features (see landmark_classifier.py),
+# averaged over time and followed by a softmax layer. It is trained with Keras
+# (train_temporal_model.py) and run here in plain NumPy.
+#
+# Streaming inference: the model was trained on isolated WINDOW-frame windows,
+# each zero-padded at its start by the causal convolutions. To give exactly the
+# same output live, every step re-evaluates the last WINDOW frames from scratch
+# (about a million multiply-adds, well under a millisecond) instead of carrying
+# convolution state across windows, which would let frames from before the
+# window leak in. Buffers are preallocated, so a step allocates nothing. Call
+# reset() when the hand leaves the view.
+
+import numpy as np
+
+from landmark_classifier import FEATURE_SIZE
+
+WINDOW = 30 # Frames per sign (~1 s at 30 FPS)
+DILATIONS = (1, 2, 4)
+KERNEL_SIZE = 3
+FILTERS = 64
+DEFAULT_MODEL_PATH = 'model/temporal_model.npz'
+
+
+class LandmarkSequenceBuffer:
+    """Fixed-length ring buffer of landmark vectors, preallocated and updated in place."""
+
+    def __init__(self, window=WINDOW, feature_size=FEATURE_SIZE):
+        self.data = np.zeros((window, feature_size), dtype=np.float32)
+        self.window = window
+        self.position = 0 # Next slot to overwrite (= oldest entry once full)
+        self.count = 0
+
+    def push(self, features):
+        self.data[self.position] = features
+        self.position = (self.position + 1) % self.window
+        self.count = min(self.count + 1, self.window)
+
+    @property
+    def full(self):
+        return self.count == self.window
+
+    def ordered(self, out=None):
+        """Copies the buffer oldest-first into `out` (allocated once by the caller)."""
+        if out is None:
+            out = np.empty_like(self.data)
+        tail = self.window - self.position
+        out[:tail] = self.data[self.position:]
+        out[tail:] = self.data[:self.position]
+        return out
+
+    def clear(self):
+        self.position = 0
+        self.count = 0
+
+
+class _CausalConv:
+    """One causal Conv1D + ReLU layer over a whole window, as Keras computes it (zero padding on the left)."""
+
+    def __init__(self, kernel, bias, dilation, window):
+        self.kernel = kernel # (kernel_size, in_channels, out_channels), Keras layout
+        self.bias = bias
+        self.dilation = dilation
+        self.window = window
+        self.pad = (kernel.shape[0] - 1) * dilation
+        # Input with its zero padding in front; the previous layer writes straight into input.
+        self.padded = np.zeros((self.pad + window, kernel.shape[1]), dtype=np.float32)
+        self.input = self.padded[self.pad:]
+        self._tap = np.empty((window, kernel.shape[2]), dtype=np.float32)
+
+    def forward(self, out):
+        """Writes relu(conv(self.input)) into `out` (window, out_channels)."""
+        # Keras causal conv: output[t] = sum_i kernel[i] . x[t - (size - 1 - i) * dilation]
+        np.matmul(self.padded[:self.window], self.kernel[0], out=out)
+        for i in range(1, self.kernel.shape[0]):
+            start = i * self.dilation
+            np.matmul(self.padded[start:start + self.window], self.kernel[i], out=self._tap)
+            out += self._tap
+        out += self.bias
+        np.maximum(out, 0.0, out=out)
+        return out
+
+
+class StreamingTemporalClassifier:
+    """
+    NumPy version of the Keras model built by build_keras_model(), fed one frame at
+    a time. Each result equals the Keras model's output for the last `window` frames.
+    """
+
+    def __init__(self, labels, params, window=WINDOW):
+        self.labels = list(labels)
+        self.window = window
+        self.params = params
+        self.layers = [
+            _CausalConv(params[f'conv{i}_kernel'], params[f'conv{i}_bias'], int(params[f'conv{i}_dilation']), window)
+            for i in range(int(params['num_conv']))
+        ]
+        self._frames = LandmarkSequenceBuffer(window, self.layers[0].kernel.shape[1])
+        self._output = np.empty((window, self.layers[-1].kernel.shape[2]), dtype=np.float32)
+        self._mean = np.empty(self.layers[-1].kernel.shape[2], dtype=np.float32)
+        self._logits = np.empty(len(self.labels), dtype=np.float32)
+
+    @classmethod
+    def from_keras(cls, model, labels, window=WINDOW):
+        import tensorflow as tf
+        params = {}
+        convs = [layer for layer in model.layers if isinstance(layer, tf.keras.layers.Conv1D)]
+        for i, layer in enumerate(convs):
+            kernel, bias = layer.get_weights()
+            params[f'conv{i}_kernel'], params[f'conv{i}_bias'] = kernel, bias
+            params[f'conv{i}_dilation'] = np.array(layer.dilation_rate[0])
+        params['num_conv'] = np.array(len(convs))
+        params['dense_kernel'], params['dense_bias'] = model.layers[-1].get_weights()
+        return cls(labels, {k: np.asarray(v, dtype=np.float32) if v.ndim else v for k, v in params.items()}, window)
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            labels = [str(label) for label in data['labels']]
+            window = int(data['window'])
+            params = {name: data[name] for name in data.files if name not in ('labels', 'window')}
+        return cls(labels, params, window)
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        np.savez(path, labels=np.array(self.labels), window=np.array(self.window), **self.params)
+
+    def clone(self):
+        """A classifier sharing these weights with its own, empty streaming state (e.g. one per tracked hand)."""
+        return StreamingTemporalClassifier(self.labels, self.params, self.window)
+
+    def step(self, features):
+        """
+        Feeds one frame's landmark features. Returns (label, confidence) for the last
+        `window` frames once that many have been seen, otherwise None.
+        """
+        self._frames.push(features)
+        if not self._frames.full:
+            return None
+
+        self._frames.ordered(out=self.layers[0].input)
+        for layer, following in zip(self.layers, self.layers[1:] + [None]):
+            layer.forward(following.input if following else self._output)
+
+        self._output.mean(axis=0, out=self._mean)
+        np.dot(self._mean, self.params['dense_kernel'], out=self._logits)
+        self._logits += self.params['dense_bias']
+        self._logits -= self._logits.max()
+        np.exp(self._logits, out=self._logits)
+        best = int(self._logits.argmax())
+        return self.labels[best], float(self._logits[best] / self._logits.sum())
+
+    def reset(self):
+        self._frames.clear()
+
+
+def build_keras_model(num_classes, window=WINDOW):
+    """The training-time version of StreamingTemporalClassifier."""
+    import tensorflow as tf
+    layers = [tf.keras.layers.Input(shape=(window, FEATURE_SIZE))]
+    for dilation in DILATIONS:
+        layers.append(tf.keras.layers.Conv1D(FILTERS, KERNEL_SIZE, dilation_rate=dilation, padding='causal', activation='relu'))
+    layers += [
+        tf.keras.layers.GlobalAveragePooling1D(),
+        tf.keras.layers.Dropout(0.3),
+        tf.keras.layers.Dense(num_classes, activation='softmax'),
+    ]
+    return tf.keras.Sequential(layers)
@@ -0,0 +1,90 @@
+# Tests for preprocessing.py:  python -m pytest test_preprocessing.py
+
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from preprocessing import (PREPROCESSING_VERSION, PreprocessingMismatch, PreprocessingSpec, Preprocessor, load_spec,
+                           save_spec, spec_path_for)
+
+INTERPOLATIONS = {'nearest': getattr(cv2, 'INTER_NEAREST_EXACT', cv2.INTER_NEAREST), 'linear': cv2.INTER_LINEAR,
+                  'area': cv2.INTER_AREA}
+
+
+def random_images(count, seed=0):
+    """BGR uint8 images of different sizes, like hand crops."""
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (int(rng.integers(20, 200)), int(rng.integers(20, 200)), 3), dtype=np.uint8)
+            for _ in range(count)]
+
+
+def reference(image, spec):
+    """One image the straightforward way: resize, convert, scale."""
+    resized = cv2.resize(image, (spec.width, spec.height), interpolation=INTERPOLATIONS[spec.interpolation])
+    if spec.color == 'gray':
+        converted = cv2.cvtColor(resized, cv2.COLOR_BGR2GRAY)[..., np.newaxis]
+    else:
+        converted = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+    return converted.astype(np.float32) * np.float32(spec.scale)
+
+
+@pytest.mark.parametrize('color', ['rgb', 'gray'])
+@pytest.mark.parametrize('interpolation', ['nearest', 'linear', 'area'])
+def test_batch_matches_per_image(color, interpolation):
+    spec = PreprocessingSpec(48, 64, color=color, interpolation=interpolation)
+    images = random_images(5)
+    batch = Preprocessor(spec, max_batch=2).transform(images) # Grows past max_batch
+    assert batch.shape == (5, 48, 64, spec.channels) and batch.dtype == np.float32
+    for image, output in zip(images, batch):
+        np.testing.assert_allclose(output, reference(image, spec), rtol=1e-6)
+
+
+def test_out_parameter_and_transform_one():
+    spec = PreprocessingSpec(32, 32)
+    preprocessor = Preprocessor(spec)
+    images = random_images(3, seed=1)
+    out = np.full((4, 32, 32, 3), -1.0, dtype=np.float32)
+    result = preprocessor.transform(images, out=out[1:])
+    assert np.shares_memory(result, out)
+    assert np.all(out[0] == -1.0) # Nothing written outside the given rows
+    for image, output in zip(images, out[1:]):
+        np.testing.assert_allclose(output, reference(image, spec), rtol=1e-6)
+    np.testing.assert_allclose(preprocessor.transform_one(images[0]), reference(images[0], spec), rtol=1e-6)
+
+
+def test_spec_round_trip(tmp_path):
+    model_path = str(tmp_path / 'sign.h5')
+    spec = PreprocessingSpec(64, 64, color='gray', interpolation='area')
+    save_spec(model_path, spec)
+    assert spec_path_for(model_path) == str(tmp_path / 'sign.preprocessing.json')
+    assert load_spec(model_path, (64, 64, 1)) == spec
+
+
+def test_spec_is_per_model(tmp_path):
+    save_spec(str(tmp_path / 'a.h5'), PreprocessingSpec(64, 64))
+    inferred = load_spec(str(tmp_path / 'b.h5'), (32, 32, 3)) # Not checked against a.h5's spec
+    assert inferred.input_shape == (32, 32, 3) and inferred.version == 0
+
+
+def test_wrong_shape_is_refused(tmp_path):
+    model_path = str(tmp_path / 'sign.h5')
+    save_spec(model_path, PreprocessingSpec(64, 64))
+    with pytest.raises(PreprocessingMismatch):
+        load_spec(model_path, (128, 128, 1))
+
+
+def test_newer_version_is_refused(tmp_path):
+    model_path = str(tmp_path / 'sign.h5')
+    data = PreprocessingSpec(64, 64).to_dict()
+    data['version'] = PREPROCESSING_VERSION + 1
+    with open(spec_path_for(model_path), 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    with pytest.raises(PreprocessingMismatch):
+        load_spec(model_path, (64, 64, 3))
+
+
+def test_missing_spec_without_shape_is_refused(tmp_path):
+    with pytest.raises(PreprocessingMismatch):
+        load_spec(str(tmp_path / 'sign.h5'))
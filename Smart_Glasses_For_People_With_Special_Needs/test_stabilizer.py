@@ -0,0 +1,82 @@
+# Tests for stabilizer.py:  python -m pytest test_stabilizer.py
+
+import time
+
+from stabilizer import BLANK, PredictionStabilizer, SentenceBuilder
+
+
+def test_held_letter_is_added_once():
+    sentence = SentenceBuilder()
+    assert sentence.feed('A') == 'A'
+    assert sentence.feed('A') is None
+
+
+def test_letter_repeats_after_an_unstable_gap():
+    sentence = SentenceBuilder()
+    sentence.feed('A')
+    assert sentence.feed(None) is None
+    assert sentence.feed('A') == 'A'
+
+
+def test_letter_repeats_after_blank():
+    sentence = SentenceBuilder()
+    assert sentence.feed('B') == 'B'
+    assert sentence.feed(BLANK) is None
+    assert sentence.feed('B') == 'B'
+    sentence.add_space()
+    assert sentence.sentence == "BB "
+
+
+def test_clear_forgets_the_last_letter_too():
+    sentence = SentenceBuilder()
+    sentence.feed('B')
+    sentence.clear()
+    assert sentence.sentence == ""
+    assert sentence.feed('B') == 'B'
+
+
+def test_stable_only_once_full():
+    stabilizer = PredictionStabilizer(size=5, threshold=0.8)
+    results = [stabilizer.update(label, timestamp=i) for i, label in enumerate('AAAAXAA')]
+    assert [r[0] for r in results] == [None, None, None, None, 'A', 'A', 'A']
+    assert stabilizer.update('X', timestamp=7) == (None, 0.6) # Two X votes out of five
+
+
+def test_confident_votes_outweigh_unsure_ones():
+    stabilizer = PredictionStabilizer(size=4, threshold=0.6, weighted=True)
+    for i, (label, confidence) in enumerate([('A', 0.9), ('B', 0.2), ('A', 0.9), ('B', 0.2)]):
+        stable, _ = stabilizer.update(label, confidence, timestamp=i)
+    assert stable == 'A'
+
+
+def test_time_window():
+    stabilizer = PredictionStabilizer(size=100, threshold=0.8, window_s=1.0)
+    for i in range(30):
+        stable, _ = stabilizer.update('C', timestamp=i / 30)
+    assert stable is None # Window not covered yet
+    stable, _ = stabilizer.update('C', timestamp=1.0)
+    assert stable == 'C' and stabilizer.count == 31
+    assert stabilizer.update('D', timestamp=2.5) == (None, 1.0) # A lone vote after a gap is not stable
+    assert stabilizer.count == 1 and stabilizer.leader == 'D' # Old predictions expire
+    assert not stabilizer.ready
+    stable, _ = stabilizer.update('D', timestamp=3.5)
+    assert stable == 'D' # Stable once the new run covers the window again
+
+
+def test_gap_longer_than_the_window():
+    stabilizer = PredictionStabilizer(size=100, threshold=0.8, window_s=0.7)
+    for i in range(30):
+        stabilizer.update(BLANK, timestamp=i / 30)
+    assert stabilizer.update('X', timestamp=2.0) == (None, 1.0)
+    assert stabilizer.count == 1 and not stabilizer.ready
+
+
+def test_update_cost_does_not_grow_with_the_window():
+    def per_update_s(size, n=20_000):
+        stabilizer = PredictionStabilizer(size=size)
+        start = time.perf_counter()
+        for i in range(n):
+            stabilizer.update('AB'[i % 7 == 0], timestamp=i)
+        return (time.perf_counter() - start) / n
+
+    assert per_update_s(10_000) < per_update_s(10) * 5
@@ -0,0 +1,129 @@
+# Mook Mitra - Landmark Classifier Training Script
+# Extracts MediaPipe hand landmarks from the same Kaggle ISL image folders used by
+# train_with_new_dataset.py (data/A, data/B, ..., data/0, ...) and trains the
+# landmark classifier used by start_camera(classifier='landmarks').
+# Landmarks come from the preprocessed dataset cache, so re-training is fast.
+#
+# Both model kinds are trained; the one with the better validation accuracy is
+# saved to model/landmark_classifier.npz (or force one with --kind).
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+import dataset_cache
+from landmark_classifier import DEFAULT_MODEL_PATH, FEATURE_SIZE, LandmarkClassifier, mirror_features
+
+DATA_DIR = 'data'
+VALIDATION_SPLIT = 0.2
+SEED = 42
+
+
+def extract_features(data_dir=DATA_DIR, workers=None):
+    """
+    Landmark features of every image with a detectable hand: (features, label_indices, labels).
+    MediaPipe only runs on images that are new since the last run (see dataset_cache.py).
+    """
+    cache = dataset_cache.build(data_dir, workers=workers)
+    features, label_indices = cache.landmark_features()
+    print(f"[INFO] Loaded {len(features)} landmark vectors ({len(cache) - len(features)} images had no detectable hand).")
+    return features.reshape(-1, FEATURE_SIZE), label_indices, cache.labels
+
+
+def split(features, label_indices, validation_split=VALIDATION_SPLIT, seed=SEED):
+    order = np.random.default_rng(seed).permutation(len(features))
+    n_val = int(len(order) * validation_split)
+    val, train = order[:n_val], order[n_val:]
+    return features[train], label_indices[train], features[val], label_indices[val]
+
+
+def with_mirrors(features, label_indices):
+    """The camera frame is mirrored for the user, so train on both hands' versions."""
+    return np.concatenate([features, mirror_features(features)]), np.concatenate([label_indices, label_indices])
+
+
+def train_mlp(x_train, y_train, x_val, y_val, num_classes, epochs=60):
+    import tensorflow as tf
+
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(FEATURE_SIZE,)),
+        tf.keras.layers.Dense(128, activation='relu'),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.Dense(num_classes, activation='softmax'),
+    ])
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    model.fit(x_train, y_train, validation_data=(x_val, y_val), epochs=epochs, batch_size=64, verbose=2)
+    return model
+
+
+def accuracy(classifier, features, label_indices, labels):
+    if len(features) == 0:
+        return 0.0
+    # Compared by name: a classifier may leave out labels it had no samples for.
+    predicted = np.asarray(classifier.labels)[classifier.predict_proba(features).argmax(axis=1)]
+    return float((predicted == np.asarray(labels)[label_indices]).mean())
+
+
+def time_single_prediction_us(classifier, sample, runs=2000):
+    start = time.perf_counter()
+    for _ in range(runs):
+        classifier.predict_one(sample)
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the Mook Mitra landmark sign classifier.")
+    parser.add_argument('--data', default=DATA_DIR)
+    parser.add_argument('--output', default=DEFAULT_MODEL_PATH)
+    parser.add_argument('--kind', choices=('best', 'centroid', 'mlp'), default='best')
+    parser.add_argument('--epochs', type=int, default=60)
+    parser.add_argument('--workers', type=int, help="MediaPipe processes for new images (default: one per CPU).")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.data):
+        print(f"[ERROR] Data directory not found at '{args.data}'.")
+        print("Please create a 'data' folder and organize your Kaggle images into subfolders (e.g., 'A', 'B', '0', '1').")
+        return
+
+    features, label_indices, labels = extract_features(args.data, args.workers)
+    if len(features) == 0:
+        print("[ERROR] No hands were detected in the dataset.")
+        return
+
+    x_train, y_train, x_val, y_val = split(features, label_indices)
+    x_train, y_train = with_mirrors(x_train, y_train)
+
+    missing = [label for i, label in enumerate(labels) if not np.any(y_train == i)]
+    if missing:
+        print(f"[WARNING] No hands detected for {', '.join(missing)}; these signs cannot be recognized.")
+
+    candidates = {}
+    if args.kind in ('best', 'centroid'):
+        candidates['centroid'] = LandmarkClassifier.fit_centroids(x_train, y_train, labels)
+    if args.kind in ('best', 'mlp'):
+        try:
+            keras_model = train_mlp(x_train, y_train, x_val, y_val, len(labels), args.epochs)
+            candidates['mlp'] = LandmarkClassifier.from_keras(keras_model, labels)
+        except ImportError:
+            print("[WARNING] TensorFlow is not installed; skipping the MLP classifier.")
+
+    if not candidates:
+        print("[ERROR] No classifier could be trained. Install TensorFlow or use --kind centroid.")
+        sys.exit(1)
+
+    scores = {kind: accuracy(clf, x_val, y_val, labels) for kind, clf in candidates.items()}
+    for kind, clf in candidates.items():
+        print(f"[RESULT] {kind:<8} validation accuracy {scores[kind] * 100:.2f}%, "
+              f"{time_single_prediction_us(clf, x_val[0] if len(x_val) else x_train[0]):.1f} us per prediction")
+
+    best = max(scores, key=scores.get)
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    candidates[best].save(args.output)
+    print(f"\nTraining complete! The '{best}' landmark classifier has been saved to '{args.output}'")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+# Mook Mitra - Temporal Sign Model Training Script
+# Trains the dynamic-sign model used by start_camera(classifier='temporal').
+#
+# Expected data layout - one folder per sign or word, one short clip per example:
+#   sequences/HELLO/clip01.mp4
+#   sequences/THANK_YOU/clip01.mp4
+#   ...
+# Clips are run through MediaPipe once and cut into overlapping WINDOW-frame
+# sequences of landmark features. Landmarks of a clip are cached next to it as
+# <clip>.npy, so re-training after changing the model skips MediaPipe.
+
+import argparse
+import os
+
+import numpy as np
+
+from landmark_classifier import FEATURE_SIZE, landmarks_to_array, mirror_features, normalize_landmarks
+from temporal_model import DEFAULT_MODEL_PATH, WINDOW, StreamingTemporalClassifier, build_keras_model
+
+DATA_DIR = 'sequences'
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+WINDOW_STRIDE = 5
+VALIDATION_SPLIT = 0.2
+SEED = 42
+
+
+def clip_features(path):
+    """Landmark features for every frame of a clip that shows a hand, shaped (frames, 63)."""
+    cache_path = os.path.splitext(path)[0] + '.npy'
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+        return np.load(cache_path)
+
+    import cv2
+    import mediapipe as mp
+
+    features = []
+    points = np.empty((21, 3), dtype=np.float32)
+    cap = cv2.VideoCapture(path)
+    with mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1, min_detection_confidence=0.5) as hands:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            # Same orientation as the live camera, which flips frames for the user.
+            results = hands.process(cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB))
+            if results.multi_hand_landmarks:
+                features.append(normalize_landmarks(landmarks_to_array(results.multi_hand_landmarks[0], out=points)))
+    cap.release()
+
+    features = np.array(features, dtype=np.float32).reshape(-1, FEATURE_SIZE)
+    np.save(cache_path, features)
+    return features
+
+
+def windows(features, window=WINDOW, stride=WINDOW_STRIDE):
+    """Overlapping fixed-length windows; clips shorter than one window are skipped."""
+    if len(features) < window:
+        return np.empty((0, window, FEATURE_SIZE), dtype=np.float32)
+    view = np.lib.stride_tricks.sliding_window_view(features, window, axis=0) # (n, 63, window)
+    return np.ascontiguousarray(view[::stride].transpose(0, 2, 1))
+
+
+def load_dataset(data_dir=DATA_DIR):
+    """
+    Returns (train_x, train_y, val_x, val_y, val_clips, labels). Whole clips are split
+    between training and validation, so overlapping windows never end up on both sides.
+    val_clips lists (features, label index) per validation clip, for streaming checks.
+    """
+    labels = sorted(d for d in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, d)))
+    clips = []
+    for index, label in enumerate(labels):
+        folder = os.path.join(data_dir, label)
+        names = sorted(f for f in os.listdir(folder) if f.lower().endswith(VIDEO_EXTENSIONS))
+        for name in names:
+            clips.append((os.path.join(folder, name), index))
+        print(f"[INFO] Class '{label}': {len(names)} clips.")
+
+    order = np.random.default_rng(SEED).permutation(len(clips))
+    n_val = int(len(clips) * VALIDATION_SPLIT)
+    sets = {'train': ([], []), 'val': ([], [])}
+    val_clips = []
+    for position, clip_index in enumerate(order):
+        path, label_index = clips[clip_index]
+        features = clip_features(path)
+        x = windows(features)
+        if position < n_val and len(features) >= WINDOW:
+            val_clips.append((features, label_index))
+        xs, ys = sets['val' if position < n_val else 'train']
+        xs.append(x)
+        ys.append(np.full(len(x), label_index))
+
+    def stack(xs, ys):
+        if not xs:
+            return np.empty((0, WINDOW, FEATURE_SIZE), dtype=np.float32), np.empty(0, dtype=int)
+        return np.concatenate(xs), np.concatenate(ys)
+
+    return (*stack(*sets['train']), *stack(*sets['val']), val_clips, labels)
+
+
+def streaming_accuracy(classifier, clips, model=None):
+    """
+    Streams every validation clip whole through the NumPy model, one frame at a time
+    and with one reset per clip (like a hand entering the live view), and scores every
+    prediction. With the Keras `model`, also returns the largest confidence difference
+    from it on the same windows (the two must agree). Returns (accuracy, max difference).
+    """
+    correct = total = 0
+    max_difference = 0.0
+    for features, label_index in clips:
+        classifier.reset()
+        results = [classifier.step(frame_features) for frame_features in features][WINDOW - 1:]
+        correct += sum(label == classifier.labels[label_index] for label, _ in results)
+        total += len(results)
+        if model is not None:
+            expected = model.predict(windows(features, stride=1), verbose=0)
+            for (label, confidence), probabilities in zip(results, expected):
+                max_difference = max(max_difference, abs(confidence - float(probabilities[classifier.labels.index(label)])))
+    return (correct / total if total else 0.0), max_difference
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the Mook Mitra temporal (dynamic sign) model.")
+    parser.add_argument('--data', default=DATA_DIR)
+    parser.add_argument('--output', default=DEFAULT_MODEL_PATH)
+    parser.add_argument('--epochs', type=int, default=80)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.data):
+        print(f"[ERROR] Data directory not found at '{args.data}'.")
+        print("Please create a 'sequences' folder with one subfolder of short video clips per sign.")
+        return
+
+    x_train, y_train, x_val, y_val, val_clips, labels = load_dataset(args.data)
+    if len(x_train) == 0:
+        print(f"[ERROR] No clip was long enough for a {WINDOW}-frame window.")
+        return
+    # The camera frame is mirrored for the user, so train on both hands' versions.
+    x_train = np.concatenate([x_train, mirror_features(x_train.reshape(-1, FEATURE_SIZE)).reshape(x_train.shape)])
+    y_train = np.concatenate([y_train, y_train])
+    print(f"[INFO] {len(x_train)} training and {len(x_val)} validation windows of {WINDOW} frames.")
+
+    model = build_keras_model(len(labels))
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    validation_data = (x_val, y_val) if len(x_val) else None
+    model.fit(x_train, y_train, validation_data=validation_data, epochs=args.epochs, batch_size=32, verbose=2)
+
+    classifier = StreamingTemporalClassifier.from_keras(model, labels)
+    accuracy, difference = streaming_accuracy(classifier, val_clips, model)
+    print(f"[RESULT] Streaming validation accuracy {accuracy * 100:.2f}% over whole clips "
+          f"(largest confidence difference from Keras: {difference:.2e})")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    classifier.save(args.output)
+    print(f"\nTraining complete! The temporal model has been saved to '{args.output}'")
+
+
+if __name__ == '__main__':
+    main()
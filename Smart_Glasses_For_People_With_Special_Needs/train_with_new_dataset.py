@@ -1,50 +1,171 @@
 # Mook Mitra - New Model Training Script
 # This script is designed to train a new, more accurate model using the Kaggle ISL dataset (A-Z, 0-9).
 # RUN THIS SCRIPT WHENEVER YOU ARE READY TO TRAIN.
+#
+# Input pipeline (default, --pipeline tfdata):
+#   * JPEGs are decoded and resized ONCE, in parallel, and written to a tf.data
+#     cache file in data_cache/; later epochs and later runs read the decoded pixels.
+#   * Augmentation (rotation, shift, shear, zoom, flip - the same ranges as before)
+#     runs as vectorized TensorFlow ops on whole batches via a parallel map.
+#   * Batches are prefetched so the GPU/CPU never waits for the next one.
+#   * The train/validation split is the deterministic one flow_from_directory
+#     made (first 20% of each class folder's sorted files is validation), and
+#     validation images are no longer augmented.
+# --mixed-precision trains in float16 (with float32 outputs); --xla compiles the model.
+#
+# The old ImageDataGenerator path is kept as --pipeline legacy for comparison. Both
+# report epoch time and images/sec; --benchmark-input N times the input pipeline alone.
+
+import argparse
+import hashlib
+import os
+import time
 
 import tensorflow as tf
 from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense, Dropout
-import os
 
-def train_new_model():
+from export_model import split_files
+from inference_backends import save_labels
+from preprocessing import PreprocessingSpec, save_spec
+
+# The directory where you have placed the Kaggle dataset (e.g., SIH25/data/)
+DATA_DIR = 'data'
+CACHE_DIR = 'data_cache'
+# How images become model input, shared with the runtime (saved next to the model).
+PREPROCESSING = PreprocessingSpec(64, 64, color='rgb', interpolation='nearest', scale=1./255) # The new dataset uses a more efficient 64x64 size
+IMAGE_SIZE = (PREPROCESSING.height, PREPROCESSING.width)
+BATCH_SIZE = 32
+EPOCHS = 25 # You can increase this for better accuracy if you have time
+SEED = 42
+
+# Augmentation ranges, as in the original ImageDataGenerator setup.
+ROTATION_DEGREES = 20
+SHIFT_FRACTION = 0.2
+SHEAR_DEGREES = 0.2 # ImageDataGenerator's shear_range is an angle in degrees
+ZOOM_RANGE = 0.2
+
+
+class EpochTimer(tf.keras.callbacks.Callback):
+    """Prints epoch time and training images/sec, and keeps them for the final summary."""
+
+    def __init__(self, images_per_epoch):
+        super().__init__()
+        self.images_per_epoch = images_per_epoch
+        self.epoch_times = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self._start
+        self.epoch_times.append(elapsed)
+        print(f"[TIMING] Epoch {epoch + 1}: {elapsed:.1f}s, {self.images_per_epoch / elapsed:.0f} images/sec")
+
+    def summary(self):
+        if not self.epoch_times:
+            return
+        first = self.epoch_times[0]
+        steady = self.epoch_times[1:] or self.epoch_times
+        steady_s = sum(steady) / len(steady)
+        print(f"[TIMING] First epoch {first:.1f}s (includes decoding/caching); "
+              f"later epochs {steady_s:.1f}s on average, {self.images_per_epoch / steady_s:.0f} images/sec")
+
+
+# --- tf.data pipeline ---
+def _decode(path, label):
+    # Same steps as preprocessing.Preprocessor, in TensorFlow ops: resize, colour, (scale after caching).
+    image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+    method = {'nearest': 'nearest', 'linear': 'bilinear', 'area': 'area'}[PREPROCESSING.interpolation]
+    image = tf.image.resize(image, IMAGE_SIZE, method=method)
+    if PREPROCESSING.color == 'gray':
+        image = tf.image.rgb_to_grayscale(image)
+    return tf.cast(tf.round(image), tf.uint8), label # uint8 keeps the cache file 4x smaller than float32
+
+
+def _augment_batch(images, labels):
+    """One random affine transform per image (rotation, shear, zoom, shift) plus random flips."""
+    batch = tf.shape(images)[0]
+    height, width = float(IMAGE_SIZE[0]), float(IMAGE_SIZE[1])
+    images = tf.cast(images, tf.float32) * PREPROCESSING.scale
+
+    angle = tf.random.uniform([batch], -ROTATION_DEGREES, ROTATION_DEGREES) * (3.14159265 / 180.0)
+    shear = tf.random.uniform([batch], -SHEAR_DEGREES, SHEAR_DEGREES) * (3.14159265 / 180.0)
+    zoom_x = tf.random.uniform([batch], 1.0 - ZOOM_RANGE, 1.0 + ZOOM_RANGE)
+    zoom_y = tf.random.uniform([batch], 1.0 - ZOOM_RANGE, 1.0 + ZOOM_RANGE)
+    shift_x = tf.random.uniform([batch], -SHIFT_FRACTION, SHIFT_FRACTION) * width
+    shift_y = tf.random.uniform([batch], -SHIFT_FRACTION, SHIFT_FRACTION) * height
+
+    # Maps each output pixel to the input pixel it samples: rotate @ shear @ zoom around the centre, then shift.
+    cx, cy = (width - 1.0) / 2.0, (height - 1.0) / 2.0
+    a0, a1 = tf.cos(angle) * zoom_x, -tf.sin(angle + shear) * zoom_y
+    b0, b1 = tf.sin(angle) * zoom_x, tf.cos(angle + shear) * zoom_y
+    a2 = cx - a0 * cx - a1 * cy + shift_x
+    b2 = cy - b0 * cx - b1 * cy + shift_y
+    zeros = tf.zeros([batch])
+    transforms = tf.stack([a0, a1, a2, b0, b1, b2, zeros, zeros], axis=1)
+    images = tf.raw_ops.ImageProjectiveTransformV3(
+        images=images, transforms=transforms, output_shape=tf.constant(IMAGE_SIZE, dtype=tf.int32),
+        fill_value=0.0, interpolation='BILINEAR', fill_mode='NEAREST')
+
+    flip = tf.random.uniform([batch]) < 0.5
+    images = tf.where(flip[:, None, None, None], tf.image.flip_left_right(images), images)
+    return images, labels
+
+
+def _scale_batch(images, labels):
+    return tf.cast(images, tf.float32) * PREPROCESSING.scale, labels
+
+
+def _cache_path(paths, subset):
     """
-    Defines, compiles, and trains a new CNN model based on the Kaggle dataset structure.
+    One cache file per exact file list, file contents and preprocessing, so a changed
+    dataset or spec gets a fresh cache. An image replaced under the same name is
+    noticed by its size and modification time (a stat per file, no reading).
     """
-    print("Starting the training process for the new, enhanced model...")
+    files = hashlib.sha1()
+    for path in paths:
+        stat = os.stat(path)
+        files.update(f"{path}\t{stat.st_size}\t{stat.st_mtime_ns}\n".encode('utf-8'))
+    spec = PREPROCESSING
+    return os.path.join(CACHE_DIR, f"{subset}_{spec.height}x{spec.width}_{spec.color}_{spec.interpolation}_{files.hexdigest()[:12]}")
+
+
+def make_dataset(paths, labels, subset, batch_size=BATCH_SIZE, augment=False):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    dataset = tf.data.Dataset.from_tensor_slices((paths, labels))
+    dataset = dataset.map(_decode, num_parallel_calls=tf.data.AUTOTUNE)
+    dataset = dataset.cache(_cache_path(paths, subset))
+    if augment:
+        dataset = dataset.shuffle(len(paths), seed=SEED, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size)
+    dataset = dataset.map(_augment_batch if augment else _scale_batch, num_parallel_calls=tf.data.AUTOTUNE)
+    return dataset.prefetch(tf.data.AUTOTUNE)
 
-    # --- 1. Data Augmentation and Loading ---
+
+# --- Legacy pipeline ---
+def make_legacy_generators(batch_size=BATCH_SIZE):
     # This creates more varied training data from your existing images to make the model more robust.
     datagen = ImageDataGenerator(
-        rescale=1./255,
-        rotation_range=20,
-        width_shift_range=0.2,
-        height_shift_range=0.2,
-        shear_range=0.2,
-        zoom_range=0.2,
+        rescale=PREPROCESSING.scale,
+        rotation_range=ROTATION_DEGREES,
+        width_shift_range=SHIFT_FRACTION,
+        height_shift_range=SHIFT_FRACTION,
+        shear_range=SHEAR_DEGREES,
+        zoom_range=ZOOM_RANGE,
         horizontal_flip=True,
         fill_mode='nearest',
         validation_split=0.2  # Use 20% of the data for validation
     )
 
-    # The directory where you have placed the Kaggle dataset (e.g., SIH25/data/)
-    DATA_DIR = 'data'
-    IMAGE_SIZE = (64, 64) # The new dataset uses a more efficient 64x64 size
-    BATCH_SIZE = 32
-    
-    # Check if the data directory exists
-    if not os.path.exists(DATA_DIR):
-        print(f"[ERROR] Data directory not found at '{DATA_DIR}'.")
-        print("Please create a 'data' folder and organize your Kaggle images into subfolders (e.g., 'A', 'B', '0', '1').")
-        return
-
     print(f"Loading training data from '{DATA_DIR}'...")
     train_generator = datagen.flow_from_directory(
         DATA_DIR,
         target_size=IMAGE_SIZE,
-        batch_size=BATCH_SIZE,
-        class_mode='categorical',
+        color_mode='grayscale' if PREPROCESSING.color == 'gray' else 'rgb',
+        batch_size=batch_size,
+        class_mode='sparse',
         subset='training' # Set as training data
     )
 
@@ -52,20 +173,32 @@ def train_new_model():
     validation_generator = datagen.flow_from_directory(
         DATA_DIR,
         target_size=IMAGE_SIZE,
-        batch_size=BATCH_SIZE,
-        class_mode='categorical',
+        color_mode='grayscale' if PREPROCESSING.color == 'gray' else 'rgb',
+        batch_size=batch_size,
+        class_mode='sparse',
         subset='validation' # Set as validation data
     )
+    labels = sorted(train_generator.class_indices, key=train_generator.class_indices.get)
+    return train_generator, validation_generator, labels, train_generator.samples
 
-    # The number of classes (A-Z, 0-9) is automatically detected from the number of subfolders.
-    num_classes = train_generator.num_classes
-    print(f"Detected {num_classes} classes (signs) in the dataset.")
 
-    # --- 2. Model Architecture ---
+def measure_input_throughput(data, batches):
+    """Images/sec of the input pipeline alone (no training), over `batches` batches."""
+    iterator = iter(data)
+    next(iterator) # The first batch pays for start-up, not throughput
+    images = 0
+    start = time.perf_counter()
+    for _ in range(batches):
+        batch_images, _ = next(iterator)
+        images += len(batch_images)
+    return images / (time.perf_counter() - start)
+
+
+def build_model(num_classes, mixed_precision=False):
     # A robust CNN architecture suitable for this task.
-    model = Sequential([
-        # The model expects color images, so the input shape has 3 channels.
-        Conv2D(32, (3, 3), activation='relu', input_shape=(IMAGE_SIZE[0], IMAGE_SIZE[1], 3)),
+    return Sequential([
+        # The input shape (and colour channels) come from the shared preprocessing spec.
+        Conv2D(32, (3, 3), activation='relu', input_shape=PREPROCESSING.input_shape),
         MaxPooling2D(2, 2),
         Conv2D(64, (3, 3), activation='relu'),
         MaxPooling2D(2, 2),
@@ -74,32 +207,89 @@ def train_new_model():
         Flatten(),
         Dense(512, activation='relu'),
         Dropout(0.5), # Dropout helps prevent overfitting
-        Dense(num_classes, activation='softmax') # The final layer has an output for each class
+        # The final layer has an output for each class; it stays float32 under mixed precision for a stable softmax.
+        Dense(num_classes, activation='softmax', dtype='float32' if mixed_precision else None)
     ])
 
+
+def train_new_model(pipeline='tfdata', epochs=EPOCHS, batch_size=BATCH_SIZE, mixed_precision=False, xla=False,
+                    benchmark_input=0):
+    """
+    Defines, compiles, and trains a new CNN model based on the Kaggle dataset structure.
+    """
+    print("Starting the training process for the new, enhanced model...")
+
+    # Check if the data directory exists
+    if not os.path.exists(DATA_DIR):
+        print(f"[ERROR] Data directory not found at '{DATA_DIR}'.")
+        print("Please create a 'data' folder and organize your Kaggle images into subfolders (e.g., 'A', 'B', '0', '1').")
+        return
+
+    if mixed_precision:
+        tf.keras.mixed_precision.set_global_policy('mixed_float16')
+        print("[INFO] Mixed precision (float16) enabled.")
+
+    # --- 1. Data Loading and Augmentation ---
+    if pipeline == 'legacy':
+        train_data, validation_data, labels, train_count = make_legacy_generators(batch_size)
+    else:
+        train_paths, train_labels, val_paths, val_labels, labels = split_files(DATA_DIR)
+        print(f"Found {len(train_paths)} training and {len(val_paths)} validation images in '{DATA_DIR}'.")
+        train_data = make_dataset(train_paths, train_labels, 'train', batch_size, augment=True)
+        validation_data = make_dataset(val_paths, val_labels, 'validation', batch_size)
+        train_count = len(train_paths)
+
+    # The number of classes (A-Z, 0-9) is automatically detected from the number of subfolders.
+    num_classes = len(labels)
+    print(f"Detected {num_classes} classes (signs) in the dataset.")
+
+    if benchmark_input:
+        rate = measure_input_throughput(train_data, benchmark_input)
+        print(f"[TIMING] {pipeline} input pipeline: {rate:.0f} images/sec over {benchmark_input} batches "
+              f"(a tf.data pipeline only reaches full speed once its cache is filled by one full epoch).")
+        return
+
+    # --- 2. Model Architecture ---
+    model = build_model(num_classes, mixed_precision)
     model.summary()
 
     # --- 3. Compile the Model ---
     model.compile(optimizer='adam',
-                  loss='categorical_crossentropy',
-                  metrics=['accuracy'])
+                  loss='sparse_categorical_crossentropy',
+                  metrics=['accuracy'],
+                  jit_compile=xla)
 
     # --- 4. Train the Model ---
     print("\nStarting model training... This will take some time.")
-    EPOCHS = 25 # You can increase this for better accuracy if you have time
+    timer = EpochTimer(train_count)
     model.fit(
-        train_generator,
-        epochs=EPOCHS,
-        validation_data=validation_generator
+        train_data,
+        epochs=epochs,
+        validation_data=validation_data,
+        callbacks=[timer]
     )
+    timer.summary()
 
     # --- 5. Save the Final Model ---
     # The trained model will be saved and ready to use in your application.
     if not os.path.exists('model'):
         os.makedirs('model')
     model.save('model/new_kaggle_model.h5')
+    # Save the class names in output order so every runtime backend can map predictions to signs.
+    save_labels('model/new_kaggle_model.h5', labels)
+    # ...and how its inputs were prepared, so the runtime prepares camera crops the same way.
+    save_spec('model/new_kaggle_model.h5', PREPROCESSING)
     print("\nTraining complete! The new model has been saved to 'model/new_kaggle_model.h5'")
 
 
 if __name__ == '__main__':
-    train_new_model()
+    parser = argparse.ArgumentParser(description="Train the Mook Mitra sign model.")
+    parser.add_argument('--pipeline', choices=('tfdata', 'legacy'), default='tfdata')
+    parser.add_argument('--epochs', type=int, default=EPOCHS)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--mixed-precision', action='store_true', help="Train in float16 (best on GPUs with tensor cores).")
+    parser.add_argument('--xla', action='store_true', help="Compile the model with XLA.")
+    parser.add_argument('--benchmark-input', type=int, default=0, metavar='BATCHES',
+                        help="Only time the input pipeline over this many batches, then exit.")
+    args = parser.parse_args()
+    train_new_model(args.pipeline, args.epochs, args.batch_size, args.mixed_precision, args.xla, args.benchmark_input)
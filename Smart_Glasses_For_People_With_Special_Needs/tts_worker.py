@@ -0,0 +1,254 @@
+# Mook Mitra - Text-to-Speech Worker
+# One long-lived speech thread for the whole app instead of a new shell process
+# for every recognized letter.
+#
+#   * Text is synthesized to WAV once and kept in an LRU cache; the fixed camera
+#     vocabulary (A-Z, 0-9, "space", "cleared") is synthesized in the background at
+#     start-up, so those play back almost immediately.
+#   * Requests go through a small bounded queue. The same text asked for again
+#     while it is queued or still playing is dropped (coalescing), and fire-and-forget
+#     requests that waited longer than STALE_AFTER_S are skipped - by then the user
+#     has moved on to the next sign. Text a caller waits for is never dropped (only
+#     an explicit interrupt or close() discards it); it does not count against the
+#     queue size.
+#   * speak(..., interrupt=True) stops what is playing and empties the queue.
+#
+# Synthesis: Windows keeps one PowerShell System.Speech process open and feeds it
+# lines on stdin; macOS uses `say -o`, Linux `espeak -w`. If synthesis to a file
+# is not possible, the text is spoken directly (still without a shell).
+#
+# The shared worker closes itself at interpreter exit, which also removes its
+# temporary WAV folder.
+
+import atexit
+import collections
+import itertools
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+VOCABULARY = [chr(c) for c in range(ord('A'), ord('Z') + 1)] + [str(d) for d in range(10)] + ['space', 'cleared']
+CACHE_SIZE = 96
+QUEUE_SIZE = 4
+STALE_AFTER_S = 1.5
+
+_WINDOWS_SYNTH_SCRIPT = (
+    "Add-Type -AssemblyName System.Speech; "
+    "$s = New-Object System.Speech.Synthesis.SpeechSynthesizer; "
+    "while (($line = [Console]::In.ReadLine()) -ne $null) { "
+    "$path, $text = $line -split \"`t\", 2; "
+    "$s.SetOutputToWaveFile($path); $s.Speak($text); $s.SetOutputToNull(); "
+    "[Console]::Out.WriteLine($path); [Console]::Out.Flush() }"
+)
+
+
+def _clean(text):
+    return ' '.join(str(text).split()) # No tabs/newlines: they delimit the synthesizer protocol
+
+
+class _Request:
+    __slots__ = ('text', 'created', 'done', 'may_expire')
+
+    def __init__(self, text, may_expire=True):
+        self.text = text
+        self.created = time.monotonic()
+        self.done = threading.Event()
+        self.may_expire = may_expire # False when a caller waits for it to be spoken
+
+
+class TTSWorker:
+    def __init__(self, cache_size=CACHE_SIZE, queue_size=QUEUE_SIZE, stale_after_s=STALE_AFTER_S):
+        self.cache_size = cache_size
+        self.stale_after_s = stale_after_s
+        self._cache = collections.OrderedDict() # text -> WAV path, least recently used first
+        self.queue_size = queue_size # Bounds the fire-and-forget requests; waited-for ones are never dropped
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._synth_lock = threading.Lock()
+        self._interrupt = threading.Event()
+        self._current = None # Request being played
+        self._windows_synth = None
+        self._closed = False
+        self._dir = tempfile.mkdtemp(prefix='mookmitra_tts_')
+        self._file_numbers = itertools.count()
+        self.stats = collections.Counter()
+        self._thread = threading.Thread(target=self._run, name='tts', daemon=True)
+        self._thread.start()
+        threading.Thread(target=self.preload, args=(VOCABULARY,), name='tts-preload', daemon=True).start()
+
+    # --- Public API ---
+    def speak(self, text, interrupt=False, may_expire=True):
+        """
+        Queues text and returns an Event that is set once it was spoken (or dropped).
+        With `may_expire` False the request is never skipped as stale.
+        """
+        request = _Request(_clean(text), may_expire)
+        with self._cond:
+            if interrupt:
+                self._drop_all()
+                self._interrupt.set()
+            else:
+                pending = [r for r in self._queue if r.text == request.text]
+                if self._current is not None and self._current.text == request.text:
+                    pending.append(self._current)
+                if pending:
+                    self.stats['coalesced'] += 1
+                    pending[0].may_expire = pending[0].may_expire and may_expire
+                    return pending[0].done # Set once that copy has been spoken
+            if request.may_expire:
+                expiring = [r for r in self._queue if r.may_expire]
+                if len(expiring) >= self.queue_size: # Drop the oldest request nobody waits for
+                    self._queue.remove(expiring[0])
+                    self.stats['dropped_full'] += 1
+                    expiring[0].done.set()
+            self._queue.append(request)
+            self._cond.notify()
+        return request.done
+
+    def preload(self, texts):
+        for text in texts:
+            if self._closed:
+                return
+            self._synthesize(_clean(text))
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._drop_all()
+            self._interrupt.set()
+            self._cond.notify()
+        self._thread.join(timeout=2.0)
+        if self._windows_synth:
+            self._windows_synth.kill()
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+    # --- Worker thread ---
+    def _drop_all(self):
+        while self._queue:
+            self._queue.popleft().done.set()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closed)
+                if self._closed:
+                    return
+                request = self._queue.popleft()
+                if request.may_expire and time.monotonic() - request.created > self.stale_after_s:
+                    self.stats['stale'] += 1
+                    request.done.set()
+                    continue
+                self._current = request
+                self._interrupt.clear()
+            try:
+                path = self._synthesize(request.text)
+                try:
+                    played = bool(path) and self._play(path) is None
+                except FileNotFoundError: # No audio player installed
+                    played = False
+                if not played:
+                    self._speak_directly(request.text)
+                self.stats['spoken'] += 1
+            except Exception as e:
+                print(f"[WARNING] Text-to-speech failed for '{request.text}': {e}")
+            finally:
+                with self._cond:
+                    self._current = None
+                request.done.set()
+
+    # --- Synthesis ---
+    def _synthesize(self, text):
+        """Path of a WAV file with `text` spoken, from the cache when possible; None if unsupported."""
+        with self._synth_lock:
+            if text in self._cache:
+                self._cache.move_to_end(text)
+                self.stats['cache_hits'] += 1
+                return self._cache[text]
+            self.stats['cache_misses'] += 1
+            path = os.path.join(self._dir, f"{next(self._file_numbers)}.wav")
+            try:
+                if not self._synthesize_to(path, text) or not os.path.exists(path):
+                    return None
+            except (OSError, subprocess.SubprocessError):
+                return None
+            self._cache[text] = path
+            if len(self._cache) > self.cache_size:
+                _, old_path = self._cache.popitem(last=False)
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+            return path
+
+    def _synthesize_to(self, path, text):
+        if sys.platform == 'win32':
+            if self._windows_synth is None or self._windows_synth.poll() is not None:
+                self._windows_synth = subprocess.Popen(
+                    ['powershell', '-NoProfile', '-ExecutionPolicy', 'Bypass', '-Command', _WINDOWS_SYNTH_SCRIPT],
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            self._windows_synth.stdin.write(f"{path}\t{text}\n")
+            self._windows_synth.stdin.flush()
+            return self._windows_synth.stdout.readline().strip() == path
+        if sys.platform == 'darwin':
+            command = ['say', '-o', path, '--data-format=LEI16@22050', text]
+        else:
+            command = ['espeak', '-w', path, text]
+        return subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+
+    # --- Playback ---
+    def _play(self, path):
+        if sys.platform == 'win32':
+            import winsound
+            with wave.open(path, 'rb') as w:
+                duration = w.getnframes() / float(w.getframerate())
+            winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+            if self._interrupt.wait(duration):
+                winsound.PlaySound(None, 0) # Stop
+            return
+        player = ['afplay', path] if sys.platform == 'darwin' else ['aplay', '-q', path]
+        self._wait_or_interrupt(subprocess.Popen(player, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+
+    def _speak_directly(self, text):
+        if sys.platform == 'win32':
+            escaped = text.replace("'", "''")
+            command = ['powershell', '-NoProfile', '-Command',
+                       f"Add-Type -AssemblyName System.Speech; (New-Object System.Speech.Synthesis.SpeechSynthesizer).Speak('{escaped}')"]
+        elif sys.platform == 'darwin':
+            command = ['say', text]
+        else:
+            command = ['espeak', text]
+        self._wait_or_interrupt(subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+
+    def _wait_or_interrupt(self, process):
+        while process.poll() is None:
+            if self._interrupt.wait(0.02):
+                process.terminate()
+                break
+        process.wait()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = TTSWorker()
+            atexit.register(_worker.close) # Stops playback and removes the temporary WAV folder
+        return _worker
+
+
+def speak(text, wait_for_completion=False, interrupt=False):
+    """Speaks text on the shared TTS worker; same signature as the old handler's speak()."""
+    if not text or not isinstance(text, str):
+        return
+    done = get_worker().speak(text, interrupt=interrupt, may_expire=not wait_for_completion)
+    if wait_for_completion:
+        done.wait()
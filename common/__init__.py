@@ -0,0 +1,5 @@
+# Shared helpers used by more than one project in this repository
+# (Morse code tools, Mook Mitra, Density Detector, Leveller).
+#
+# The projects are plain script folders, so scripts that need these helpers
+# add the repository root to sys.path before importing from `common`.
@@ -0,0 +1,323 @@
+# Camera Discovery
+# Finds the webcams attached to this machine and remembers the best one, so the
+# vision tools (Mook Mitra's start_camera, the density detector, camera_test.py)
+# open it straight away instead of guessing index 0 and waiting for the driver.
+#
+#   * discover(): opens every candidate device at once, one thread each, with a
+#     timeout, so a missing or hanging index costs at most PROBE_TIMEOUT_S in total
+#     instead of blocking the next probe. Each working camera is measured: the
+#     time to open it, the time to its first frame, and the resolution and frame
+#     rate it actually delivers (drivers often report a CAP_PROP_FPS they never reach).
+#   * The results are cached in CACHE_PATH, keyed by device identity (the V4L2
+#     name and USB port on Linux, the DirectShow name and path on Windows when
+#     the optional cv2-enumerate-cameras package is installed, otherwise the index).
+#   * open_best_camera(): on later runs, checks that the cached best device is still
+#     the same one at the same index and opens it directly, waiting only for its
+#     first frame. If it is gone or fails, it rediscovers.
+#
+# Set CAMERA_INDEX to force a device. To list the cameras and refresh the cache:
+#
+#   python -m common.camera_discovery
+
+import json
+import os
+import sys
+import threading
+import time
+
+CANDIDATE_INDICES = range(4)
+PROBE_TIMEOUT_S = 5.0
+MEASURE_FRAMES = 15 # Frames timed after the first one to measure the delivered FPS
+FIRST_FRAME_TIMEOUT_S = 2.0 # open_best_camera() waits this long for a frame before rediscovering
+TARGET_FPS = 30 # Faster cameras do not rank higher; past this, resolution decides
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'camera_discovery.json')
+ENV_VARIABLE = 'CAMERA_INDEX'
+CACHE_VERSION = 1
+
+
+class CameraInfo:
+    """The result of probing one device index."""
+
+    def __init__(self, index, backend, identity, ok=False, width=0, height=0, fps=0.0, reported_fps=0.0,
+                 open_ms=None, first_frame_ms=None, error=None):
+        self.index = index
+        self.backend = backend
+        self.identity = identity
+        self.ok = ok
+        self.width = width
+        self.height = height
+        self.fps = fps # Measured
+        self.reported_fps = reported_fps # What the driver claims (CAP_PROP_FPS)
+        self.open_ms = open_ms
+        self.first_frame_ms = first_frame_ms
+        self.error = error
+
+    @property
+    def score(self):
+        """Ranking key: working, then frame rate up to TARGET_FPS, then resolution, then the lower index."""
+        return (self.ok, round(min(self.fps, TARGET_FPS)), self.width * self.height, -self.index)
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def __repr__(self):
+        if not self.ok:
+            return f"CameraInfo(index={self.index}, {self.error})"
+        return (f"CameraInfo(index={self.index}, {self.width}x{self.height} @ {self.fps:.1f} fps, "
+                f"first frame {self.first_frame_ms:.0f} ms, '{self.identity}')")
+
+
+def default_backend():
+    import cv2
+    if sys.platform.startswith('win'):
+        return cv2.CAP_DSHOW # The most stable backend for USB webcams on Windows
+    if sys.platform.startswith('linux'):
+        return cv2.CAP_V4L2
+    if sys.platform == 'darwin':
+        return cv2.CAP_AVFOUNDATION
+    return cv2.CAP_ANY
+
+
+def candidate_indices():
+    """The /dev/video* indices on Linux (only those that exist), CANDIDATE_INDICES elsewhere."""
+    if os.path.isdir('/sys/class/video4linux'):
+        indices = sorted(int(name[5:]) for name in os.listdir('/sys/class/video4linux')
+                         if name.startswith('video') and name[5:].isdigit())
+        return indices
+    return list(CANDIDATE_INDICES)
+
+
+def _windows_devices(backend):
+    try:
+        from cv2_enumerate_cameras import enumerate_cameras
+    except ImportError:
+        return None
+    try:
+        return [f"{camera.name}|{camera.path}" for camera in enumerate_cameras(backend)]
+    except Exception:
+        return None
+
+
+def device_identity(index, backend=None):
+    """
+    A string that names the physical device at `index`: stays the same across runs,
+    and changes if a different camera ends up at that index. Cheap enough to call at
+    every start-up. Falls back to the index itself where the OS cannot tell.
+    """
+    sysfs = f'/sys/class/video4linux/video{index}'
+    if os.path.isdir(sysfs):
+        try:
+            with open(os.path.join(sysfs, 'name')) as f:
+                name = f.read().strip()
+            port = os.path.basename(os.path.realpath(os.path.join(sysfs, 'device')))
+            return f"v4l2:{name}@{port}"
+        except OSError:
+            pass
+    if sys.platform.startswith('win') and backend is not None:
+        devices = _windows_devices(backend)
+        if devices is not None and index < len(devices):
+            return f"dshow:{devices[index]}"
+    return f"index:{index}"
+
+
+def wait_for_frame(cap, timeout=FIRST_FRAME_TIMEOUT_S):
+    """Reads until the camera delivers a frame; returns it, or None after `timeout` seconds."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        ret, frame = cap.read()
+        if ret and frame is not None:
+            return frame
+        time.sleep(0.01)
+    return None
+
+
+def probe(index, backend=None, frames=MEASURE_FRAMES, timeout=PROBE_TIMEOUT_S):
+    """Opens device `index`, measures what it delivers and releases it again."""
+    import cv2
+    backend = default_backend() if backend is None else backend
+    info = CameraInfo(index, backend, device_identity(index, backend))
+    start = time.perf_counter()
+    cap = cv2.VideoCapture(index, backend)
+    try:
+        if not cap.isOpened():
+            info.error = 'could not open'
+            return info
+        info.open_ms = (time.perf_counter() - start) * 1000.0
+        frame = wait_for_frame(cap, max(timeout - (time.perf_counter() - start), 0.1))
+        if frame is None:
+            info.error = 'no frames'
+            return info
+        first = time.perf_counter()
+        info.first_frame_ms = (first - start) * 1000.0
+        info.height, info.width = frame.shape[:2]
+        info.reported_fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+
+        delivered = 0
+        last = first
+        while delivered < frames and time.perf_counter() - start < timeout:
+            ret, _ = cap.read()
+            if ret:
+                delivered += 1
+                last = time.perf_counter()
+        if delivered:
+            info.fps = delivered / (last - first)
+        info.ok = True
+        return info
+    finally:
+        cap.release()
+
+
+def discover(indices=None, backend=None, frames=MEASURE_FRAMES, timeout=PROBE_TIMEOUT_S):
+    """
+    Probes all `indices` in parallel and returns their CameraInfo, best first.
+    A probe still running after `timeout` seconds is reported as timed out; its
+    thread finishes (and releases the device) in the background.
+    """
+    import cv2 # Imported once here, not concurrently by the probe threads
+    backend = default_backend() if backend is None else backend
+    indices = candidate_indices() if indices is None else list(indices)
+    results = {}
+
+    def run(index):
+        try:
+            results[index] = probe(index, backend, frames, timeout)
+        except Exception as e: # A driver error must not take the other probes down
+            results[index] = CameraInfo(index, backend, device_identity(index, backend), error=str(e))
+
+    threads = [threading.Thread(target=run, args=(index,), name=f'camera-probe-{index}', daemon=True) for index in indices]
+    for thread in threads:
+        thread.start()
+    deadline = time.perf_counter() + timeout + 0.5
+    for thread in threads:
+        thread.join(max(deadline - time.perf_counter(), 0.0))
+
+    found = [results.get(index) or CameraInfo(index, backend, device_identity(index, backend), error='timed out')
+             for index in indices]
+    return sorted(found, key=lambda info: info.score, reverse=True)
+
+
+# --- Cache ---
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get('version') != CACHE_VERSION or cache.get('platform') != sys.platform:
+        return None
+    return cache
+
+
+def save_cache(cameras, path=CACHE_PATH):
+    working = [info for info in cameras if info.ok]
+    cache = {
+        'version': CACHE_VERSION,
+        'platform': sys.platform,
+        'best': working[0].identity if working else None,
+        'devices': {info.identity: info.to_dict() for info in working},
+    }
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        print(f"[WARNING] Could not save the camera cache to '{path}': {e}")
+
+
+def cached_best(path=CACHE_PATH):
+    """The cached best camera if the same device is still at its index, else None."""
+    cache = load_cache(path)
+    if not cache or not cache.get('best'):
+        return None
+    info = CameraInfo.from_dict(cache['devices'][cache['best']])
+    if device_identity(info.index, info.backend) != info.identity:
+        return None
+    return info
+
+
+def _open(info):
+    import cv2
+    start = time.perf_counter()
+    cap = cv2.VideoCapture(info.index, info.backend)
+    frame = wait_for_frame(cap) if cap.isOpened() else None
+    if frame is not None:
+        info.first_frame_ms = (time.perf_counter() - start) * 1000.0
+        info.height, info.width = frame.shape[:2]
+        return cap
+    cap.release()
+    return None
+
+
+def open_best_camera(index=None, backend=None, cache_path=CACHE_PATH, rediscover=False):
+    """
+    Opens the best available camera and returns (cap, CameraInfo), or (None, None)
+    if there is none. The camera has already delivered a frame, so the caller
+    can start reading at once. `index` (or $CAMERA_INDEX) forces a device.
+    """
+    if index is None and os.environ.get(ENV_VARIABLE, '').isdigit():
+        index = int(os.environ[ENV_VARIABLE])
+    if index is not None:
+        backend = default_backend() if backend is None else backend
+        info = CameraInfo(index, backend, device_identity(index, backend), ok=True)
+        cap = _open(info)
+        return (cap, info) if cap else (None, None)
+
+    if not rediscover:
+        info = cached_best(cache_path)
+        if info and (backend is None or backend == info.backend):
+            cap = _open(info)
+            if cap:
+                print(f"[INFO] Opened cached camera {info.index} ('{info.identity}') in {info.first_frame_ms:.0f} ms.")
+                return cap, info
+            print(f"[INFO] Cached camera {info.index} did not respond; searching again...")
+
+    print("[INFO] Searching for cameras...")
+    cameras = discover(backend=backend)
+    save_cache(cameras, cache_path)
+    for info in cameras:
+        if not info.ok:
+            break
+        cap = _open(info)
+        if cap:
+            print(f"[INFO] Using camera {info.index}: {info.width}x{info.height} @ {info.fps:.1f} fps ('{info.identity}').")
+            return cap, info
+    return None, None
+
+
+def print_cameras(cameras):
+    print(f"\n{'index':>5}  {'status':<14}{'resolution':>11}{'fps':>7}{'driver fps':>11}{'first frame':>13}  identity")
+    for info in sorted(cameras, key=lambda info: info.index):
+        if info.ok:
+            print(f"{info.index:>5}  {'ok':<14}{info.width:>5}x{info.height:<5}{info.fps:>7.1f}{info.reported_fps:>11.1f}"
+                  f"{info.first_frame_ms:>10.0f} ms  {info.identity}")
+        else:
+            print(f"{info.index:>5}  {info.error:<14}{'':>11}{'':>7}{'':>11}{'':>13}  {info.identity}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Probe the attached cameras in parallel and cache the best one.")
+    parser.add_argument('--indices', type=int, nargs='+', help=f"Device indices to probe (default: {list(candidate_indices())}).")
+    parser.add_argument('--timeout', type=float, default=PROBE_TIMEOUT_S, help="Seconds allowed per probe.")
+    parser.add_argument('--cache', default=CACHE_PATH, help="Where to store the results.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cameras = discover(args.indices, timeout=args.timeout)
+    print(f"[INFO] Probed {len(cameras)} devices in {time.perf_counter() - start:.2f}s.")
+    print_cameras(cameras)
+    save_cache(cameras, args.cache)
+    if cameras and cameras[0].ok:
+        print(f"\nBest: camera {cameras[0].index}. Saved to '{args.cache}'.")
+    else:
+        print("\nNo working camera found.")
+
+
+if __name__ == '__main__':
+    main()
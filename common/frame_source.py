@@ -0,0 +1,346 @@
+# Frame Sources
+# One capture path for every OpenCV tool in this repository: webcams, video files,
+# folders of images and synthetic test patterns all deliver the same Frame objects.
+#
+#   source = open_source(None, flip=True)   # Best webcam (common.camera_discovery)
+#   for frame in source:                    # Frame(seq, timestamp, image, dropped)
+#       ...
+#   print(source.stats())                   # frames, fps, drops, buffer reuse
+#
+# * Frames are decoded straight into a small pool of preallocated buffers
+#   (VideoCapture.read(image) fills an array of the right size in place), and the
+#   optional mirror flip is done in place too, so a steady stream allocates no
+#   new image arrays. A buffer is only reused once nothing refers to it any more
+#   (CPython reference count, which covers crops and other views of it as well),
+#   so a frame can safely be handed to other threads; if all buffers are busy the
+#   pool grows instead of overwriting one.
+# * Every frame carries a sequence number and a time.monotonic() capture timestamp.
+# * Drops are reported per frame and in total: frames skipped to keep a video in
+#   real time, and (estimated from the gaps between frames) frames a camera
+#   delivered that were never read.
+
+import os
+import sys
+import time
+
+POOL_SIZE = 8 # Enough for every frame the sign pipeline's stages can hold at once
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+SYNTHETIC_SIZE = (640, 480)
+
+
+class FrameSourceError(OSError):
+    """The source could not be opened."""
+
+
+class Frame:
+    __slots__ = ('seq', 'timestamp', 'image', 'dropped')
+
+    def __init__(self, seq, timestamp, image, dropped=0):
+        self.seq = seq # 1, 2, 3, ... per source
+        self.timestamp = timestamp # time.monotonic() when the frame was captured
+        self.image = image # BGR, uint8; owned by the receiver until it drops the reference
+        self.dropped = dropped # Frames lost between the previous frame and this one
+
+
+class FramePool:
+    """Recycles image buffers of one shape; a buffer is reused once nothing references it."""
+
+    def __init__(self, shape, dtype='uint8', size=POOL_SIZE):
+        import numpy as np
+        self.shape = tuple(shape)
+        self._np = np
+        self._dtype = dtype
+        self._buffers = [np.empty(self.shape, dtype=dtype) for _ in range(size)]
+        self._next = 0
+        self.reused = 0
+        self.grown = 0
+        # The count of an unused buffer (this list plus the call's own argument), measured
+        # rather than assumed because it differs between Python versions.
+        self._free_refs = sys.getrefcount(self._buffers[0]) if hasattr(sys, 'getrefcount') else None
+
+    def acquire(self):
+        if self._free_refs is not None:
+            for _ in range(len(self._buffers)):
+                i = self._next
+                self._next = (i + 1) % len(self._buffers)
+                if sys.getrefcount(self._buffers[i]) == self._free_refs:
+                    self.reused += 1
+                    return self._buffers[i]
+        buffer = self._np.empty(self.shape, dtype=self._dtype)
+        if self._free_refs is not None:
+            self._buffers.append(buffer) # Every buffer was still in use; keep this one too
+        self.grown += 1
+        return buffer
+
+    def stats(self):
+        return {'buffers': len(self._buffers), 'reused': self.reused, 'grown': self.grown}
+
+
+class FrameSource:
+    """
+    Base class. Subclasses implement _capture() -> (image, dropped) or None at the end,
+    filling a buffer from self._buffer(shape) where they can.
+    """
+
+    fps = None # Nominal frames per second, if the source has one
+
+    def __init__(self, flip=False, pool_size=POOL_SIZE):
+        self.flip = flip
+        self.pool_size = pool_size
+        self.pool = None
+        self.seq = 0
+        self.dropped = 0
+        self._started_at = None
+
+    def _buffer(self, shape):
+        if self.pool is None or self.pool.shape != tuple(shape):
+            self.pool = FramePool(shape, size=self.pool_size)
+        return self.pool.acquire()
+
+    def _capture(self):
+        raise NotImplementedError
+
+    def read(self):
+        """The next Frame, or None when the source has ended (or failed)."""
+        captured = self._capture()
+        if captured is None:
+            return None
+        timestamp = time.monotonic()
+        image, dropped = captured
+        if self._started_at is None:
+            self._started_at = timestamp
+        if self.flip:
+            import cv2
+            cv2.flip(image, 1, dst=image) # Mirror view for the user, in place
+        self.seq += 1
+        self.dropped += dropped
+        return Frame(self.seq, timestamp, image, dropped)
+
+    def __iter__(self):
+        while True:
+            frame = self.read()
+            if frame is None:
+                return
+            yield frame
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self):
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        stats = {
+            'frames': self.seq,
+            'dropped': self.dropped,
+            'fps': round((self.seq - 1) / elapsed, 1) if self.seq > 1 and elapsed else 0.0,
+        }
+        if self.pool is not None:
+            stats['pool'] = self.pool.stats()
+        return stats
+
+
+class _CaptureSource(FrameSource):
+    """Reads a cv2.VideoCapture into pooled buffers."""
+
+    def __init__(self, cap, flip=False, pool_size=POOL_SIZE):
+        super().__init__(flip, pool_size)
+        self.cap = cap
+        self._shape = None
+
+    def _read_into_pool(self):
+        if self._shape is None:
+            ret, image = self.cap.read() # The first frame tells the size of the buffers
+        else:
+            buffer = self._buffer(self._shape)
+            ret, image = self.cap.read(buffer)
+        if not ret or image is None:
+            return None
+        self._shape = image.shape # Follows a size change (the read then allocated a new array)
+        return image
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class CameraSource(_CaptureSource):
+    """A webcam; `index` None opens the best one found by common.camera_discovery."""
+
+    def __init__(self, index=None, flip=False, pool_size=POOL_SIZE):
+        from common.camera_discovery import open_best_camera
+        cap, self.camera = open_best_camera(index)
+        if cap is None:
+            raise FrameSourceError("No working camera found." if index is None else f"Could not open camera {index}.")
+        super().__init__(cap, flip, pool_size)
+        self.fps = self.camera.fps or None
+        self._last = None
+
+    def _capture(self):
+        image = self._read_into_pool()
+        if image is None:
+            print("[WARNING] Could not read a frame from the camera. The stream may have been interrupted.")
+            return None
+        now = time.monotonic()
+        dropped = 0
+        if self._last is not None and self.fps:
+            # A gap of several frame intervals means frames came and went unread.
+            dropped = max(int((now - self._last) * self.fps + 0.5) - 1, 0)
+        self._last = now
+        return image, dropped
+
+
+class VideoFileSource(_CaptureSource):
+    """
+    A video file, as fast as it decodes; with `realtime`, paced to the file's
+    frame rate, skipping (and counting) frames whenever the reader falls behind.
+    """
+
+    def __init__(self, path, flip=False, realtime=False, pool_size=POOL_SIZE):
+        import cv2
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            raise FrameSourceError(f"Could not open video '{path}'.")
+        super().__init__(cap, flip, pool_size)
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or None
+        self.realtime = realtime and bool(self.fps)
+        self._index = -1
+        self._clock_start = None
+
+    def _capture(self):
+        dropped = 0
+        if self.realtime:
+            now = time.monotonic()
+            if self._clock_start is None:
+                self._clock_start = now
+            due = int((now - self._clock_start) * self.fps) # The frame that should be showing now
+            while self._index + 1 < due: # Behind: skip without decoding into a buffer
+                if not self.cap.grab():
+                    return None
+                self._index += 1
+                dropped += 1
+            wait = self._clock_start + (self._index + 1) / self.fps - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+        image = self._read_into_pool()
+        if image is None:
+            return None
+        self._index += 1
+        return image, dropped
+
+
+class ImageDirectorySource(FrameSource):
+    """The images of a folder in name order; `fps` paces them like a video."""
+
+    def __init__(self, path, flip=False, fps=None, pool_size=POOL_SIZE):
+        if not os.path.isdir(path):
+            raise FrameSourceError(f"Image folder '{path}' not found.")
+        super().__init__(flip, pool_size)
+        self.paths = [os.path.join(path, name) for name in sorted(os.listdir(path))
+                      if name.lower().endswith(IMAGE_EXTENSIONS)]
+        self.fps = fps
+        self._index = 0
+        self._next_due = None
+
+    def _capture(self):
+        import cv2
+        while self._index < len(self.paths):
+            path = self.paths[self._index]
+            self._index += 1
+            if self.fps:
+                now = time.monotonic()
+                self._next_due = max(self._next_due or now, now - 1.0 / self.fps)
+                if self._next_due > now:
+                    time.sleep(self._next_due - now)
+                self._next_due += 1.0 / self.fps
+            image = cv2.imread(path, cv2.IMREAD_COLOR) # Decoders cannot fill an existing array
+            if image is not None:
+                return image, 0
+            print(f"[WARNING] Skipping unreadable image '{path}'.")
+        return None
+
+
+class SyntheticSource(FrameSource):
+    """
+    A test pattern: a bright disc circling over a gradient, drawn into pooled buffers.
+    Needs no camera or files, so benchmarks and checks run anywhere. `count` None runs forever.
+    """
+
+    def __init__(self, width=SYNTHETIC_SIZE[0], height=SYNTHETIC_SIZE[1], fps=None, count=None, flip=False,
+                 pool_size=POOL_SIZE):
+        import numpy as np
+        super().__init__(flip, pool_size)
+        self.width, self.height = width, height
+        self.fps = fps
+        self.count = count
+        ramp = np.linspace(40, 200, width, dtype=np.float32).astype(np.uint8)
+        self._background = np.repeat(np.repeat(ramp[None, :, None], height, axis=0), 3, axis=2)
+        self._next_due = None
+
+    def _capture(self):
+        import cv2
+        import math
+        if self.count is not None and self.seq >= self.count:
+            return None
+        if self.fps:
+            now = time.monotonic()
+            if self._next_due is not None and self._next_due > now:
+                time.sleep(self._next_due - now)
+            self._next_due = max(self._next_due or now, now) + 1.0 / self.fps
+        image = self._buffer(self._background.shape)
+        image[...] = self._background
+        angle = self.seq * 0.1
+        centre = (int(self.width / 2 + math.cos(angle) * self.width / 4), int(self.height / 2 + math.sin(angle) * self.height / 4))
+        cv2.circle(image, centre, max(self.height // 10, 4), (60, 170, 240), -1)
+        return image, 0
+
+
+def open_source(spec=None, flip=False, realtime=False, fps=None, pool_size=POOL_SIZE):
+    """
+    A FrameSource for `spec`: None (best webcam), a camera index (int or digits),
+    'synthetic' or 'synthetic:WIDTHxHEIGHT', a folder of images, or a video file.
+    """
+    if spec is None or isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(None if spec is None else int(spec), flip, pool_size)
+    spec = str(spec)
+    if spec == 'synthetic' or spec.startswith('synthetic:'):
+        width, height = SYNTHETIC_SIZE
+        if ':' in spec:
+            width, height = (int(v) for v in spec.split(':', 1)[1].lower().split('x'))
+        return SyntheticSource(width, height, fps, flip=flip, pool_size=pool_size)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, flip, fps, pool_size)
+    if not os.path.exists(spec):
+        raise FrameSourceError(f"'{spec}' is not a camera index, image folder or video file.")
+    return VideoFileSource(spec, flip, realtime, pool_size)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Read frames from a source and report rate, drops and buffer reuse.")
+    parser.add_argument('source', nargs='?', help="Camera index, video file, image folder or 'synthetic' (default: best camera).")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--realtime', action='store_true', help="Pace video files to their frame rate.")
+    parser.add_argument('--flip', action='store_true')
+    args = parser.parse_args()
+
+    try:
+        source = open_source(args.source, flip=args.flip, realtime=args.realtime)
+    except FrameSourceError as e:
+        print(f"[ERROR] {e}")
+        raise SystemExit(1)
+    with source:
+        for frame in source:
+            if frame.seq >= args.frames:
+                break
+        print(f"[INFO] {type(source).__name__}: {source.stats()}")
+
+
+if __name__ == '__main__':
+    main()
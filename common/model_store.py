@@ -0,0 +1,297 @@
+# Offline Speech Model Store
+# Finds, validates and shares the offline Vosk model folders used by the Morse
+# tools and the Mook Mitra speech card.
+#
+#   * locate(): the first valid model among the preferred path, $VOSK_MODEL_PATH
+#     and the folders the tools use by default (Morse_Python_Code/model,
+#     Smart_Glasses_For_People_With_Special_Needs/vosk_model).
+#   * validate(): checks the Kaldi layout (acoustic model, decoding graph, feature
+#     config) and the binary headers of the big files, so a broken or half-copied
+#     model fails with a clear message instead of a crash inside Kaldi. Results are
+#     cached per process and only recomputed when a file's size or mtime changes.
+#   * map_model(): opens every model file as a read-only memory map and asks the
+#     OS to read it ahead; used by the command line below to measure what mapping
+#     the files costs. No tool maps the model at runtime.
+#
+# Kaldi cannot run from a memory map: vosk.Model() parses the acoustic model and
+# graph into its own heap, so each process that loads the model pays for a
+# private copy. The only way the tools share a loaded model at runtime is the
+# recognition service (python -m common.vosk_service): load the model there once
+# and open_recognizer() connects the tools to it while it is running.
+# memory_usage() reports resident vs shared memory so the difference can be checked:
+#
+#   python -m common.model_store --model Morse_Python_Code/model --map --load
+
+import mmap
+import os
+import struct
+import threading
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+DEFAULT_SEARCH_PATHS = [
+    os.path.join(REPO_ROOT, 'Morse_Python_Code', 'model'),
+    os.path.join(REPO_ROOT, 'Smart_Glasses_For_People_With_Special_Needs', 'vosk_model'),
+]
+ENV_VARIABLE = 'VOSK_MODEL_PATH'
+
+# Kaldi/Vosk model layout. Each entry is a list of alternatives; one must exist.
+REQUIRED_FILES = [
+    ['am/final.mdl'],
+    ['graph/HCLG.fst', 'graph/HCLr.fst'], # Static graph, or the lookahead graph of the small models
+    ['conf/mfcc.conf'],
+]
+KALDI_BINARY_MAGIC = b'\0B' # Kaldi's binary-mode marker at the start of final.mdl, final.dubm, ...
+FST_MAGIC = 2125659606 # OpenFst header magic (0x7eb2fdd6, little-endian int32)
+
+
+class ModelNotFound(FileNotFoundError):
+    """No usable model at the given path or any of the search paths."""
+
+
+class InvalidModel(ValueError):
+    """A model folder exists but is incomplete or damaged."""
+
+
+class ModelInfo:
+    """A validated model folder: its files, their total size and any problems found."""
+
+    def __init__(self, path, files, problems):
+        self.path = path
+        self.files = files # Relative path -> size in bytes
+        self.problems = problems
+
+    @property
+    def valid(self):
+        return not self.problems
+
+    @property
+    def size_mb(self):
+        return sum(self.files.values()) / 2**20
+
+    def to_dict(self):
+        return {'path': self.path, 'valid': self.valid, 'files': len(self.files),
+                'size_mb': round(self.size_mb, 1), 'problems': list(self.problems)}
+
+
+class MappedModel:
+    """Read-only memory maps of every file in a model folder. close() unmaps them."""
+
+    def __init__(self, info):
+        self.info = info
+        self._maps = []
+        for relpath, size in info.files.items():
+            if size == 0:
+                continue
+            with open(os.path.join(info.path, relpath), 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):
+                mapped.madvise(mmap.MADV_WILLNEED) # Start reading it into the page cache now
+            self._maps.append(mapped)
+
+    def touch(self):
+        """Faults every page in (one byte per page), so the whole model is resident."""
+        step = mmap.PAGESIZE
+        total = 0
+        for mapped in self._maps:
+            for offset in range(0, len(mapped), step):
+                total += mapped[offset]
+        return total
+
+    @property
+    def mapped_mb(self):
+        return sum(len(m) for m in self._maps) / 2**20
+
+    def close(self):
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+
+
+def _signature(path):
+    """(relative path, size, mtime) of every file, which changes whenever the model is replaced."""
+    entries = []
+    for root, _, names in os.walk(path):
+        for name in names:
+            full = os.path.join(root, name)
+            stat = os.stat(full)
+            entries.append((os.path.relpath(full, path).replace(os.sep, '/'), stat.st_size, stat.st_mtime_ns))
+    return tuple(sorted(entries))
+
+
+def _check_headers(path, files):
+    problems = []
+    for relpath in files:
+        full = os.path.join(path, relpath)
+        if relpath.endswith('.fst'):
+            with open(full, 'rb') as f:
+                header = f.read(4)
+            if len(header) < 4 or struct.unpack('<i', header)[0] != FST_MAGIC:
+                problems.append(f"'{relpath}' is not an OpenFst file.")
+        elif relpath in ('am/final.mdl', 'ivector/final.dubm', 'ivector/final.ie'):
+            with open(full, 'rb') as f:
+                if f.read(2) != KALDI_BINARY_MAGIC:
+                    problems.append(f"'{relpath}' is not a binary Kaldi model file.")
+    return problems
+
+
+class ModelStore:
+    """Locates and validates model folders, caching the results for this process."""
+
+    def __init__(self, search_paths=None):
+        self.search_paths = list(DEFAULT_SEARCH_PATHS if search_paths is None else search_paths)
+        self._validated = {} # Real path -> (signature, ModelInfo)
+        self._mapped = {} # Real path -> MappedModel
+        self._lock = threading.Lock()
+
+    def validate(self, path):
+        """ModelInfo for a folder (valid or not); raises ModelNotFound if it does not exist."""
+        real = os.path.realpath(path)
+        if not os.path.isdir(real):
+            raise ModelNotFound(f"Model folder '{path}' not found.")
+        signature = _signature(real)
+        with self._lock:
+            cached = self._validated.get(real)
+            if cached and cached[0] == signature:
+                return cached[1]
+
+        files = {relpath: size for relpath, size, _ in signature}
+        problems = [f"Missing {' or '.join(alternatives)}." for alternatives in REQUIRED_FILES
+                    if not any(a in files for a in alternatives)]
+        if 'graph/HCLr.fst' in files and 'graph/Gr.fst' not in files:
+            problems.append("Missing graph/Gr.fst (needed with graph/HCLr.fst).")
+        try:
+            problems += _check_headers(real, [f for f in files if f.endswith('.fst')] + [
+                f for f in ('am/final.mdl', 'ivector/final.dubm', 'ivector/final.ie') if f in files])
+        except OSError as e:
+            problems.append(f"Could not read the model files: {e}")
+
+        info = ModelInfo(real, files, problems)
+        with self._lock:
+            self._validated[real] = (signature, info)
+        return info
+
+    def candidates(self, preferred=None):
+        paths = [preferred] if preferred else []
+        if os.environ.get(ENV_VARIABLE):
+            paths.append(os.environ[ENV_VARIABLE])
+        return paths + self.search_paths
+
+    def locate(self, preferred=None):
+        """The first valid model among `preferred`, $VOSK_MODEL_PATH and the search paths."""
+        tried = []
+        for path in self.candidates(preferred):
+            try:
+                info = self.validate(path)
+            except ModelNotFound:
+                tried.append(f"{path}: not found")
+                continue
+            if info.valid:
+                return info
+            tried.append(f"{path}: {' '.join(info.problems)}")
+        raise ModelNotFound("No valid Vosk model found. Tried:\n  " + "\n  ".join(tried))
+
+    def require(self, path):
+        """ModelInfo for `path`, raising InvalidModel if it is not a usable model."""
+        info = self.validate(path)
+        if not info.valid:
+            raise InvalidModel(f"'{path}' is not a usable Vosk model: {' '.join(info.problems)}")
+        return info
+
+    def map_model(self, path):
+        """Read-only memory maps of the model's files, shared with every other mapping process."""
+        info = self.require(path)
+        with self._lock:
+            mapped = self._mapped.get(info.path)
+            if mapped is None or mapped.info is not info:
+                if mapped is not None:
+                    mapped.close()
+                mapped = MappedModel(info)
+                self._mapped[info.path] = mapped
+            return mapped
+
+    def stats(self):
+        with self._lock:
+            return {
+                'validated': [info.to_dict() for _, info in self._validated.values()],
+                'mapped_mb': round(sum(m.mapped_mb for m in self._mapped.values()), 1),
+            }
+
+
+store = ModelStore() # Process-wide
+
+
+def locate_model(preferred=None):
+    return store.locate(preferred).path
+
+
+def memory_usage():
+    """
+    This process's memory in MB: 'rss' (resident), 'shared' (resident pages other
+    processes are using too, e.g. a model file mapped by two tools), 'private'
+    (only this process, e.g. a model parsed into the heap, or a mapped file no
+    other process maps yet) and 'pss' (rss with shared pages split between their users). Linux reads /proc/self/smaps_rollup; elsewhere psutil
+    gives rss (and private as uss where available).
+    """
+    try:
+        values = {}
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    values[parts[0][:-1]] = int(parts[1]) / 1024.0
+        return {
+            'rss': round(values.get('Rss', 0.0), 1),
+            'pss': round(values.get('Pss', 0.0), 1),
+            'shared': round(values.get('Shared_Clean', 0.0) + values.get('Shared_Dirty', 0.0), 1),
+            'private': round(values.get('Private_Clean', 0.0) + values.get('Private_Dirty', 0.0), 1),
+        }
+    except OSError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_full_info()
+        uss = getattr(info, 'uss', None)
+        return {'rss': round(info.rss / 2**20, 1), 'pss': None,
+                'shared': round((info.rss - uss) / 2**20, 1) if uss is not None else None,
+                'private': round(uss / 2**20, 1) if uss is not None else None}
+    except (ImportError, OSError):
+        return {'rss': None, 'pss': None, 'shared': None, 'private': None}
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Locate and validate the offline Vosk model and report memory use.")
+    parser.add_argument('--model', help="Model folder to check first.")
+    parser.add_argument('--map', action='store_true', help="Memory-map the model files read-only.")
+    parser.add_argument('--load', action='store_true', help="Also load the model with vosk in this process.")
+    args = parser.parse_args()
+
+    try:
+        info = store.locate(args.model)
+    except ModelNotFound as e:
+        print(f"[ERROR] {e}")
+        raise SystemExit(1)
+    print(f"[INFO] Model: {info.path} ({len(info.files)} files, {info.size_mb:.1f} MB)")
+    print(f"[MEMORY] start:           {memory_usage()}")
+
+    if args.map:
+        start = time.perf_counter()
+        mapped = store.map_model(info.path)
+        mapped.touch()
+        print(f"[INFO] Mapped {mapped.mapped_mb:.1f} MB in {time.perf_counter() - start:.2f}s.")
+        print(f"[MEMORY] after mapping:   {memory_usage()}")
+
+    if args.load:
+        import vosk
+        vosk.SetLogLevel(-1)
+        start = time.perf_counter()
+        model = vosk.Model(info.path)
+        print(f"[INFO] vosk.Model loaded in {time.perf_counter() - start:.2f}s.")
+        print(f"[MEMORY] after loading:   {memory_usage()}")
+        del model
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,490 @@
+# Serial Transport
+# One way for the Arduino tools (density detector, leveller, Morse sender and
+# voice-to-Morse) to talk to their boards, instead of each opening serial.Serial
+# with a hard-coded COM port, sleeping two seconds and calling readline().
+#
+#   transport = open_transport(None, 9600)   # None: find the board by USB VID/PID
+#   transport.write(b'H')
+#   line = transport.read_text(timeout=1.0)  # 'Received: H - Blinking: ....'
+#   print(transport.stats())                 # bytes/frames in and out, latency, reconnects
+#
+# * Port auto-detection: the first port whose USB vendor/product id belongs to an
+#   Arduino or a common USB-serial chip (KNOWN_BOARDS). A board that comes back on a
+#   different port after being replugged is found again.
+# * A reader thread drains the port in bulk (everything waiting, in one read) and
+#   splits the bytes into frames with a pluggable framing: LineFraming for the text
+#   sketches, LengthPrefixedFraming for binary protocols. Frames wait in a bounded
+#   queue; the oldest are dropped (and counted) if nobody reads them.
+# * No fixed sleep for the reset the Arduino does when the port opens: open returns
+#   at once, reads simply wait for the board's first line, and writes are held back
+#   only until the board has spoken or BOOT_DELAY_S has passed.
+# * Automatic reconnect when the cable is pulled: the reader keeps retrying with
+#   backoff, and write() waits (up to its timeout) for the link to return.
+# * Per-port counters: bytes and frames each way, bytes per bulk read, dropped
+#   frames, framing errors, reconnects, and the latency from a write to the next
+#   frame the board sends back (the Morse sketch's acknowledgement).
+#
+# open_transport() shares one open transport per port within a process, since a
+# serial port can only be opened once. SerialTransport keeps the write()/readline()/
+# close() surface of serial.Serial, so code written for one works with the other
+# (and with Morse_Python_Code/simulated_arduino.py). List the detected boards with:
+#
+#   python -m common.serial_transport --list
+
+import collections
+import threading
+import time
+
+# USB vendor id -> name; or (vendor id, product id) -> name for chips used by other devices too.
+KNOWN_BOARDS = {
+    0x2341: 'Arduino',
+    0x2A03: 'Arduino (arduino.org)',
+    0x1B4F: 'SparkFun',
+    0x239A: 'Adafruit',
+    (0x1A86, 0x7523): 'CH340 (Arduino Nano/Uno clone)',
+    (0x1A86, 0x55D4): 'CH9102',
+    (0x0403, 0x6001): 'FTDI FT232R',
+    (0x0403, 0x6015): 'FTDI FT231X',
+    (0x10C4, 0xEA60): 'CP210x',
+}
+READ_TIMEOUT_S = 0.05 # How long one blocking read waits, i.e. how quickly the reader notices close()
+BOOT_DELAY_S = 2.0 # Arduino bootloader time after the port opens (the board resets)
+RECONNECT_DELAYS_S = (0.5, 1.0, 2.0, 5.0) # Backoff between reconnect attempts (the last repeats)
+MAX_QUEUED_FRAMES = 1000
+MAX_FRAME_BYTES = 4096
+LATENCY_SAMPLES = 1000
+
+
+class SerialTransportError(OSError):
+    """The port could not be opened, or the link is down."""
+
+
+class PortNotFound(SerialTransportError):
+    """No port given, and no known board detected."""
+
+
+# --- Framing ---
+
+class LineFraming:
+    """Newline-terminated text lines (Serial.println). Frames keep their line ending, like readline()."""
+
+    def __init__(self, delimiter=b'\n', max_length=MAX_FRAME_BYTES):
+        self.delimiter = delimiter
+        self.max_length = max_length
+        self.errors = 0
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """Appends received bytes; returns the frames they completed."""
+        self._buffer += data
+        frames = []
+        start = 0
+        while True:
+            end = self._buffer.find(self.delimiter, start)
+            if end < 0:
+                break
+            end += len(self.delimiter)
+            frames.append(bytes(self._buffer[start:end]))
+            start = end
+        del self._buffer[:start]
+        if len(self._buffer) > self.max_length: # No delimiter in sight: noise or the wrong baud rate
+            self.errors += 1
+            self._buffer.clear()
+        return frames
+
+    def encode(self, payload):
+        return payload if payload.endswith(self.delimiter) else payload + self.delimiter
+
+    def reset(self):
+        self._buffer.clear()
+
+
+class LengthPrefixedFraming:
+    """
+    Binary frames: a sync byte, the payload length (1 or 2 bytes, little-endian) and the
+    payload. After a corrupted byte it skips ahead to the next sync byte.
+    """
+
+    def __init__(self, sync=b'\xaa', length_bytes=1, max_length=MAX_FRAME_BYTES):
+        self.sync = sync
+        self.length_bytes = length_bytes
+        self.max_length = min(max_length, 256 ** length_bytes - 1)
+        self.errors = 0
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        self._buffer += data
+        frames = []
+        header = 1 + self.length_bytes
+        while len(self._buffer) >= header:
+            if self._buffer[0] != self.sync[0]:
+                next_sync = self._buffer.find(self.sync, 1)
+                self.errors += 1
+                del self._buffer[:next_sync if next_sync > 0 else len(self._buffer)]
+                continue
+            length = int.from_bytes(self._buffer[1:header], 'little')
+            if length > self.max_length:
+                self.errors += 1
+                del self._buffer[:1]
+                continue
+            if len(self._buffer) < header + length:
+                break
+            frames.append(bytes(self._buffer[header:header + length]))
+            del self._buffer[:header + length]
+        return frames
+
+    def encode(self, payload):
+        if len(payload) > self.max_length:
+            raise ValueError(f"Payload of {len(payload)} bytes does not fit a {self.length_bytes}-byte length.")
+        return self.sync + len(payload).to_bytes(self.length_bytes, 'little') + payload
+
+    def reset(self):
+        self._buffer.clear()
+
+
+# --- Port detection ---
+
+def find_ports(boards=None):
+    """(port, description) for every serial port with a known USB VID/PID, in port order."""
+    from serial.tools import list_ports
+    boards = KNOWN_BOARDS if boards is None else boards
+    found = []
+    for info in sorted(list_ports.comports(), key=lambda info: info.device):
+        name = boards.get((info.vid, info.pid)) or boards.get(info.vid)
+        if info.vid is not None and name:
+            found.append((info.device, f"{name} ({info.vid:04X}:{info.pid:04X}) {info.description}"))
+    return found
+
+
+def resolve_port(port=None, boards=None):
+    """`port` itself, or (None / 'auto') the first detected board's port."""
+    if port and port != 'auto':
+        return port
+    found = find_ports(boards)
+    if not found:
+        raise PortNotFound("No Arduino found. Check the USB cable, or give the port (e.g. 'COM3' or '/dev/ttyUSB0').")
+    if len(found) > 1:
+        print(f"[INFO] Several boards found ({', '.join(p for p, _ in found)}); using {found[0][0]}.")
+    return found[0][0]
+
+
+# --- Transport ---
+
+class SerialTransport:
+    """
+    A serial link with a background reader, framing, reconnect and counters.
+    `port` None auto-detects the board (and re-detects it on reconnect). `device`
+    wraps an already open serial.Serial-like object instead (no reconnect).
+    """
+
+    def __init__(self, port=None, baudrate=9600, framing=None, timeout=2.0, reset=True, boot_delay=BOOT_DELAY_S,
+                 auto_reconnect=True, boards=None, device=None):
+        self.requested_port = port
+        self.port = getattr(device, 'port', port)
+        self.baudrate = baudrate
+        self.framing = framing or LineFraming()
+        self.timeout = timeout # readline()/write() wait at most this long
+        self.reset = reset
+        self.boot_delay = boot_delay if reset else 0.0
+        self.auto_reconnect = auto_reconnect and device is None
+        self.boards = boards
+        self._ser = device
+        self._fixed_device = device is not None
+        self._frames = collections.deque()
+        self._frames_ready = threading.Condition()
+        self._connected = threading.Event()
+        self._closing = threading.Event()
+        self._write_lock = threading.Lock()
+        self._ready_at = 0.0
+        self._awaiting_reply = None # perf_counter() of the last write not yet answered
+        self._thread = None
+        self._users = 1
+        self.opened_at = None
+        self.bytes_in = self.bytes_out = 0
+        self.frames_in = self.frames_out = self.frames_dropped = 0
+        self.reads = 0
+        self.reconnects = 0
+        self.latencies_ms = collections.deque(maxlen=LATENCY_SAMPLES)
+
+    # --- Connection ---
+
+    def open(self):
+        """Opens the port (raising SerialTransportError if it cannot) and starts the reader."""
+        if not self._fixed_device:
+            self._connect()
+        self._ready_at = time.perf_counter() + (self.boot_delay if not self._fixed_device else 0.0)
+        self._connected.set()
+        self.opened_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._read_loop, name=f'serial-{self.port}', daemon=True)
+        self._thread.start()
+        return self
+
+    def _connect(self):
+        import serial
+        port = resolve_port(self.requested_port, self.boards)
+        ser = serial.Serial()
+        ser.port = port
+        ser.baudrate = self.baudrate
+        ser.timeout = READ_TIMEOUT_S
+        if not self.reset:
+            ser.dtr = False # Most boards reset on DTR; keep the running sketch (and skip the boot wait)
+        try:
+            ser.open()
+        except (OSError, ValueError) as e:
+            raise SerialTransportError(f"Could not open {port}: {e}") from e
+        self._ser = ser
+        self.port = port
+
+    def _lost(self, error):
+        print(f"[WARNING] Serial link {self.port} lost: {error}")
+        self._connected.clear()
+        try:
+            self._ser.close()
+        except (OSError, AttributeError):
+            pass
+        if not self.auto_reconnect:
+            self._closing.set()
+            with self._frames_ready:
+                self._frames_ready.notify_all()
+
+    def _reconnect(self):
+        attempt = 0
+        while not self._closing.is_set():
+            if self._closing.wait(RECONNECT_DELAYS_S[min(attempt, len(RECONNECT_DELAYS_S) - 1)]):
+                return False
+            attempt += 1
+            old_port = self.port
+            try:
+                self._connect()
+            except SerialTransportError: # PortNotFound included: the board is not back yet
+                continue
+            if self.port != old_port: # An auto-detected board came back on another port
+                with _pool_lock:
+                    if _pool.get(old_port) is self:
+                        del _pool[old_port]
+                        _pool[self.port] = self
+            self.framing.reset()
+            self._ready_at = time.perf_counter() + self.boot_delay
+            self.reconnects += 1
+            self._connected.set()
+            print(f"[INFO] Serial link {self.port} reconnected.")
+            return True
+        return False
+
+    @property
+    def connected(self):
+        return self._connected.is_set()
+
+    @property
+    def is_open(self):
+        return not self._closing.is_set()
+
+    # --- Reading ---
+
+    def _read_loop(self):
+        while not self._closing.is_set():
+            if not self._connected.is_set():
+                if not self._reconnect():
+                    return
+                continue
+            try:
+                # Block briefly for the first byte, then take everything that has arrived.
+                data = self._ser.read(self._ser.in_waiting or 1)
+                waiting = self._ser.in_waiting if data else 0
+                if waiting:
+                    data += self._ser.read(waiting)
+            except (OSError, TypeError, AttributeError) as e: # pyserial raises TypeError/AttributeError if closed mid-read
+                if self._closing.is_set():
+                    return
+                self._lost(e)
+                continue
+            if data:
+                self._received(data)
+
+    def _received(self, data):
+        now = time.perf_counter()
+        self.reads += 1
+        self.bytes_in += len(data)
+        self._ready_at = min(self._ready_at, now) # The board is talking, so it has booted
+        frames = self.framing.feed(data)
+        if not frames:
+            return
+        if self._awaiting_reply is not None:
+            self.latencies_ms.append((now - self._awaiting_reply) * 1000.0)
+            self._awaiting_reply = None
+        with self._frames_ready:
+            for frame in frames:
+                if len(self._frames) >= MAX_QUEUED_FRAMES:
+                    self._frames.popleft()
+                    self.frames_dropped += 1
+                self._frames.append(frame)
+            self.frames_in += len(frames)
+            self._frames_ready.notify_all()
+
+    def read_frame(self, timeout=None):
+        """The oldest unread frame, or None after `timeout` seconds (default: self.timeout)."""
+        timeout = self.timeout if timeout is None else timeout
+        with self._frames_ready:
+            if not self._frames_ready.wait_for(lambda: self._frames or self._closing.is_set(), timeout):
+                return None
+            return self._frames.popleft() if self._frames else None
+
+    def read_text(self, timeout=None):
+        """The next frame decoded as UTF-8 and stripped, or None after `timeout`."""
+        frame = self.read_frame(timeout)
+        return None if frame is None else frame.decode('utf-8', errors='replace').strip()
+
+    def readline(self):
+        """serial.Serial-compatible: the next line (with its ending), or b'' after the timeout."""
+        return self.read_frame() or b''
+
+    @property
+    def in_waiting(self):
+        """Bytes in unread frames (serial.Serial counts unread bytes)."""
+        with self._frames_ready:
+            return sum(len(frame) for frame in self._frames)
+
+    def reset_input_buffer(self):
+        with self._frames_ready:
+            self._frames.clear()
+
+    # --- Writing ---
+
+    def write(self, data):
+        """Writes raw bytes, waiting up to the timeout for the link (and the board's boot)."""
+        if not self._connected.wait(self.timeout):
+            raise SerialTransportError(f"Serial link {self.port} is down.")
+        wait = self._ready_at - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+        with self._write_lock:
+            try:
+                written = self._ser.write(data)
+            except (OSError, AttributeError) as e:
+                self._lost(e)
+                raise SerialTransportError(f"Write to {self.port} failed: {e}") from e
+            self._awaiting_reply = time.perf_counter()
+        self.bytes_out += written or 0
+        self.frames_out += 1
+        return written
+
+    def send(self, payload):
+        """Writes one framed message (e.g. a line, or a length-prefixed binary frame)."""
+        return self.write(self.framing.encode(payload))
+
+    def flush(self):
+        if self._ser is not None and self._connected.is_set():
+            self._ser.flush()
+
+    # --- Lifetime ---
+
+    def close(self):
+        """Closes the link once every user of this shared transport has closed it."""
+        with _pool_lock:
+            self._users -= 1
+            if self._users > 0:
+                return
+            if _pool.get(self.port) is self:
+                del _pool[self.port]
+        self._closing.set()
+        with self._frames_ready:
+            self._frames_ready.notify_all()
+        if self._ser is not None:
+            try:
+                if hasattr(self._ser, 'cancel_read'):
+                    self._ser.cancel_read() # Wakes the reader from a blocking read
+                self._ser.close()
+            except OSError:
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(1.0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.opened_at if self.opened_at else 0.0
+        latencies = sorted(self.latencies_ms)
+        stats = {
+            'port': self.port,
+            'connected': self.connected,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'frames_in': self.frames_in,
+            'frames_out': self.frames_out,
+            'frames_dropped': self.frames_dropped,
+            'framing_errors': self.framing.errors,
+            'bytes_per_read': round(self.bytes_in / self.reads, 1) if self.reads else 0.0,
+            'in_bytes_per_s': round(self.bytes_in / elapsed, 1) if elapsed else 0.0,
+            'out_bytes_per_s': round(self.bytes_out / elapsed, 1) if elapsed else 0.0,
+            'reconnects': self.reconnects,
+        }
+        if latencies:
+            stats['reply_latency_ms'] = {
+                'p50': round(latencies[len(latencies) // 2], 2),
+                'p90': round(latencies[int(len(latencies) * 0.9)], 2),
+                'max': round(latencies[-1], 2),
+            }
+        return stats
+
+
+_pool = {} # Port -> open SerialTransport, shared by everything in this process
+_pool_lock = threading.Lock()
+
+
+def open_transport(port=None, baudrate=9600, framing=None, timeout=2.0, reset=True, auto_reconnect=True, boards=None):
+    """
+    The open transport for `port` (None: the detected board), opening it if this
+    process has not yet. Each caller closes it when done; the port closes with the last.
+    """
+    resolved = resolve_port(port, boards)
+    with _pool_lock:
+        transport = _pool.get(resolved)
+        if transport is not None and transport.is_open:
+            if transport.baudrate != baudrate:
+                raise SerialTransportError(f"{resolved} is already open at {transport.baudrate} baud.")
+            transport._users += 1
+            return transport
+        transport = SerialTransport(port, baudrate, framing, timeout, reset, auto_reconnect=auto_reconnect, boards=boards)
+        transport.open()
+        _pool[transport.port] = transport
+        return transport
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="List detected boards, or watch a port's traffic and counters.")
+    parser.add_argument('--list', action='store_true', help="List ports with a known USB VID/PID.")
+    parser.add_argument('--port', help="Port to watch (default: the first detected board).")
+    parser.add_argument('--baud', type=int, default=9600)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    args = parser.parse_args()
+
+    if args.list:
+        found = find_ports()
+        for port, description in found:
+            print(f"{port:<16} {description}")
+        if not found:
+            print("No known boards found.")
+        return
+
+    try:
+        transport = open_transport(args.port, args.baud)
+    except SerialTransportError as e:
+        print(f"[ERROR] {e}")
+        raise SystemExit(1)
+    with transport:
+        deadline = time.perf_counter() + args.seconds
+        while time.perf_counter() < deadline:
+            text = transport.read_text(timeout=max(deadline - time.perf_counter(), 0.0))
+            if text is not None:
+                print(f"{transport.port}: {text}")
+        print(f"[INFO] {transport.stats()}")
+
+
+if __name__ == '__main__':
+    main()
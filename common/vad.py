@@ -0,0 +1,165 @@
+# Energy-based Voice Activity Detection (VAD)
+# Sits in front of a Vosk KaldiRecognizer so silence never reaches the decoder.
+#
+# Each int16 audio block is viewed in place with np.frombuffer (no copy) and
+# reduced to two cheap features:
+#   * RMS energy      - loud enough to be speech?
+#   * zero-crossing   - hiss/fan noise crosses zero far more often than voiced speech
+# Only blocks that look like speech are forwarded, plus a short pre-roll (so the
+# first syllable is not clipped) and a hangover margin (so pauses between words
+# do not cut a sentence in half).
+#
+# The noise floor follows the room during silence, and is also raised to the
+# quietest block of the last NOISE_WINDOW_S seconds (minimum statistics): speech
+# always has pauses, so steady noise loud enough to pass as speech (fan hum, air
+# conditioning) lifts the floor within that time and the gate closes again.
+
+import time
+
+import numpy as np
+
+# --- DEFAULTS ---
+MIN_RMS = 300.0            # Absolute floor for speech energy (int16 units)
+NOISE_RATIO = 3.0          # Speech must be this many times louder than the tracked noise floor
+MAX_ZCR = 0.35             # Quiet blocks crossing zero more often than this are treated as noise
+LOUD_RATIO = 2.0           # ...unless they are this many times above the threshold
+NOISE_ADAPT_RATE = 0.05    # How quickly the noise floor follows the room during silence
+NOISE_WINDOW_S = 10.0      # The floor never stays below the quietest block of this trailing window
+HANGOVER_MS = 800          # Keep forwarding audio this long after the last speech block
+PREROLL_BLOCKS = 1         # Silent blocks replayed to the recognizer when speech starts
+# --- END DEFAULTS ---
+
+
+class EnergyVAD:
+    """
+    Speech gate for int16 mono audio blocks.
+
+    Call process(block) for every block from the microphone. It returns
+    (blocks_to_forward, segment_ended): forward the blocks to the recognizer,
+    and when segment_ended is True ask it for the final result.
+    """
+
+    def __init__(self, sample_rate=16000, block_size=8000, min_rms=MIN_RMS, noise_ratio=NOISE_RATIO,
+                 max_zcr=MAX_ZCR, hangover_ms=HANGOVER_MS, preroll_blocks=PREROLL_BLOCKS, noise_window_s=NOISE_WINDOW_S):
+        self.sample_rate = sample_rate
+        self.min_rms = min_rms
+        self.noise_ratio = noise_ratio
+        self.max_zcr = max_zcr
+        self.hangover_ms = hangover_ms
+        self.preroll_blocks = preroll_blocks
+        self.noise_floor = min_rms / noise_ratio
+        self.in_speech = False
+        self.last_rms = 0.0
+        self.last_zcr = 0.0
+        self.blocks_seen = 0
+        self.blocks_forwarded = 0
+        self._hangover_left_ms = 0.0
+        self._preroll = []
+        self._recent_rms = np.empty(max(int(round(noise_window_s * sample_rate / block_size)), 1))
+        self._allocate(block_size)
+
+    def _allocate(self, block_size):
+        # Scratch buffers are reused for every block, so the hot path never allocates.
+        self._block_size = block_size
+        self._squares = np.empty(block_size, dtype=np.float32)
+        self._signs = np.empty(block_size, dtype=bool)
+        self._crossings = np.empty(max(block_size - 1, 1), dtype=bool)
+
+    def features(self, block):
+        """Returns (rms, zero_crossing_rate) for a bytes-like int16 block."""
+        samples = np.frombuffer(block, dtype=np.int16)
+        n = samples.size
+        if n == 0:
+            return 0.0, 0.0
+        if n > self._block_size:
+            self._allocate(n)
+
+        squares = self._squares[:n]
+        np.multiply(samples, samples, out=squares, dtype=np.float32)
+        rms = float(np.sqrt(squares.sum() / n))
+
+        if n < 2:
+            return rms, 0.0
+        signs = self._signs[:n]
+        crossings = self._crossings[:n - 1]
+        np.signbit(samples, out=signs)
+        np.not_equal(signs[1:], signs[:-1], out=crossings)
+        zcr = np.count_nonzero(crossings) / (n - 1)
+        return rms, zcr
+
+    def is_speech(self, rms, zcr):
+        threshold = max(self.min_rms, self.noise_floor * self.noise_ratio)
+        if rms < threshold:
+            return False
+        return zcr <= self.max_zcr or rms >= threshold * LOUD_RATIO
+
+    def process(self, block):
+        self.blocks_seen += 1
+        rms, zcr = self.features(block)
+        self.last_rms, self.last_zcr = rms, zcr
+        block_ms = 1000.0 * (len(block) // 2) / self.sample_rate
+
+        # Minimum statistics: noise that never drops away for a whole window is background.
+        self._recent_rms[(self.blocks_seen - 1) % len(self._recent_rms)] = rms
+        if self.blocks_seen >= len(self._recent_rms):
+            self.noise_floor = max(self.noise_floor, float(self._recent_rms.min()))
+
+        if self.is_speech(rms, zcr):
+            forwarded = []
+            if not self.in_speech:
+                forwarded.extend(self._preroll) # Replay the lead-in so the first word is complete
+                self._preroll.clear()
+                self.in_speech = True
+            forwarded.append(block)
+            self._hangover_left_ms = self.hangover_ms
+            self.blocks_forwarded += len(forwarded)
+            return forwarded, False
+
+        # Not speech: adapt to the room's background level.
+        self.noise_floor += NOISE_ADAPT_RATE * (rms - self.noise_floor)
+
+        if self.in_speech:
+            self._hangover_left_ms -= block_ms
+            if self._hangover_left_ms > 0:
+                self.blocks_forwarded += 1
+                return [block], False
+            self.in_speech = False
+            self._remember(block)
+            return [], True
+
+        self._remember(block)
+        return [], False
+
+    def _remember(self, block):
+        if self.preroll_blocks:
+            self._preroll.append(block)
+            if len(self._preroll) > self.preroll_blocks:
+                self._preroll.pop(0)
+
+    def reset(self):
+        self.in_speech = False
+        self._hangover_left_ms = 0.0
+        self._preroll.clear()
+
+    def stats(self):
+        return {
+            'blocks_seen': self.blocks_seen,
+            'blocks_forwarded': self.blocks_forwarded,
+            'forwarded_ratio': self.blocks_forwarded / self.blocks_seen if self.blocks_seen else 0.0,
+            'noise_floor': self.noise_floor,
+        }
+
+
+class RateLimiter:
+    """Allows an action at most `rate_hz` times per second (e.g. decoding partial results)."""
+
+    def __init__(self, rate_hz):
+        self.interval = 1.0 / rate_hz if rate_hz else 0.0
+        self._next_time = 0.0
+
+    def ready(self, now=None):
+        now = time.monotonic() if now is None else now
+        if now < self._next_time:
+            return False
+        self._next_time = now + self.interval
+        return True
@@ -0,0 +1,330 @@
+# Shared Vosk Recognition Service
+# Loads the Vosk model ONCE and hands out warm KaldiRecognizer objects from a pool.
+#
+# Two ways to use it:
+#   1. In-process:  service = get_service('model'); rec = service.acquire() ... service.release(rec)
+#   2. Local socket: run `python -m common.vosk_service --model model` once, then every
+#      client (voice_to_morse.py, the Mook Mitra speech card) uses RemoteRecognizer,
+#      which behaves like a KaldiRecognizer but shares the service's warm model.
+#
+# The pool size caps how many recognizers exist at once, so the memory footprint
+# is one model + at most `pool_size` decoders, no matter how many clients connect.
+
+import json
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from common.model_store import memory_usage, store
+
+# --- CONFIGURATION ---
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 2700
+DEFAULT_SAMPLERATE = 16000
+DEFAULT_POOL_SIZE = 4
+ACQUIRE_TIMEOUT_S = 5.0 # How long a client waits for a free recognizer
+# --- END CONFIGURATION ---
+
+# Wire protocol: after a one-line JSON handshake, every request is a 1-byte
+# opcode + 4-byte big-endian payload length, and every reply is one JSON line.
+_HEADER = struct.Struct('!cI')
+OP_AUDIO = b'A'    # payload = int16 PCM, reply {"accepted": bool}
+OP_PARTIAL = b'P'  # reply = PartialResult()
+OP_RESULT = b'R'   # reply = Result()
+OP_FINAL = b'F'    # reply = FinalResult()
+OP_RESET = b'X'    # reply {"ok": true}
+
+
+class RecognitionService:
+    """
+    Owns one vosk.Model and a bounded pool of KaldiRecognizer objects.
+    Thread-safe: any number of threads may acquire/release recognizers.
+    """
+
+    def __init__(self, model_path, sample_rate=DEFAULT_SAMPLERATE, pool_size=DEFAULT_POOL_SIZE):
+        self.model_path = model_path
+        self.sample_rate = sample_rate
+        self.pool_size = pool_size
+        self.load_time_s = None
+        self.load_memory_mb = None # Private memory the model added to this process
+        self._model = None
+        self._idle = queue.LifoQueue() # LIFO keeps the most recently used (cache-warm) recognizer in play
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+
+    def load(self):
+        """Loads the model on first use. Later calls return the already-loaded model."""
+        with self._lock:
+            if self._model is None:
+                import vosk
+                vosk.SetLogLevel(-1)
+                store.require(self.model_path) # A clear error for a missing or broken model, before Kaldi sees it
+                before = memory_usage()['private']
+                start = time.perf_counter()
+                self._model = vosk.Model(self.model_path)
+                self.load_time_s = time.perf_counter() - start
+                after = memory_usage()['private']
+                if before is not None and after is not None:
+                    self.load_memory_mb = round(after - before, 1)
+                print(f"[VOSK SERVICE] Model '{self.model_path}' loaded in {self.load_time_s:.2f}s"
+                      f"{f', +{self.load_memory_mb:.0f} MB private memory' if self.load_memory_mb is not None else ''}.")
+        return self._model
+
+    def acquire(self, timeout=None):
+        """Takes a recognizer from the pool, creating one if the pool is not yet full."""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"All {self.pool_size} recognizers are busy.")
+        try:
+            recognizer = self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                import vosk
+                recognizer = vosk.KaldiRecognizer(self.load(), self.sample_rate)
+            except Exception:
+                self._slots.release()
+                raise
+            with self._lock:
+                self._created += 1
+        with self._lock:
+            self._in_use += 1
+        return recognizer
+
+    def release(self, recognizer):
+        """
+        Resets a recognizer and returns it to the pool for the next client. A recognizer
+        whose Reset() fails is discarded (a new one is created when needed); its slot
+        is freed either way.
+        """
+        try:
+            recognizer.Reset()
+            self._idle.put(recognizer)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def recognizer(self, timeout=None):
+        recognizer = self.acquire(timeout=timeout)
+        try:
+            yield recognizer
+        finally:
+            self.release(recognizer)
+
+    def transcribe(self, audio_bytes):
+        """Convenience helper: transcribes a complete int16 PCM buffer and returns the text."""
+        with self.recognizer(timeout=ACQUIRE_TIMEOUT_S) as recognizer:
+            recognizer.AcceptWaveform(audio_bytes)
+            return json.loads(recognizer.FinalResult()).get('text', '')
+
+    def stats(self):
+        with self._lock:
+            return {
+                'model_path': self.model_path,
+                'sample_rate': self.sample_rate,
+                'pool_size': self.pool_size,
+                'recognizers_created': self._created,
+                'recognizers_in_use': self._in_use,
+                'model_load_time_s': self.load_time_s,
+                'model_load_memory_mb': self.load_memory_mb,
+                'memory_mb': memory_usage(),
+            }
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+def get_service(model_path, sample_rate=DEFAULT_SAMPLERATE, pool_size=DEFAULT_POOL_SIZE):
+    """Returns the process-wide service for a model, so the model is only ever loaded once."""
+    key = (model_path, sample_rate)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = RecognitionService(model_path, sample_rate, pool_size)
+            _services[key] = service
+        return service
+
+
+# --- Socket server ---
+
+def _read_exact(stream, size):
+    data = stream.read(size)
+    if len(data) < size:
+        raise ConnectionError("Connection closed by peer.")
+    return data
+
+
+class _RecognitionHandler(socketserver.StreamRequestHandler):
+    """Serves one client connection with one pooled recognizer."""
+
+    def _reply(self, payload):
+        if isinstance(payload, str): # Vosk results are already JSON strings
+            payload = payload.replace('\n', ' ')
+        else:
+            payload = json.dumps(payload)
+        self.wfile.write(payload.encode('utf-8') + b'\n')
+
+    def handle(self):
+        service = self.server.service
+        try:
+            handshake = json.loads(self.rfile.readline().decode('utf-8') or '{}')
+        except ValueError:
+            self._reply({'status': 'error', 'message': 'Bad handshake.'})
+            return
+
+        if handshake.get('sample_rate', service.sample_rate) != service.sample_rate:
+            self._reply({'status': 'error', 'message': f'Service runs at {service.sample_rate} Hz.'})
+            return
+
+        try:
+            recognizer = service.acquire(timeout=ACQUIRE_TIMEOUT_S)
+        except TimeoutError as e:
+            self._reply({'status': 'error', 'message': str(e)})
+            return
+
+        self._reply({'status': 'ok'})
+        try:
+            while True:
+                opcode, length = _HEADER.unpack(_read_exact(self.rfile, _HEADER.size))
+                payload = _read_exact(self.rfile, length) if length else b''
+                if opcode == OP_AUDIO:
+                    self._reply({'accepted': bool(recognizer.AcceptWaveform(payload))})
+                elif opcode == OP_PARTIAL:
+                    self._reply(recognizer.PartialResult())
+                elif opcode == OP_RESULT:
+                    self._reply(recognizer.Result())
+                elif opcode == OP_FINAL:
+                    self._reply(recognizer.FinalResult())
+                elif opcode == OP_RESET:
+                    recognizer.Reset()
+                    self._reply({'ok': True})
+                else:
+                    self._reply({'status': 'error', 'message': f'Unknown opcode {opcode!r}.'})
+        except (ConnectionError, OSError):
+            pass # Client went away; the recognizer goes back to the pool.
+        finally:
+            service.release(recognizer)
+
+
+class RecognitionServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.service = service
+        super().__init__((host, port), _RecognitionHandler)
+
+
+class RemoteRecognizer:
+    """
+    Client for RecognitionServer. Drop-in replacement for vosk.KaldiRecognizer:
+    AcceptWaveform() returns a bool, the *Result() methods return JSON strings.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, sample_rate=DEFAULT_SAMPLERATE, timeout=10.0):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile('rb')
+        self._sock.sendall(json.dumps({'sample_rate': sample_rate}).encode('utf-8') + b'\n')
+        reply = json.loads(self._reader.readline().decode('utf-8') or '{}')
+        if reply.get('status') != 'ok':
+            self.close()
+            raise ConnectionError(reply.get('message', 'Recognition service refused the connection.'))
+
+    def _call(self, opcode, payload=b''):
+        self._sock.sendall(_HEADER.pack(opcode, len(payload)) + payload)
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Recognition service closed the connection.")
+        return line.decode('utf-8').strip()
+
+    def AcceptWaveform(self, data):
+        return json.loads(self._call(OP_AUDIO, bytes(data)))['accepted']
+
+    def PartialResult(self):
+        return self._call(OP_PARTIAL)
+
+    def Result(self):
+        return self._call(OP_RESULT)
+
+    def FinalResult(self):
+        return self._call(OP_FINAL)
+
+    def Reset(self):
+        self._call(OP_RESET)
+
+    def close(self):
+        try:
+            self._reader.close()
+            self._sock.close()
+        except OSError:
+            pass
+
+
+class RecognizerLease:
+    """A recognizer borrowed for one client session. Call close() (or use `with`) to return it."""
+
+    def __init__(self, recognizer, on_close):
+        self.recognizer = recognizer
+        self._on_close = on_close
+
+    def close(self):
+        if self._on_close:
+            self._on_close(self.recognizer)
+            self._on_close = None
+
+    def __enter__(self):
+        return self.recognizer
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_recognizer(model_path, sample_rate=DEFAULT_SAMPLERATE, address=None):
+    """
+    Leases a recognizer for one client session.
+    If `address` (host, port) is given and a service is listening there, the shared
+    remote model is used; otherwise the model is loaded (once) in this process.
+    """
+    if address:
+        try:
+            recognizer = RemoteRecognizer(address[0], address[1], sample_rate)
+            return RecognizerLease(recognizer, lambda rec: rec.close())
+        except OSError as e:
+            print(f"[VOSK SERVICE] Service at {address[0]}:{address[1]} unavailable ({e}). Loading model in-process.")
+
+    service = get_service(model_path, sample_rate)
+    return RecognizerLease(service.acquire(timeout=ACQUIRE_TIMEOUT_S), service.release)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a shared, warm Vosk recognition service.")
+    parser.add_argument('--model', default='model', help="Path to the Vosk model folder.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--sample-rate', type=int, default=DEFAULT_SAMPLERATE)
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE)
+    args = parser.parse_args()
+
+    service = get_service(args.model, args.sample_rate, args.pool_size)
+    service.load() # Warm the model before accepting clients.
+
+    with RecognitionServer(service, args.host, args.port) as server:
+        print(f"[VOSK SERVICE] Listening on {args.host}:{args.port} (pool of {args.pool_size} recognizers). Ctrl+C to stop.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n[VOSK SERVICE] Shutting down.")
+            print(f"[VOSK SERVICE] Stats: {service.stats()}")
+
+
+if __name__ == '__main__':
+    main()